@@ -0,0 +1,65 @@
+# app/build_artifacts.py
+"""
+Offline build step for the persisted model artifacts.
+
+Run from the Backend-AI directory, before starting uvicorn:
+
+    python -m app.build_artifacts           # fit only missing/stale artifacts
+    python -m app.build_artifacts --force   # refit everything
+    python -m app.build_artifacts --check   # exit 1 if any artifact is stale
+"""
+
+import argparse
+import importlib
+import sys
+
+from app.core.artifacts import ARTIFACT_DIR
+
+# module path → name of its ArtifactSpec attribute
+ARTIFACT_MODULES = {
+    "app.services.diabetes_service": "MODEL_ARTIFACT",
+    "app.services.blood_pressure_service": "MODEL_ARTIFACT",
+    "app.services.disease_matcher": "COUNTS_ARTIFACT",
+    "app.services.recommender_service": "RECOMMENDER_ARTIFACT",
+    "app.routers.plan_generator": "SIM_FEATURES_ARTIFACT",
+}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--force", action="store_true", help="refit every artifact")
+    parser.add_argument("--check", action="store_true", help="only report staleness")
+    args = parser.parse_args(argv)
+
+    failed = []
+    for module_name, attr in ARTIFACT_MODULES.items():
+        try:
+            spec = getattr(importlib.import_module(module_name), attr)
+        except Exception as e:
+            print(f"❌ {module_name}: {e}")
+            failed.append(module_name)
+            continue
+
+        try:
+            if args.check:
+                if spec.is_fresh():
+                    print(f"✅ {spec.name} up to date")
+                else:
+                    print(f"⚠️ {spec.name} missing or stale")
+                    failed.append(spec.name)
+            elif args.force:
+                spec.rebuild()
+                print(f"✅ rebuilt {spec.name} → {spec.data_path}")
+            else:
+                spec.load()
+                print(f"✅ {spec.name} up to date → {spec.data_path}")
+        except Exception as e:
+            print(f"❌ {spec.name}: {e}")
+            failed.append(spec.name)
+
+    print(f"Artifacts directory: {ARTIFACT_DIR}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# app/core/artifacts.py
+"""
+Persisted, versioned model artifacts.
+
+Each fitted model is stored once under ``ARTIFACT_DIR`` as an uncompressed
+joblib file next to a small JSON manifest recording the SHA-256 of its source
+datasets and the library versions used to fit it. At startup the artifact is
+loaded with ``mmap_mode="r"`` (numpy buffers are memory-mapped, not copied) and
+the model is only refitted when the manifest no longer matches.
+"""
+
+import hashlib
+import json
+import os
+import platform
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+
+from app.core.logger import logger
+
+ARTIFACT_DIR = Path(
+    os.getenv(
+        "MEDCHAT_ARTIFACT_DIR",
+        Path(__file__).resolve().parent.parent / "artifacts",
+    )
+)
+
+# Libraries whose version changes invalidate a pickled model
+_VERSIONED_LIBS = ("sklearn", "numpy", "scipy", "pandas", "joblib")
+
+
+def library_versions() -> dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for name in _VERSIONED_LIBS:
+        try:
+            versions[name] = __import__(name).__version__
+        except ImportError:
+            versions[name] = "missing"
+    return versions
+
+
+def dataset_fingerprint(paths: list[str | Path]) -> str:
+    """SHA-256 over the content of every source file, in order."""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+@dataclass
+class ArtifactSpec:
+    """A model that can be fitted from ``sources`` by ``build``."""
+
+    name: str
+    sources: list[str | Path]
+    build: Callable[[], Any]
+    mmap_mode: str | None = "r"
+    extra: dict = field(default_factory=dict)  # e.g. hyper-parameters
+
+    @property
+    def data_path(self) -> Path:
+        return ARTIFACT_DIR / f"{self.name}.joblib"
+
+    @property
+    def manifest_path(self) -> Path:
+        return ARTIFACT_DIR / f"{self.name}.json"
+
+    def expected_manifest(self) -> dict:
+        return {
+            "name": self.name,
+            "sources_sha256": dataset_fingerprint(self.sources),
+            "versions": library_versions(),
+            "extra": self.extra,
+        }
+
+    def is_fresh(self, expected: dict | None = None) -> bool:
+        expected = expected or self.expected_manifest()
+        if not (self.data_path.exists() and self.manifest_path.exists()):
+            return False
+        try:
+            stored = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            return False
+        return all(stored.get(k) == v for k, v in expected.items())
+
+    def load(self) -> Any:
+        """Load the stored artifact, refitting it only when stale."""
+        expected = self.expected_manifest()
+        if self.is_fresh(expected):
+            try:
+                obj = joblib.load(self.data_path, mmap_mode=self.mmap_mode)
+                logger.info(f"[Artifacts] loaded {self.name}")
+                return obj
+            except Exception as e:
+                logger.warning(f"[Artifacts] {self.name} unreadable, refitting: {e}")
+        else:
+            logger.info(f"[Artifacts] {self.name} missing or stale, refitting")
+        return self._build_and_save(expected)
+
+    def rebuild(self) -> Any:
+        return self._build_and_save(self.expected_manifest())
+
+    def _build_and_save(self, manifest: dict) -> Any:
+        start = time.perf_counter()
+        obj = self.build()
+        manifest = {**manifest, "built_at": time.time()}
+        try:
+            ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+            # Écriture atomique : un autre worker ne lit jamais un fichier partiel
+            tmp_data = self.data_path.with_suffix(f".joblib.{os.getpid()}.tmp")
+            tmp_manifest = self.manifest_path.with_suffix(f".json.{os.getpid()}.tmp")
+            joblib.dump(obj, tmp_data)
+            tmp_manifest.write_text(json.dumps(manifest, indent=2))
+            os.replace(tmp_data, self.data_path)
+            os.replace(tmp_manifest, self.manifest_path)
+        except OSError as e:
+            # Read-only filesystem: keep serving the freshly fitted model
+            logger.warning(f"[Artifacts] could not persist {self.name}: {e}")
+            return obj
+        logger.info(
+            f"[Artifacts] built {self.name} in {time.perf_counter() - start:.2f}s"
+        )
+        if self.mmap_mode:
+            return joblib.load(self.data_path, mmap_mode=self.mmap_mode)
+        return obj
@@ -0,0 +1,192 @@
+# app/core/cache.py
+"""
+Response caches: a size-bounded in-process LRU with TTL, optionally backed by
+a SQLite file so entries survive restarts and are shared by every worker on
+the host. Each named cache registers itself for /health/caches.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from app.core.logger import logger
+
+CACHES: dict[str, "ResponseCache"] = {}
+
+
+def stable_seed(key: str) -> int:
+    """Deterministic 32-bit seed for a cache key (same across workers and restarts)."""
+    return int(hashlib.sha256(key.encode()).hexdigest()[:8], 16)
+
+
+class TTLCache:
+    """Thread-safe LRU with per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: float | None = None) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + (ttl or self.ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCache:
+    """Disk tier: JSON values with absolute expiry, pruned to ``maxsize`` rows."""
+
+    def __init__(self, path: str, maxsize: int):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.maxsize = maxsize
+        self._pid = os.getpid()
+        self._conn = self._connect()
+        self._inherited: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._writes = 0
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        # Ouvert dans le maître en mode preload : une connexion SQLite ne doit pas
+        # traverser un fork. Le worker rouvre la sienne ; l'héritée n'est jamais
+        # fermée (cela relâcherait les verrous du processus parent).
+        if self._pid != os.getpid():
+            self._inherited.append(self._conn)
+            self._conn = self._connect()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Any | None:
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._prune(now)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _prune(self, now: float) -> None:
+        self._db.execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM cache WHERE key IN (SELECT key FROM cache"
+            " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.maxsize,),
+        )
+
+
+class ResponseCache:
+    """Memory LRU in front of an optional shared SQLite tier."""
+
+    def __init__(self, name: str, maxsize: int, ttl: float, path: str | None = None):
+        self.name = name
+        self.ttl = ttl
+        self.memory = TTLCache(maxsize, ttl)
+        self.disk = None
+        if path:
+            try:
+                self.disk = SQLiteCache(path, maxsize=maxsize * 10)
+            except sqlite3.Error as e:
+                logger.warning(f"[Cache] {name}: disk tier disabled ({e})")
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        CACHES[name] = self
+
+    async def get(self, key: str) -> Any | None:
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.set(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: Any) -> None:
+        self.memory.set(key, value)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, self.ttl)
+
+    async def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.delete, key)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.memory),
+            "maxsize": self.memory.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.memory.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "disk": self.disk is not None,
+        }
@@ -0,0 +1,35 @@
+# app/core/conditional.py
+"""
+ETag / If-None-Match for JSON bodies: the ETag is a hash of the canonical JSON,
+so a client holding the current body gets an empty 304 instead of the payload.
+"""
+
+import hashlib
+import json
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+# Le client doit revalider à chaque fois, mais peut réutiliser son corps sur 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def etag_for(body) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return '"' + hashlib.sha256(canonical.encode()).hexdigest()[:32] + '"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    # Weak comparison (RFC 9110): W/"x" matches "x"
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def conditional_response(request: Request, body, etag: str) -> Response:
+    """304 when the client already has ``etag``, else the JSON body with its ETag."""
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=body, headers=headers)
@@ -4,6 +4,68 @@ from pydantic_settings import BaseSettings
 class Settings(BaseSettings):
     openrouter_api_key: str
     model_name: str = "deepseek-chat"
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    deepseek_api_url: str = "https://api.deepseek.com/v1/chat/completions"
+    deepseek_api_key: str = ""
+    chat_history_max: int = 20
+
+    # Chat sessions: "memory" (per worker, LRU + TTL) or "redis" (shared, needs redis)
+    session_store: str = "memory"
+    redis_url: str = "redis://localhost:6379/0"
+    session_ttl: float = 24 * 3600
+    session_max_sessions: int = 10_000
+    session_max_bytes: int = 64 * 1024 * 1024
+    chat_history_token_budget: int = 3000  # history sent upstream (~4 chars/token)
+
+    # Shared LLM upstream client (one pool per worker, see app/core/http.py)
+    chat_timeout: float = 30.0  # read timeout
+    llm_connect_timeout: float = 5.0
+    llm_max_connections: int = 50
+    llm_max_keepalive: int = 20
+    llm_max_concurrency: int = 32
+    llm_http2: bool = False  # requires httpx[http2]
+
+    # Cache of "explore" answers ("" path = memory only, else shared SQLite file)
+    explore_cache_size: int = 2048
+    explore_cache_ttl: float = 7 * 24 * 3600
+    explore_cache_path: str = ""
+
+    # Plans / recommendations cached per normalized profile bucket (+ seed)
+    plan_cache_size: int = 4096
+    plan_cache_ttl: float = 24 * 3600
+
+    # Recommender neighbour search: "brute" (exact cosine), "kd_tree" or "ball_tree"
+    recommender_index: str = "brute"
+
+    # Services warmed in the background at startup ("" = all, "none" = skip)
+    warmup_services: str = ""
+
+    # Persistence outbox towards the Node.js backend
+    node_backend_url: str = "http://localhost:5000"
+    node_timeout: float = 5.0
+    outbox_spool_path: str = "app/var/outbox.sqlite3"
+    outbox_batch_size: int = 500
+    outbox_flush_interval: float = 0.5
+    outbox_max_retries: int = 3
+    outbox_queue_size: int = 10_000
+
+    # Admin endpoints (/api/admin/*) need this token in X-Admin-Token ("" = disabled)
+    admin_token: str = ""
+
+    # Symptom descriptions added at runtime (admin API or *.csv dropped in the inbox)
+    symptom_additions_path: str = "app/var/symptom_additions.csv"
+    symptom_inbox_dir: str = "app/var/symptom_inbox"
+    symptom_refresh_interval: float = 5.0
+
+    # Request profiling (requires pyinstrument): off unless PROFILING_ENABLED=1.
+    # Profiles a sampled fraction of requests, plus any request sending
+    # X-Profile: 1 with a valid X-Admin-Token; see /api/admin/profiles
+    profiling_enabled: bool = False
+    profile_sample_rate: float = 0.0
+    profile_interval: float = 0.001  # seconds between samples
+    profile_dir: str = "app/var/profiles"
+    profile_format: str = "speedscope"  # or "html"
+    profile_max_files: int = 200
 
     class Config:
         env_file = ".env"
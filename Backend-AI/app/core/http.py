@@ -0,0 +1,152 @@
+# app/core/http.py
+"""
+App-scoped pooled HTTP client for the LLM providers.
+
+One ``httpx.AsyncClient`` is opened in the FastAPI lifespan and shared by every
+upstream call, so chat messages reuse kept-alive (optionally HTTP/2)
+connections instead of paying a TCP+TLS handshake each time. A semaphore caps
+concurrent upstream requests; the time spent waiting for it is recorded.
+"""
+
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import observe_upstream
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401  (installed by httpx[http2])
+    except ImportError:
+        return False
+    return True
+
+
+class LLMClient:
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "in_flight": 0,
+            "pool_wait_count": 0,
+            "pool_wait_seconds_total": 0.0,
+            "pool_wait_seconds_max": 0.0,
+            "streams": 0,
+            "ttft_seconds_total": 0.0,
+            "ttft_seconds_max": 0.0,
+        }
+
+    async def start(self) -> None:
+        if self._client is not None:
+            return
+        http2 = settings.llm_http2 and _http2_available()
+        if settings.llm_http2 and not http2:
+            logger.warning("[LLM] LLM_HTTP2 set but 'h2' is not installed; using HTTP/1.1")
+        self._client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(
+                settings.chat_timeout,
+                connect=settings.llm_connect_timeout,
+                pool=settings.llm_connect_timeout,
+            ),
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive,
+                keepalive_expiry=60.0,
+            ),
+        )
+        self._semaphore = asyncio.Semaphore(settings.llm_max_concurrency)
+        logger.info(
+            f"[LLM] pooled client ready (http2={http2}, "
+            f"max_concurrency={settings.llm_max_concurrency})"
+        )
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._semaphore = None
+
+    @asynccontextmanager
+    async def _slot(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._client is None:
+            # Hors lifespan (scripts, tests) : ouverture paresseuse
+            await self.start()
+        start = time.perf_counter()
+        async with self._semaphore:
+            waited = time.perf_counter() - start
+            self.stats["pool_wait_count"] += 1
+            self.stats["pool_wait_seconds_total"] += waited
+            self.stats["pool_wait_seconds_max"] = max(self.stats["pool_wait_seconds_max"], waited)
+            self.stats["requests"] += 1
+            self.stats["in_flight"] += 1
+            try:
+                yield self._client
+            except Exception:
+                self.stats["errors"] += 1
+                raise
+            finally:
+                self.stats["in_flight"] -= 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        async with self._slot() as client:
+            start = time.perf_counter()
+            try:
+                resp = await client.post(url, **kwargs)
+            except Exception:
+                observe_upstream("llm", "error", start)
+                raise
+            observe_upstream("llm", resp.status_code, start)
+            return resp
+
+    async def stream_sse(self, url: str, **kwargs) -> AsyncIterator[dict]:
+        """
+        POST ``url`` and yield each JSON ``data:`` event of the SSE response.
+        Upstream time-to-first-token (request sent → first event) is recorded.
+        """
+        async with self._slot() as client:
+            start = time.perf_counter()
+            first = True
+            status = "error"
+            try:
+                async with client.stream("POST", url, **kwargs) as resp:
+                    status = resp.status_code
+                    resp.raise_for_status()
+                    async for line in resp.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue  # keep-alive comments / blank separators
+                        data = line[5:].strip()
+                        if data == "[DONE]":
+                            break
+                        if first:
+                            ttft = time.perf_counter() - start
+                            self.stats["streams"] += 1
+                            self.stats["ttft_seconds_total"] += ttft
+                            self.stats["ttft_seconds_max"] = max(self.stats["ttft_seconds_max"], ttft)
+                            first = False
+                        yield json.loads(data)
+            finally:
+                # Durée du flux complet ; le statut est celui des en-têtes
+                observe_upstream("llm_stream", status, start)
+
+    def status(self) -> dict:
+        waits = self.stats["pool_wait_count"]
+        streams = self.stats["streams"]
+        return {
+            **self.stats,
+            "pool_wait_seconds_avg": self.stats["pool_wait_seconds_total"] / waits if waits else 0.0,
+            "ttft_seconds_avg": self.stats["ttft_seconds_total"] / streams if streams else 0.0,
+            "max_concurrency": settings.llm_max_concurrency,
+        }
+
+
+llm_client = LLMClient()
@@ -0,0 +1,74 @@
+# app/core/memory.py
+"""
+Per-process memory report: how much of a worker's resident memory is private
+and how much is shared with the other workers (preloaded pages inherited from
+the gunicorn master, memory-mapped artifacts).
+
+Linux only (``/proc/self/smaps_rollup`` and ``/proc/self/smaps``); elsewhere
+only the peak RSS from ``resource`` is reported.
+"""
+
+import os
+from pathlib import Path
+
+from app.core.artifacts import ARTIFACT_DIR
+
+# smaps_rollup fields reported, in kB in the file
+_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+    "Anonymous": "anonymous",
+    "Swap": "swap",
+}
+
+
+def _parse_kb(lines) -> dict[str, int]:
+    values = {}
+    for line in lines:
+        key, _, rest = line.partition(":")
+        if key in _FIELDS:
+            values[_FIELDS[key]] = int(rest.split()[0]) * 1024
+    return values
+
+
+def _mapped_artifacts() -> dict[str, int]:
+    """Rss / Pss of the memory-mapped artifact files, summed over their mappings."""
+    totals = {"files": 0, "rss": 0, "pss": 0}
+    prefix = str(ARTIFACT_DIR.resolve())
+    seen = set()
+    current = None
+    with open("/proc/self/smaps") as f:
+        for line in f:
+            head = line.split(None, 5)
+            # Ligne d'en-tête : "adresse perms offset dev inode chemin"
+            if len(head) >= 5 and "-" in head[0] and not head[0].endswith(":"):
+                path = head[5].strip() if len(head) == 6 else ""
+                current = path if path.startswith(prefix) else None
+                if current and current not in seen:
+                    seen.add(current)
+                    totals["files"] += 1
+            elif current and head[0] in ("Rss:", "Pss:"):
+                totals[head[0][:-1].lower()] += int(head[1]) * 1024
+    return totals
+
+
+def memory_report() -> dict:
+    report = {"pid": os.getpid(), "ppid": os.getppid()}
+    rollup = Path("/proc/self/smaps_rollup")
+    if rollup.exists():
+        with rollup.open() as f:
+            values = _parse_kb(f)
+        values["shared"] = values.get("shared_clean", 0) + values.get("shared_dirty", 0)
+        values["private"] = values.get("private_clean", 0) + values.get("private_dirty", 0)
+        report["bytes"] = values
+        report["mapped_artifacts"] = _mapped_artifacts()
+    else:
+        import resource
+
+        # ru_maxrss : kB sous Linux, octets sous macOS
+        report["max_rss"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return report
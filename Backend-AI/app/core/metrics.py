@@ -0,0 +1,243 @@
+# app/core/metrics.py
+"""
+Prometheus metrics served at ``GET /metrics``.
+
+- ``MetricsMiddleware`` (pure ASGI) counts every request and times it per
+  method and route template (``/api/chat``, not the raw path), until the last
+  body chunk is sent, so streamed replies are timed in full.
+- ``stage(name)`` times one step of a handler (validation, language detection,
+  upstream call, similarity search...) into ``medchat_stage_duration_seconds``.
+- ``observe_upstream`` records each call to the LLM providers / Node.js backend
+  with its status code (``error`` when no response came back).
+- Caches, single-flight groups, the LLM pool, the outbox and the session store
+  already keep counters: they are read at scrape time, not on the hot path.
+
+Labelled children are resolved once and kept, so an observation costs a dict
+lookup plus the histogram update (a few microseconds).
+
+Several gunicorn workers: set ``PROMETHEUS_MULTIPROC_DIR`` to an empty
+directory shared by the workers and the counters/histograms are aggregated
+across them (see gunicorn.conf.py); scrape-time values then carry a ``pid``
+label since they describe the worker that answered.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# De 100 µs (regex, recherche locale) à 30 s (LLM lent)
+BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+MULTIPROCESS = bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route template and status", ["method", "route", "status"]
+)
+http_duration = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request duration, until the last body chunk is sent",
+    ["method", "route"],
+    buckets=BUCKETS,
+)
+stage_duration = Histogram(
+    "medchat_stage_duration_seconds", "Duration of one step of a handler", ["stage"], buckets=BUCKETS
+)
+chat_requests = Counter(
+    "medchat_chat_requests_total",
+    "Chat messages by chat type and outcome (ok, rejected, empty, guarded, error)",
+    ["endpoint", "chat_type", "outcome"],
+)
+chat_duration = Histogram(
+    "medchat_chat_duration_seconds", "Chat message handling time", ["endpoint", "chat_type"], buckets=BUCKETS
+)
+upstream_requests = Counter(
+    "medchat_upstream_requests_total", "Calls to the LLM providers and the Node.js backend", ["target", "status"]
+)
+upstream_duration = Histogram(
+    "medchat_upstream_duration_seconds", "Upstream call duration", ["target"], buckets=BUCKETS
+)
+
+_children: dict[tuple, object] = {}
+
+
+def _child(metric, *labels: str):
+    key = (metric._name, *labels)
+    child = _children.get(key)
+    if child is None:
+        child = _children[key] = metric.labels(*labels)
+    return child
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block (sync or ``await``) as stage ``name``."""
+    hist = _child(stage_duration, name)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        hist.observe(time.perf_counter() - start)
+
+
+def observe_upstream(target: str, status: int | str, start: float) -> None:
+    _child(upstream_requests, target, str(status)).inc()
+    _child(upstream_duration, target).observe(time.perf_counter() - start)
+
+
+def observe_chat(endpoint: str, chat_type: str, outcome: str, start: float) -> None:
+    _child(chat_requests, endpoint, chat_type, outcome).inc()
+    _child(chat_duration, endpoint, chat_type).observe(time.perf_counter() - start)
+
+
+def route_template(scope) -> str:
+    """``/api/users/{id}`` for ``/api/users/42``; ``unmatched`` when no route answered."""
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    # Selon la version de FastAPI, la route d'un routeur inclus porte ou non son
+    # préfixe : on le retrouve en retirant la partie qu'elle a reconnue
+    try:
+        matched = getattr(route, "path_format", template).format(**scope.get("path_params", {}))
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    if matched and path.endswith(matched):
+        return path[: len(path) - len(matched)] + template
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Gabarit de la route : une série par endpoint, pas par URL (scans 404 compris)
+            path = route_template(scope)
+            method = scope["method"]
+            _child(http_requests, method, path, str(status)).inc()
+            _child(http_duration, method, path).observe(time.perf_counter() - start)
+
+
+class StateCollector:
+    """Counters the services already keep, read when Prometheus scrapes."""
+
+    def describe(self):
+        # Sans quoi register() appellerait collect() à l'import (import circulaire)
+        return []
+
+    def collect(self):
+        # Importés ici : ces modules importent celui-ci
+        from app.core.cache import CACHES
+        from app.core.http import llm_client
+        from app.core.singleflight import FLIGHTS
+        from app.services.outbox import outbox
+        from app.services.session_store import session_store
+
+        extra = ["pid"] if MULTIPROCESS else []
+        pid = [str(os.getpid())] if MULTIPROCESS else []
+
+        def counter(name, doc, labels=()):
+            return CounterMetricFamily(name, doc, labels=[*labels, *extra])
+
+        def gauge(name, doc, labels=()):
+            return GaugeMetricFamily(name, doc, labels=[*labels, *extra])
+
+        hits = counter("medchat_cache_hits", "Response cache hits", ["cache", "tier"])
+        misses = counter("medchat_cache_misses", "Response cache misses", ["cache"])
+        evictions = counter("medchat_cache_evictions", "Entries evicted from the memory tier", ["cache"])
+        size = gauge("medchat_cache_entries", "Entries in the memory tier", ["cache"])
+        for name, cache in CACHES.items():
+            s = cache.stats()
+            hits.add_metric([name, "memory", *pid], s["hits"] - s["disk_hits"])
+            hits.add_metric([name, "disk", *pid], s["disk_hits"])
+            misses.add_metric([name, *pid], s["misses"])
+            evictions.add_metric([name, *pid], s["evictions"])
+            size.add_metric([name, *pid], s["size"])
+        yield from (hits, misses, evictions, size)
+
+        calls = counter("medchat_singleflight_calls", "Calls executed vs. coalesced", ["group", "result"])
+        for name, flight in FLIGHTS.items():
+            s = flight.stats()
+            calls.add_metric([name, "executed", *pid], s["executed"])
+            calls.add_metric([name, "coalesced", *pid], s["coalesced"])
+        yield calls
+
+        s = llm_client.status()
+        in_flight = gauge("medchat_llm_in_flight", "LLM requests in flight")
+        in_flight.add_metric(pid, s["in_flight"])
+        wait = counter("medchat_llm_pool_wait_seconds", "Time spent waiting for an LLM slot")
+        wait.add_metric(pid, s["pool_wait_seconds_total"])
+        yield from (in_flight, wait)
+
+        s = outbox.status()
+        writes = counter("medchat_outbox_writes", "Writes towards Node.js by result", ["result"])
+        for result in ("enqueued", "sent", "spooled", "replayed", "dropped"):
+            writes.add_metric([result, *pid], s[result])
+        queued = gauge("medchat_outbox_queued", "Writes waiting in the outbox queue")
+        queued.add_metric(pid, s["queued"])
+        yield from (writes, queued)
+
+        s = session_store.stats()
+        if s["backend"] == "memory":
+            sessions = gauge("medchat_sessions", "Chat sessions held in memory")
+            sessions.add_metric(pid, s["sessions"])
+            size = gauge("medchat_sessions_bytes", "Approximate size of the stored histories")
+            size.add_metric(pid, s["bytes"])
+            dropped = counter("medchat_sessions_dropped", "Sessions evicted or expired", ["reason"])
+            dropped.add_metric(["evicted", *pid], s["evictions"])
+            dropped.add_metric(["expired", *pid], s["expirations"])
+            yield from (sessions, size, dropped)
+        else:
+            errors = counter("medchat_session_store_errors", "Session store calls that failed")
+            errors.add_metric(pid, s["errors"])
+            yield errors
+
+
+def _registry() -> CollectorRegistry:
+    if not MULTIPROCESS:
+        REGISTRY.register(StateCollector())
+        return REGISTRY
+    # Registre propre : les fichiers des workers sont agrégés à chaque scrape
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    registry.register(StateCollector())
+    return registry
+
+
+_registry_instance = _registry()
+
+
+def render() -> tuple[bytes, str]:
+    return generate_latest(_registry_instance), CONTENT_TYPE_LATEST
@@ -0,0 +1,132 @@
+# app/core/profiling.py
+"""
+Opt-in request profiling with pyinstrument (``pip install pyinstrument``).
+
+With ``PROFILING_ENABLED=1`` a ``ProfilingMiddleware`` is mounted; otherwise
+nothing is (not even a header check), so the disabled path costs nothing.
+A request runs under pyinstrument's sampling profiler when either:
+
+- it is drawn by ``PROFILE_SAMPLE_RATE`` (0.01 = 1 % of requests), or
+- it sends ``X-Profile: 1`` together with a valid ``X-Admin-Token``.
+
+The profiler samples the stack every ``PROFILE_INTERVAL`` seconds in async
+mode: time a handler spends awaiting (LLM call, Node write, thread pool) is
+attributed to the ``await`` that waited. Each profile is written to
+``PROFILE_DIR`` as a speedscope JSON flamegraph (open it on speedscope.app)
+or an HTML report, and its name is returned in the ``X-Profile-Id`` response
+header. Only the newest ``PROFILE_MAX_FILES`` files are kept.
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.security import is_admin
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+except ImportError:
+    Profiler = None
+
+PROFILE_DIR = Path(settings.profile_dir)
+
+# format → (suffix, renderer)
+FORMATS = {
+    "speedscope": (".speedscope.json", lambda: SpeedscopeRenderer()),
+    "html": (".html", lambda: HTMLRenderer()),
+}
+SUFFIXES = tuple(suffix for suffix, _ in FORMATS.values())
+
+_unsafe = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def profiling_available() -> bool:
+    if not settings.profiling_enabled:
+        return False
+    if Profiler is None:
+        logger.warning("[Profiling] PROFILING_ENABLED set but 'pyinstrument' is not installed; disabled")
+        return False
+    if settings.profile_format not in FORMATS:
+        logger.warning(f"[Profiling] unknown PROFILE_FORMAT '{settings.profile_format}'; disabled")
+        return False
+    return True
+
+
+def list_profiles() -> list[dict]:
+    """Newest first."""
+    if not PROFILE_DIR.is_dir():
+        return []
+    files = [f for f in PROFILE_DIR.iterdir() if f.name.endswith(SUFFIXES)]
+    files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+    return [
+        {"name": f.name, "bytes": f.stat().st_size, "created": f.stat().st_mtime} for f in files
+    ]
+
+
+def profile_path(name: str) -> Path | None:
+    """Path of profile ``name``, or None (unknown name, or not a plain file name)."""
+    if Path(name).name != name or not name.endswith(SUFFIXES):
+        return None
+    path = PROFILE_DIR / name
+    return path if path.is_file() else None
+
+
+def _write(profiler, name: str) -> None:
+    suffix, renderer = FORMATS[settings.profile_format]
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    # Écriture atomique : la liste admin ne voit jamais un fichier à moitié écrit
+    tmp = PROFILE_DIR / f".{name}.tmp"
+    tmp.write_text(profiler.output(renderer()), encoding="utf-8")
+    tmp.replace(PROFILE_DIR / name)
+
+    for old in list_profiles()[settings.profile_max_files:]:
+        (PROFILE_DIR / old["name"]).unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        if settings.profile_sample_rate and random.random() < settings.profile_sample_rate:
+            return True
+        headers = dict(scope["headers"])
+        if headers.get(b"x-profile") not in (b"1", b"true"):
+            return False
+        token = headers.get(b"x-admin-token")
+        return is_admin(token.decode("latin-1") if token else None)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        suffix, _ = FORMATS[settings.profile_format]
+        slug = _unsafe.sub("_", scope["path"].strip("/")) or "root"
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{scope['method']}-{slug[:80]}"
+        name += f"-{random.randrange(16**6):06x}{suffix}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (b"x-profile-id", name.encode())]
+            await send(message)
+
+        profiler = Profiler(interval=settings.profile_interval, async_mode="enabled")
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            try:
+                await asyncio.to_thread(_write, profiler, name)
+            except Exception as e:
+                logger.warning(f"[Profiling] could not write {name}: {e!r}")
+            else:
+                logger.info(f"[Profiling] {scope['method']} {scope['path']} → {PROFILE_DIR / name}")
@@ -0,0 +1,23 @@
+# app/core/security.py
+"""
+Guard for operator-only endpoints: the caller must send ``X-Admin-Token``
+equal to ``settings.admin_token``. With no token configured they are disabled.
+"""
+
+import hmac
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.core.config import settings
+
+
+def is_admin(token: Optional[str]) -> bool:
+    return bool(settings.admin_token and token and hmac.compare_digest(token, settings.admin_token))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not settings.admin_token:
+        raise HTTPException(status_code=503, detail="Admin API disabled (ADMIN_TOKEN not set)")
+    if not is_admin(x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
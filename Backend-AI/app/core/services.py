@@ -0,0 +1,133 @@
+# app/core/services.py
+"""
+Lazily initialized services.
+
+Datasets and fitted models are no longer loaded at import time: each service
+module registers a loader here and reads its state through ``get_service``.
+The first call loads it (thread-safe, exactly once); the app lifespan warms
+them all concurrently in the background so readiness can be reported.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Any, Callable
+
+from app.core.logger import logger
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+
+class LazyService:
+    def __init__(self, name: str, loader: Callable[[], Any]):
+        self.name = name
+        self.loader = loader
+        self.state = PENDING
+        self.error: str | None = None
+        self.load_seconds: float | None = None
+        self._value: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def get(self) -> Any:
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            if self.state == READY:
+                return self._value
+            self.state = LOADING
+            start = time.perf_counter()
+            try:
+                self._value = self.loader()
+            except Exception as e:
+                # Retenté au prochain appel ; /health/ready reste en échec
+                self.state = FAILED
+                self.error = f"{type(e).__name__}: {e}"
+                logger.exception(f"[Services] failed to load {self.name}")
+                raise
+            self.load_seconds = round(time.perf_counter() - start, 3)
+            self.state = READY
+            self.error = None
+            logger.info(f"[Services] {self.name} ready in {self.load_seconds}s")
+            return self._value
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "error": self.error,
+        }
+
+
+_REGISTRY: dict[str, LazyService] = {}
+
+
+def register(name: str, loader: Callable[[], Any]) -> LazyService:
+    """Register (or return the already registered) lazy service ``name``."""
+    if name not in _REGISTRY:
+        _REGISTRY[name] = LazyService(name, loader)
+    return _REGISTRY[name]
+
+
+def get_service(name: str) -> Any:
+    """Single accessor: return the loaded state of ``name``, loading it if needed."""
+    return _REGISTRY[name].get()
+
+
+def registered() -> list[str]:
+    return list(_REGISTRY)
+
+
+def status(names: list[str] | None = None) -> dict[str, dict]:
+    names = names if names is not None else registered()
+    return {
+        name: _REGISTRY[name].status() if name in _REGISTRY else {"state": "unknown"}
+        for name in names
+    }
+
+
+def all_ready(names: list[str] | None = None) -> bool:
+    names = names if names is not None else registered()
+    return all(name in _REGISTRY and _REGISTRY[name].ready for name in names)
+
+
+async def warmup(names: list[str] | None = None) -> None:
+    """Load the given (default: all) services concurrently in worker threads."""
+    names = names if names is not None else registered()
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(asyncio.to_thread(_REGISTRY[name].get) for name in names if name in _REGISTRY),
+        return_exceptions=True,
+    )
+    failed = sum(isinstance(r, Exception) for r in results)
+    logger.info(
+        f"[Services] warmup of {len(results)} services done in "
+        f"{time.perf_counter() - start:.2f}s ({failed} failed)"
+    )
+
+
+def preload(names: list[str] | None = None) -> int:
+    """
+    Load services synchronously in the current process, for preload-then-fork:
+    the gunicorn master calls this before forking so workers inherit the
+    loaded state copy-on-write instead of each building a private copy.
+    Returns the number of services that failed (they load lazily in workers).
+    """
+    names = names if names is not None else registered()
+    start = time.perf_counter()
+    failed = 0
+    for name in names:
+        if name not in _REGISTRY:
+            continue
+        try:
+            _REGISTRY[name].get()
+        except Exception:
+            failed += 1
+    logger.info(
+        f"[Services] preloaded {len(names) - failed}/{len(names)} services "
+        f"in {time.perf_counter() - start:.2f}s"
+    )
+    return failed
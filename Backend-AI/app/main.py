@@ -1,15 +1,50 @@
-from fastapi import FastAPI
-from app.routers import chat, plan_generator, diabetes,blood_pressure_router
+import asyncio
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
+from app.routers import chat, plan_generator, diabetes,blood_pressure_router, recommender_router, health, admin, nutrition
+from app.core import services
+from app.core.config import settings
+from app.core.http import llm_client
+from app.core.metrics import MetricsMiddleware, render
+from app.core.profiling import ProfilingMiddleware, profiling_available
+from app.services.outbox import outbox
+from app.services.disease_matcher import symptom_updater
+from app.services.session_store import session_store
 from fastapi.middleware.cors import CORSMiddleware
 
 
-app = FastAPI(title="Medical Chat API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Les services se chargent à la demande ; on les préchauffe en tâche de fond
+    # pour accepter les connexions immédiatement (voir /health/ready)
+    names = [n.strip() for n in settings.warmup_services.split(",") if n.strip()]
+    warmup_task = None
+    if names != ["none"]:
+        warmup_task = asyncio.create_task(services.warmup(names or None))
+    await llm_client.start()
+    await outbox.start()
+    await symptom_updater.start()
+    yield
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await symptom_updater.stop()
+    await outbox.stop()
+    await llm_client.close()
+    await session_store.close()
+
+
+app = FastAPI(title="Medical Chat API", lifespan=lifespan)
 
 # Inclure les routeurs séparément
+app.include_router(health.router)
 app.include_router(chat.router, prefix="/api")
 app.include_router(plan_generator.router, prefix="/api")
 app.include_router(diabetes.router, prefix="/api")
 app.include_router(blood_pressure_router.router, prefix="/api", tags=["Blood Pressure Prediction"])
+app.include_router(recommender_router.router, prefix="/api")
+app.include_router(nutrition.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
 
 # Middleware CORS
 app.add_middleware(
@@ -20,7 +55,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profilage à la demande : sans PROFILING_ENABLED, rien n'est monté
+if profiling_available():
+    app.add_middleware(ProfilingMiddleware)
+
+# Ajouté en dernier : le plus externe, il chronomètre toute la pile
+app.add_middleware(MetricsMiddleware)
+
 
 @app.get("/")
 def root():
     return {"message": "MedChat API is running 🚀"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
@@ -6,17 +6,63 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.neighbors import NearestNeighbors
 from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import normalize
 from app.utils.parser import extract_items
 import random
 
+# Neighbour search: "brute" (exact cosine, the reference) or a tree over
+# L2-normalized vectors, where euclidean order = cosine order
+INDEX_MODES = {"brute": None, "kd_tree": "kd_tree", "ball_tree": "ball_tree"}
+
+# Profiles per kneighbors call in match_batch (bounds the distance block)
+BATCH_CHUNK = 1024
+
+NUM_FEATURES = ["age", "height", "weight", "bmi"]
+CAT_FEATURES = ["sex", "hypertension", "diabetes", "level", "fitness_goal", "fitness_type"]
+FEATURES = [
+    "sex",
+    "age",
+    "height",
+    "weight",
+    "bmi",
+    "hypertension",
+    "diabetes",
+    "level",
+    "fitness_goal",
+    "fitness_type",
+]
+
+
+def _split(value) -> list[str]:
+    return [e.strip() for e in value.split(",")] if isinstance(value, str) else []
+
+
+def _program_day(row) -> dict:
+    """Parsed program of one dataset row (everything but the day number)."""
+    diet = row["diet"] if isinstance(row["diet"], str) else ""
+    return {
+        "exercises": _split(row["exercises"]),
+        "equipment": _split(row["equipment"]),
+        "nutrition": {
+            "vegetables": extract_items(diet, "Vegetables"),
+            "proteins": extract_items(diet, "Protein Intake"),
+            "juice": extract_items(diet, "Juice"),
+        },
+        "tips": row["recommendation"] if isinstance(row["recommendation"], str) else None,
+    }
+
 
 class KNNFitnessRecommender:
-    def __init__(self, data_path: str, n_neighbors: int = 10):
+    def __init__(self, data_path: str, n_neighbors: int = 10, index: str = "brute"):
+        if index not in INDEX_MODES:
+            raise ValueError(f"Unknown index mode {index!r} (expected one of {list(INDEX_MODES)})")
         self.data_path = data_path
         self.n_neighbors = n_neighbors
+        self.index = index
         self.pipeline = None
         self.data = None
         self.nn_model = None
+        self.index_model = None
 
     def load_and_prepare_data(self):
         df = pd.read_csv(self.data_path)
@@ -25,19 +71,6 @@ class KNNFitnessRecommender:
         df.dropna(thresh=6, inplace=True)
         self.data = df
 
-        features = [
-            "sex",
-            "age",
-            "height",
-            "weight",
-            "bmi",
-            "hypertension",
-            "diabetes",
-            "level",
-            "fitness_goal",
-            "fitness_type",
-        ]
-
         column_transformer = ColumnTransformer(
             transformers=[
                 (
@@ -48,19 +81,12 @@ class KNNFitnessRecommender:
                             ("scaler", StandardScaler()),
                         ]
                     ),
-                    ["age", "height", "weight", "bmi"],
+                    NUM_FEATURES,
                 ),
                 (
                     "cat",
                     OneHotEncoder(handle_unknown="ignore"),
-                    [
-                        "sex",
-                        "hypertension",
-                        "diabetes",
-                        "level",
-                        "fitness_goal",
-                        "fitness_type",
-                    ],
+                    CAT_FEATURES,
                 ),
             ]
         )
@@ -68,52 +94,111 @@ class KNNFitnessRecommender:
         self.pipeline = Pipeline(steps=[("preprocessor", column_transformer)])
         self.nn_model = NearestNeighbors(n_neighbors=self.n_neighbors, metric="cosine")
 
-        X = self.pipeline.fit_transform(self.data[features])
+        X = self.pipeline.fit_transform(self.data[FEATURES])
         self.nn_model.fit(X)
+        if INDEX_MODES[self.index]:
+            self.index_model = NearestNeighbors(
+                n_neighbors=self.n_neighbors, algorithm=INDEX_MODES[self.index]
+            ).fit(normalize(X))
+        self._prepare_fast_path()
 
-    def match(self, user_input: dict, days_per_week: int = 4):
-        features = [
-            "sex",
-            "age",
-            "height",
-            "weight",
-            "bmi",
-            "hypertension",
-            "diabetes",
-            "level",
-            "fitness_goal",
-            "fitness_type",
-        ]
-        X_input = self.pipeline.transform(pd.DataFrame([user_input], columns=features))
-        distances, indices = self.nn_model.kneighbors(X_input)
+    def _prepare_fast_path(self):
+        """
+        Pull the fitted imputer/scaler/one-hot parameters out of the pipeline so a
+        profile is encoded with plain NumPy, and parse every row's program once.
+        """
+        transformer = self.pipeline.named_steps["preprocessor"]
+        num = transformer.named_transformers_["num"]
+        self._num_fill = num.named_steps["imputer"].statistics_.astype(float)
+        self._num_mean = num.named_steps["scaler"].mean_.astype(float)
+        self._num_scale = num.named_steps["scaler"].scale_.astype(float)
 
-        matched_rows = self.data.iloc[indices[0]].drop_duplicates(
-            subset=["exercises", "equipment", "diet"]
-        )
-        if len(matched_rows) < days_per_week:
-            matched_rows = self.data.sample(n=days_per_week)
-        else:
-            matched_rows = matched_rows.sample(n=days_per_week)
-
-        program = []
-
-        for i, (_, row) in enumerate(matched_rows.iterrows()):
-            program.append(
-                {
-                    "day": i + 1,
-                    "exercises": [e.strip() for e in row["exercises"].split(",")],
-                    "equipment": [e.strip() for e in row["equipment"].split(",")],
-                    "nutrition": {
-                        "vegetables": extract_items(row["diet"], "Vegetables"),
-                        "proteins": extract_items(row["diet"], "Protein Intake"),
-                        "juice": extract_items(row["diet"], "Juice"),
-                    },
-                    "tips": row["recommendation"],
-                }
+        # Colonne de sortie de chaque modalité, dans l'ordre du ColumnTransformer
+        self._cat_columns = []
+        offset = len(NUM_FEATURES)
+        for feature, categories in zip(
+            CAT_FEATURES, transformer.named_transformers_["cat"].categories_
+        ):
+            self._cat_columns.append(
+                (feature, {value: offset + i for i, value in enumerate(categories)})
+            )
+            offset += len(categories)
+        self._width = offset
+
+        self._programs = [_program_day(row) for row in self.data.to_dict("records")]
+        # Same rows as drop_duplicates(subset=["exercises", "equipment", "diet"])
+        self._program_ids = pd.factorize(
+            pd.MultiIndex.from_frame(
+                self.data[["exercises", "equipment", "diet"]].astype(str)
             )
+        )[0]
+
+    def encode(self, profiles: list[dict]) -> np.ndarray:
+        """Same vectors as ``pipeline.transform`` for validated profile dicts."""
+        X = np.zeros((len(profiles), self._width))
+        num = np.array(
+            [[p.get(c) for c in NUM_FEATURES] for p in profiles], dtype=float
+        ).reshape(len(profiles), len(NUM_FEATURES))
+        num = np.where(np.isnan(num), self._num_fill, num)
+        X[:, : len(NUM_FEATURES)] = (num - self._num_mean) / self._num_scale
+        for feature, columns in self._cat_columns:
+            cols = [columns.get(p.get(feature), -1) for p in profiles]  # inconnue : ignorée
+            rows = [i for i, c in enumerate(cols) if c >= 0]
+            X[rows, [cols[i] for i in rows]] = 1.0
+        return X
+
+    def kneighbors(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Cosine distances and row indices of the nearest rows, per the index mode."""
+        if self.index_model is None:
+            return self.nn_model.kneighbors(X)
+        distances, indices = self.index_model.kneighbors(normalize(X))
+        # |a - b|² = 2 (1 - cos) for unit vectors
+        return distances**2 / 2, indices
+
+    def _program(
+        self,
+        user_input: dict,
+        neighbours: np.ndarray,
+        days_per_week: int,
+        rng: random.Random | None = None,
+    ) -> dict:
+        rng = rng or random
+        # Neighbours with distinct programs, nearest first
+        rows, seen = [], set()
+        for i in neighbours:
+            pid = self._program_ids[i]
+            if pid not in seen:
+                seen.add(pid)
+                rows.append(int(i))
+        if len(rows) < days_per_week:
+            rows = rng.sample(range(len(self._programs)), days_per_week)
+        else:
+            rows = rng.sample(rows, days_per_week)
+
+        program = [
+            {"day": day, **self._programs[i]} for day, i in enumerate(rows, start=1)
+        ]
 
         return {
             "profile": user_input,
             "days_per_week": days_per_week,
             "program": program,
         }
+
+    def match(self, user_input: dict, days_per_week: int = 4, rng: random.Random | None = None):
+        distances, indices = self.kneighbors(self.encode([user_input]))
+        return self._program(user_input, indices[0], days_per_week, rng)
+
+    def match_batch(self, user_inputs: list[dict], days_per_week: list[int] | int = 4) -> list[dict]:
+        """``match`` for many profiles: one encode and one kneighbors per chunk."""
+        if isinstance(days_per_week, int):
+            days_per_week = [days_per_week] * len(user_inputs)
+        results = []
+        for start in range(0, len(user_inputs), BATCH_CHUNK):
+            chunk = user_inputs[start : start + BATCH_CHUNK]
+            distances, indices = self.kneighbors(self.encode(chunk))
+            for user_input, neighbours, days in zip(
+                chunk, indices, days_per_week[start : start + BATCH_CHUNK]
+            ):
+                results.append(self._program(user_input, neighbours, days))
+        return results
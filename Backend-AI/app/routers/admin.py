@@ -0,0 +1,75 @@
+# routers/admin.py
+import asyncio
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+
+from app.core.profiling import list_profiles, profile_path
+from app.core.security import require_admin
+from app.services.disease_matcher import (
+    add_symptom_examples,
+    resolve_label,
+    symptom_index_status,
+)
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+MAX_SYMPTOM_BATCH = 10_000
+
+
+class SymptomExample(BaseModel):
+    text: str = Field(..., min_length=3)
+    label: Optional[int] = None  # id from mapping.json
+    disease: Optional[str] = None  # or the disease name
+
+
+class SymptomBatch(BaseModel):
+    items: List[SymptomExample] = Field(..., min_length=1, max_length=MAX_SYMPTOM_BATCH)
+
+
+def _resolve(items: List[SymptomExample]) -> tuple[list, list]:
+    pairs, rejected = [], []
+    for i, item in enumerate(items):
+        label = resolve_label(item.label, item.disease)
+        if label is None:
+            rejected.append({"index": i, "label": item.label, "disease": item.disease})
+        else:
+            pairs.append((item.text, label))
+    return pairs, rejected
+
+
+@router.post("/symptoms", status_code=202)
+async def add_symptoms(payload: SymptomBatch):
+    """
+    Queue labelled symptom descriptions; every worker applies them in the
+    background (see /api/admin/symptoms for progress).
+    """
+    pairs, rejected = await asyncio.to_thread(_resolve, payload.items)
+    if rejected:
+        raise HTTPException(status_code=422, detail={"unknown_disease": rejected})
+    await asyncio.to_thread(add_symptom_examples, pairs)
+    return {"accepted": len(pairs)}
+
+
+@router.get("/symptoms")
+def symptoms_status():
+    """Rows in this worker's symptom index and log bytes not applied yet."""
+    return symptom_index_status()
+
+
+@router.get("/profiles")
+def profiles():
+    """Request profiles written by the profiling middleware, newest first."""
+    return {"profiles": list_profiles()}
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    """One profile file (speedscope JSON: open it on https://www.speedscope.app)."""
+    path = profile_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Unknown profile")
+    media_type = "text/html" if name.endswith(".html") else "application/json"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -1,12 +1,16 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 import numpy as np
-import requests
-from app.services.blood_pressure_service import predict_hypertension
+from app.services.outbox import outbox
+from app.services.blood_pressure_service import (
+    predict_hypertension,
+    predict_hypertension_batch,
+)
 
 router = APIRouter()
 
-NODE_HYPERTENSION_URL = "http://localhost:5000/api/save1"
+MAX_BATCH_SIZE = 50_000
 
 class BloodPressureInput(BaseModel):
     age: int
@@ -14,6 +18,9 @@ class BloodPressureInput(BaseModel):
     diastolic_pressure: float
     user_id: str  # pour associer la prédiction à un utilisateur
 
+class BloodPressureBatchInput(BaseModel):
+    records: List[BloodPressureInput] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
 @router.post("/blood_pressure/predict")
 async def predict(data: BloodPressureInput):
     input_data = np.array([[ 
@@ -28,10 +35,37 @@ async def predict(data: BloodPressureInput):
         "result": result
     }
 
-    try:
-        res = requests.post(NODE_HYPERTENSION_URL, json=payload)
-        res.raise_for_status()
-    except Exception as e:
-        print("❌ Failed to send hypertension prediction:", e)
+    # Persisté en tâche de fond : la latence ne dépend plus de Node.js
+    outbox.enqueue("hypertension", payload)
 
     return {"prediction": result}
+
+
+@router.post("/blood_pressure/predict_batch")
+def predict_batch(data: BloodPressureBatchInput):
+    # Une seule matrice [n,3] → un seul predict_proba pour tout le lot
+    input_data = np.array(
+        [
+            (r.age, r.systolic_pressure, r.diastolic_pressure)
+            for r in data.records
+        ],
+        dtype=float,
+    )
+
+    results = predict_hypertension_batch(input_data)
+
+    # Envoyé vers Node.js par lots (routes bulk) via l'outbox
+    outbox.enqueue_many(
+        "hypertension",
+        [
+            {
+                "userId": r.user_id,
+                "input": r.dict(exclude={"user_id"}),
+                "result": res["prediction"],
+                "probability": res["probability"],
+            }
+            for r, res in zip(data.records, results)
+        ],
+    )
+
+    return {"count": len(results), "predictions": results}
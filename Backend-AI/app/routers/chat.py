@@ -1,9 +1,19 @@
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+import json
 import re
+import time
 
-from app.services.deepseek_client import get_response
+from app.services.deepseek_client import get_response, stream_response
+from app.services.domain_classifier import (
+    food_classifier,
+    is_food_related,
+    is_medical_question,
+    medical_classifier,
+)
 from app.core.logger import logger
+from app.core.metrics import observe_chat, stage
 
 router = APIRouter()
 
@@ -31,93 +41,75 @@ CHAT_VALIDATIONS = {
     }
 }
 
-# Liste de domaines médicaux (français et anglais)
-MEDICAL_DOMAINS = [
-    r"médic", r"health", r"santé", r"illness", r"maladie", r"condition",
-    r"symptom", r"symptôme", r"douleur", r"pain", r"fièvre", r"fever",
-    r"toux", r"cough", r"nausée", r"nausea", r"vertige", r"dizziness",
-    r"fatigue", r"tiredness", r"infection", r"inflammation", r"blessure",
-    r"injury", r"fracture", r"brûlure", r"burn", r"allergie", r"allergy",
-    r"éruption", r"rash", r"vomit", r"vomissement", r"cardiaque", r"cardiac",
-    r"respiratoire", r"respiratory", r"digestif", r"digestive", r"nerveux",
-    r"nervous", r"musculo", r"muscular", r"squelettique", r"skeletal",
-    r"endocrinien", r"endocrine", r"immunitaire", r"immune", r"reproducteur",
-    r"reproductive", r"blood", r"sang", r"médicament", r"drug", r"traitement",
-    r"treatment", r"thérapie", r"therapy", r"vaccin", r"vaccine", r"chirurgie",
-    r"surgery", r"diagnostic", r"prévention", r"prevention", r"rétablissement",
-    r"recovery", r"réhabilitation", r"rehab", r"tête", r"head", r"coeur", r"heart",
-    r"poumon", r"lung", r"estomac", r"stomach", r"foie", r"liver", r"rein", r"kidney",
-    r"muscle", r"os", r"bone", r"peau", r"skin", r"yeux", r"eyes", r"oreille", r"ear",
-    r"nez", r"nose", r"gorge", r"throat", r"dent", r"tooth", r"brain", r"cerveau",
-    r"spine", r"colonne", r"médecin", r"doctor", r"infirmier", r"nurse", r"hôpital",
-    r"hospital", r"clinique", r"clinic", r"urgence", r"emergency", r"généraliste",
-    r"GP", r"spécialiste", r"specialist", r"dermatologue", r"dermatologist",
-    r"cardiologue", r"cardiologist", r"neurologue", r"neurologist", r"pédiatre",
-    r"pediatrician", r"gynécologue", r"gynecologist", r"psychiatre", r"psychiatrist",
-    r"cancer", r"diabète", r"diabetes", r"asthme", r"asthma", r"hypertension",
-    r"cholestérol", r"cholesterol", r"depression", r"dépression", r"anxiété", r"anxiety",
-    r"arthrite", r"arthritis", r"alzheimer", r"parkinson", r"epilepsy", r"épilepsie"
-]
-
-# Termes alimentaires (français et anglais)
-FOOD_DOMAINS = [
-    r"food", r"aliment", r"nourriture", r"nutrition", r"nutritif", r"meal", r"repas",
-    r"fruit", r"fruits", r"légume", r"vegetable", r"viande", r"meat", r"poisson", r"fish",
-    r"produit laitier", r"dairy", r"céréale", r"grain", r"légumineuse", r"legume",
-    r"noix", r"nut", r"graine", r"seed", r"épice", r"spice", r"herbe", r"herb",
-    r"boisson", r"drink", r"recette", r"recipe", r"cuisine", r"cooking", r"calorie",
-    r"protéine", r"protein", r"glucide", r"carb", r"carbohydrate", r"lipide", r"fat",
-    r"vitamine", r"vitamin", r"minéral", r"mineral", r"fibre", r"fiber", r"régime",
-    r"diet", r"allergie alimentaire", r"food allergy", r"intolérance", r"intolerance",
-    r"valeur nutritive", r"nutritional value", r"composition", r"ingrédient", r"ingredient",
-    r"bienfait", r"benefit", r"healthy", r"sain", r"manger", r"eat", r"consommer", r"consume",
-    r"apple", r"pomme", r"banana", r"banane", r"orange", r"tomato", r"tomate", r"potato",
-    r"patate", r"riz", r"rice", r"pâtes", r"pasta", r"pain", r"bread", r"fromage", r"cheese",
-    r"lait", r"milk", r"œuf", r"egg", r"sucre", r"sugar", r"sel", r"salt", r"huile", r"oil",
-    r"beurre", r"butter", r"yaourt", r"yogurt", r"café", r"coffee", r"thé", r"tea", r"eau", r"water"
-]
-
-def is_medical_question(prompt: str) -> bool:
-    """Vérifie si la question concerne le domaine médical"""
-    prompt_lower = prompt.lower()
-    return any(re.search(domain, prompt_lower) for domain in MEDICAL_DOMAINS)
-
-def is_food_related(prompt: str) -> bool:
-    """Vérifie si la question concerne l'alimentation"""
-    prompt_lower = prompt.lower()
-    return any(re.search(domain, prompt_lower) for domain in FOOD_DOMAINS)
+# Garde-fou appliqué à la réponse : (classifieur, message de refus)
+REPLY_GUARDS = {
+    "symptom": (medical_classifier, "⚠️ I can only provide medical information. Please ask a health-related question."),
+    "explore": (medical_classifier, "⚠️ I can only provide medical information. Please ask a health-related question."),
+    "food": (food_classifier, "⚠️ I can only provide food and nutrition information. Please ask a food-related question."),
+}
 
-@router.post(
-    "/chat",
-    response_model=ChatResponse,
-    summary="Send a message to the medical chat bot",
-)
-async def chat_handler(payload: ChatRequest) -> ChatResponse:
+ERROR_MESSAGES = {
+    "symptom": "⚠️ Unable to analyze symptoms. Please try again with more details.",
+    "explore": "⚠️ Could not find information. Please try a different query.",
+    "food": "⚠️ Could not find nutritional information. Please try a different food.",
+}
+
+
+def _validate(payload: ChatRequest) -> str | None:
+    """Retourne le message d'erreur si la requête est invalide, sinon None."""
     # Vérification du type de chat
     if payload.chat_type not in CHAT_VALIDATIONS:
-        return ChatResponse(response="Invalid chat type")
+        return "Invalid chat type"
 
     validation = CHAT_VALIDATIONS[payload.chat_type]
     
     # Validation de la longueur minimale
     if "min_length" in validation:
         if len(payload.prompt.strip()) < validation["min_length"]:
-            return ChatResponse(response=validation["error_message"])
+            return validation["error_message"]
     
     # Validation du nombre de mots
     if "min_words" in validation:
         word_count = len(re.findall(r'\w+', payload.prompt))
         if word_count < validation["min_words"]:
-            return ChatResponse(response=validation["error_message"])
+            return validation["error_message"]
     
     # Vérification du domaine selon le type de chat
     if payload.chat_type in ["symptom", "explore"]:
         if not is_medical_question(payload.prompt):
-            return ChatResponse(response="Please ask a health or medical-related question")
+            return "Please ask a health or medical-related question"
     
     elif payload.chat_type == "food":
         if not is_food_related(payload.prompt):
-            return ChatResponse(response="Please ask a food or nutrition-related question")
+            return "Please ask a food or nutrition-related question"
+
+    return None
+
+
+def _checked(payload: ChatRequest) -> tuple[str | None, str]:
+    """Validation timed as a stage, plus a bounded chat_type label for the metrics."""
+    with stage("chat.validate"):
+        error = _validate(payload)
+    return error, payload.chat_type if payload.chat_type in CHAT_VALIDATIONS else "invalid"
+
+
+def _guard_passes(guard, text: str, partial: bool = False, pos: int = 0) -> bool:
+    """``partial``: ``text`` ends a reply still being streamed; ``pos``: see ``matches``."""
+    with stage("chat.reply_guard"):
+        return guard[0].matches_prefix(text, pos) if partial else guard[0].matches(text, pos)
+
+
+@router.post(
+    "/chat",
+    response_model=ChatResponse,
+    summary="Send a message to the medical chat bot",
+)
+async def chat_handler(payload: ChatRequest) -> ChatResponse:
+    started = time.perf_counter()
+    error, chat_type = _checked(payload)
+    if error:
+        observe_chat("chat", chat_type, "rejected", started)
+        return ChatResponse(response=error)
 
     # Traitement de la requête
     try:
@@ -134,30 +126,127 @@ async def chat_handler(payload: ChatRequest) -> ChatResponse:
         # Vérification de la réponse vide
         if not reply or not reply.strip():
             logger.warning(f"Empty response for session: {payload.session_id}")
+            observe_chat("chat", chat_type, "empty", started)
             return ChatResponse(response="⚠️ I couldn't generate a response. Please try again with more details.")
         
         # Vérification de la pertinence de la réponse
-        if payload.chat_type in ["symptom", "explore"]:
-            if not is_medical_question(reply):
-                logger.warning(f"Non-medical response detected: {reply[:50]}...")
-                return ChatResponse(response="⚠️ I can only provide medical information. Please ask a health-related question.")
-        
-        elif payload.chat_type == "food":
-            if not is_food_related(reply):
-                logger.warning(f"Non-food response detected: {reply[:50]}...")
-                return ChatResponse(response="⚠️ I can only provide food and nutrition information. Please ask a food-related question.")
+        guard = REPLY_GUARDS.get(payload.chat_type)
+        if guard and not _guard_passes(guard, reply):
+            logger.warning(f"Off-domain {payload.chat_type} response detected: {reply[:50]}...")
+            observe_chat("chat", chat_type, "guarded", started)
+            return ChatResponse(response=guard[1])
         
+        observe_chat("chat", chat_type, "ok", started)
         return ChatResponse(response=reply)
 
     except Exception as e:
         logger.exception(f"Error in chat_handler: {str(e)}")
+        observe_chat("chat", chat_type, "error", started)
         
         # Messages d'erreur spécifiques
-        if payload.chat_type == "symptom":
-            return ChatResponse(response="⚠️ Unable to analyze symptoms. Please try again with more details.")
-        elif payload.chat_type == "explore":
-            return ChatResponse(response="⚠️ Could not find information. Please try a different query.")
-        elif payload.chat_type == "food":
-            return ChatResponse(response="⚠️ Could not find nutritional information. Please try a different food.")
-        
-        return ChatResponse(response="Internal chat error")
\ No newline at end of file
+        return ChatResponse(response=ERROR_MESSAGES.get(payload.chat_type, "Internal chat error"))
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post(
+    "/chat/stream",
+    summary="Stream the chat bot reply as server-sent events",
+)
+async def chat_stream_handler(payload: ChatRequest) -> StreamingResponse:
+    """
+    Events: ``token`` ({"text"}) for each chunk, then ``done`` with timings.
+    The domain guard is monotone (one matching term is enough), so chunks are
+    held back only until the accumulated reply passes it; a reply that never
+    passes is replaced by the refusal message, exactly like ``/chat``. Each
+    chunk is checked together with the last ``max_span`` characters before it
+    (a term split across chunks is still found), not the whole reply again;
+    a term touching the end of the received text waits for the next chunk.
+    A few more characters are kept before that window, as context only: a
+    word cut by the window is not taken for a word start ("ear" in "year").
+    """
+    started = time.perf_counter()
+
+    async def events():
+        ttft = None
+
+        def emit(text: str) -> str:
+            nonlocal ttft
+            if ttft is None:
+                ttft = time.perf_counter() - started
+            return _sse("token", {"text": text})
+
+        def done(status: str) -> str:
+            observe_chat("stream", chat_type, status, started)
+            total = time.perf_counter() - started
+            logger.info(
+                f"[Chat][{payload.session_id}] stream {status}: "
+                f"ttft={ttft or total:.3f}s total={total:.3f}s"
+            )
+            return _sse("done", {
+                "status": status,
+                "ttft_ms": round((ttft or total) * 1000, 1),
+                "total_ms": round(total * 1000, 1),
+            })
+
+        error, chat_type = _checked(payload)
+        if error:
+            yield emit(error)
+            yield done("rejected")
+            return
+
+        logger.info(
+            f"[Chat][{payload.session_id}] {payload.chat_type} (stream) → {payload.prompt}"
+        )
+        guard = REPLY_GUARDS.get(payload.chat_type)
+        buffered: list[str] = []
+        tail = ""  # fin du texte déjà vérifié, assez longue pour le plus long terme
+        start = 0  # début de la fenêtre dans tail, ce qui précède n'est que du contexte
+        passed = guard is None
+        try:
+            async for chunk in stream_response(
+                session_id=payload.session_id,
+                user_input=payload.prompt,
+                chat_type=payload.chat_type,
+            ):
+                if passed:
+                    yield emit(chunk)
+                    continue
+                buffered.append(chunk)
+                window = tail + chunk
+                if _guard_passes(guard, window, partial=True, pos=start):
+                    passed = True
+                    yield emit("".join(buffered))
+                else:
+                    tail = window[-(guard[0].max_span + guard[0].context) :]
+                    start = max(0, len(tail) - guard[0].max_span)
+        except Exception as e:
+            logger.exception(f"Error in chat_stream_handler: {str(e)}")
+            yield _sse("error", {"text": ERROR_MESSAGES.get(payload.chat_type, "Internal chat error")})
+            yield done("error")
+            return
+
+        if not passed and _guard_passes(guard, tail, pos=start):
+            # Terme en toute fin de réponse : confirmé seulement maintenant
+            passed = True
+            yield emit("".join(buffered))
+
+        if not passed:
+            reply = "".join(buffered)
+            if not reply.strip():
+                logger.warning(f"Empty response for session: {payload.session_id}")
+                yield emit("⚠️ I couldn't generate a response. Please try again with more details.")
+            else:
+                logger.warning(f"Off-domain {payload.chat_type} response detected: {reply[:50]}...")
+                yield emit(guard[1])
+            yield done("guarded")
+            return
+        yield done("ok")
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
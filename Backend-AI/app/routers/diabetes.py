@@ -1,12 +1,13 @@
 from fastapi import APIRouter
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 import numpy as np
-import requests
-from app.services.diabetes_service import predict_diabetes
+from app.services.outbox import outbox
+from app.services.diabetes_service import predict_diabetes, predict_diabetes_batch
 
 router = APIRouter()
 
-NODE_DIABETES_URL = "http://localhost:5000/api/save"
+MAX_BATCH_SIZE = 50_000
 
 class DiabetesInput(BaseModel):
     pregnancies: int
@@ -19,6 +20,9 @@ class DiabetesInput(BaseModel):
     age: int
     user_id: str  # Ajouté pour lier à l'utilisateur
 
+class DiabetesBatchInput(BaseModel):
+    records: List[DiabetesInput] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
 @router.post("/diabetes/predict")
 async def predict(data: DiabetesInput):
     input_data = np.array([[ 
@@ -36,10 +40,41 @@ async def predict(data: DiabetesInput):
         "result": result
     }
 
-    try:
-        res = requests.post(NODE_DIABETES_URL, json=payload)
-        res.raise_for_status()
-    except Exception as e:
-        print("❌ Failed to send prediction:", e)
+    # Persisté en tâche de fond : la latence ne dépend plus de Node.js
+    outbox.enqueue("diabetes", payload)
 
     return {"prediction": result}
+
+
+@router.post("/diabetes/predict_batch")
+def predict_batch(data: DiabetesBatchInput):
+    # Une seule matrice [n,8] → un seul predict_proba pour tout le lot
+    input_data = np.array(
+        [
+            (
+                r.pregnancies, r.glucose, r.blood_pressure,
+                r.skin_thickness, r.insulin, r.bmi,
+                r.diabetes_pedigree, r.age,
+            )
+            for r in data.records
+        ],
+        dtype=float,
+    )
+
+    results = predict_diabetes_batch(input_data)
+
+    # Envoyé vers Node.js par lots (routes bulk) via l'outbox
+    outbox.enqueue_many(
+        "diabetes",
+        [
+            {
+                "userId": r.user_id,
+                "input": r.dict(exclude={"user_id"}),
+                "result": res["prediction"],
+                "probability": res["probability"],
+            }
+            for r, res in zip(data.records, results)
+        ],
+    )
+
+    return {"count": len(results), "predictions": results}
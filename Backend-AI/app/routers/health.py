@@ -0,0 +1,104 @@
+# routers/health.py
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from app.core import services
+from app.core.cache import CACHES
+from app.core.http import llm_client
+from app.core.memory import memory_report
+from app.core.singleflight import FLIGHTS
+from app.services.outbox import outbox
+from app.services.session_store import session_store
+
+router = APIRouter(prefix="/health", tags=["Health"])
+
+# Services each route group needs before it can answer without a cold load.
+# Pods serving a subset of the API probe e.g. /health/ready?route=chat
+ROUTE_SERVICES = {
+    "chat": ["symptom_matcher", "food"],
+    "nutrition": ["food"],
+    "plan": ["plan_data"],
+    "recommend": ["recommender"],
+    "diabetes": ["diabetes"],
+    "blood_pressure": ["hypertension"],
+}
+
+
+@router.get("/live")
+def live():
+    """Liveness: the process is up and serving the event loop."""
+    return {"status": "alive"}
+
+
+@router.get("/ready")
+def ready(
+    route: Optional[List[str]] = Query(default=None),
+    service: Optional[List[str]] = Query(default=None),
+):
+    """
+    Readiness: 200 once the requested services (default: all) are loaded, 503 otherwise.
+    404 for an unknown route or service name: a mistyped probe must not pass.
+    """
+    names: list[str] | None = None
+    if route or service:
+        unknown = {
+            "unknown_route": [r for r in route or [] if r not in ROUTE_SERVICES],
+            "unknown_service": [s for s in service or [] if s not in services.registered()],
+        }
+        if any(unknown.values()):
+            raise HTTPException(
+                status_code=404,
+                detail={
+                    **{k: v for k, v in unknown.items() if v},
+                    "routes": list(ROUTE_SERVICES),
+                    "services": services.registered(),
+                },
+            )
+        names = list(service or [])
+        for r in route or []:
+            names.extend(ROUTE_SERVICES[r])
+        names = list(dict.fromkeys(names))
+
+    ok = services.all_ready(names)
+    return JSONResponse(
+        status_code=200 if ok else 503,
+        content={"status": "ready" if ok else "starting", "services": services.status(names)},
+    )
+
+
+@router.get("/outbox")
+def outbox_status():
+    """Pending, sent and spooled writes towards the Node.js backend."""
+    return outbox.status()
+
+
+@router.get("/upstream")
+def upstream_status():
+    """Shared LLM client: requests, errors, in-flight and pool wait time."""
+    return llm_client.status()
+
+
+@router.get("/caches")
+def cache_status():
+    """Hit/miss/eviction counters of every response cache."""
+    return {name: cache.stats() for name, cache in CACHES.items()}
+
+
+@router.get("/singleflight")
+def singleflight_status():
+    """Calls executed vs. coalesced onto an identical in-flight call."""
+    return {name: flight.stats() for name, flight in FLIGHTS.items()}
+
+
+@router.get("/sessions")
+def session_status():
+    """Chat session store: backend, sessions held, memory cap and evictions."""
+    return session_store.stats()
+
+
+@router.get("/memory")
+def memory_status():
+    """This worker's resident memory split into private and shared (preload/mmap)."""
+    return memory_report()
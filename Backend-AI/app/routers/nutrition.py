@@ -0,0 +1,43 @@
+# routers/nutrition.py
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+from app.services.food_info import analyze_meal
+from app.utils.parser import parse_meal
+
+router = APIRouter(prefix="/nutrition", tags=["Nutrition"])
+
+MAX_MEAL_ITEMS = 100
+
+
+class MealItem(BaseModel):
+    food: str = Field(..., min_length=1)
+    grams: Optional[float] = Field(default=None, gt=0)  # sinon "quantity" portions
+    quantity: float = Field(default=1.0, gt=0)
+
+
+class MealInput(BaseModel):
+    items: Optional[List[MealItem]] = Field(default=None, max_length=MAX_MEAL_ITEMS)
+    text: Optional[str] = Field(default=None, max_length=2000)  # "200g rice, 1 apple"
+
+
+@router.post("/meal")
+def meal_nutrition(meal: MealInput):
+    """
+    Per-item and total macros of a whole meal (values per 100 g in the dataset,
+    an item without grams counts as 100 g per portion).
+    """
+    items = [(i.food, i.grams, i.quantity) for i in meal.items or []]
+    unparsed = []
+    if meal.text:
+        parsed, unparsed = parse_meal(meal.text)
+        items.extend(parsed)
+    if not items:
+        if unparsed:
+            raise HTTPException(status_code=422, detail={"unparsed": unparsed})
+        raise HTTPException(status_code=422, detail="Provide 'items' or 'text'")
+    if len(items) > MAX_MEAL_ITEMS:
+        raise HTTPException(status_code=422, detail=f"At most {MAX_MEAL_ITEMS} items per meal")
+    # Entrées sans nom d'aliment ("100 g") : signalées, pas devinées
+    return {**analyze_meal(items), "unparsed": unparsed}
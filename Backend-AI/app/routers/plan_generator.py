@@ -1,10 +1,22 @@
 from fastapi import APIRouter, Request
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from typing import List, Dict, Union
+import asyncio
+import numpy as np
 import pandas as pd
-import re
 import random
-import requests
+import threading
+from dataclasses import dataclass
+
+from app.core.artifacts import ArtifactSpec
+from app.core.cache import ResponseCache, TTLCache, stable_seed
+from app.core.conditional import conditional_response, etag_for
+from app.core.metrics import stage
+from app.core.config import settings
+from app.core.services import register, get_service
+from app.core.singleflight import SingleFlight
+from app.services.outbox import outbox
 
 router = APIRouter()
 
@@ -12,44 +24,151 @@ router = APIRouter()
 # 📦 DATA LOADING & CLEANING
 # =====================================================================
 DATA_DIR = "app/datasets"
-user_data = pd.read_csv(f"{DATA_DIR}/gym_data_cleaned.csv")
-exercise_raw = pd.read_csv(f"{DATA_DIR}/weightlifting_721_workouts.csv")
-
-exercise_raw["exercise_clean"] = (
-    exercise_raw["Exercise Name"]
-    .str.lower()
-    .str.replace(r"[^a-z0-9 ]", "", regex=True)
-    .str.strip()
-)
+USER_DATA_PATH = f"{DATA_DIR}/gym_data_cleaned.csv"
 
-best_set = (
-    exercise_raw.sort_values(["exercise_clean", "Weight"], ascending=[True, False])
-    .drop_duplicates(subset=["exercise_clean"])[
-        [
-            "Workout Name",
-            "exercise_clean",
-            "Exercise Name",
-            "Weight",
-            "Reps",
-            "Set Order",
-        ]
-    ]
-    .rename(columns={"Set Order": "Sets"})
-    .reset_index(drop=True)
+bool_cols = {"Hypertension": "hypertension", "Diabetes": "diabetes"}
+
+# Similarity = weighted L1 distance over these columns:
+# |Δage|/5 + |Δweight|/10 + |Δheight_cm|/10 + 2·[hypertension ≠] + 2·[diabetes ≠]
+SIM_COLUMNS = ["Age", "Weight", "Height", "Hypertension", "Diabetes"]
+SIM_UNIT = np.array([1, 1, 100, 1, 1])  # Height is in metres, profiles give cm
+# |Δ| is divided by these after the raw subtraction, as the legacy per-column sum
+# did: scaling the features first rounds differently and reorders exact ties
+SIM_DIVISOR = np.array([5.0, 10.0, 10.0, 0.5, 0.5])
+
+
+@dataclass
+class SexGroup:
+    """Rows of one sex: raw similarity features + the fields a plan uses."""
+
+    features: np.ndarray  # (n, len(SIM_COLUMNS)), C-contiguous, height in cm
+    equipment: list  # parsed list per row
+    recommendation: list
+    diet: list
+
+
+@dataclass
+class PlanData:
+    user_data: pd.DataFrame
+    best_set: pd.DataFrame
+    by_sex: dict  # lowercased sex → SexGroup
+    max_group: int
+    group_exercises: dict  # muscle group → tuple of ready ExerciseDetail
+
+
+def _read_user_data() -> pd.DataFrame:
+    user_data = pd.read_csv(USER_DATA_PATH)
+    for col in bool_cols:
+        user_data[col] = (
+            user_data[col]
+            .astype(str)
+            .str.strip()
+            .str.lower()
+            .isin(["yes", "true"])
+            .astype(int)
+        )
+    return user_data
+
+
+def _sex_groups(user_data: pd.DataFrame):
+    return user_data.groupby(user_data["Sex"].str.lower(), sort=False)
+
+
+def _sim_features() -> dict:
+    """Lowercased sex → similarity features of its rows (dataset order)."""
+    return {
+        sex: np.ascontiguousarray(rows[SIM_COLUMNS].to_numpy(float) * SIM_UNIT)
+        for sex, rows in _sex_groups(_read_user_data())
+    }
+
+
+# Numeric columns are persisted once and memory-mapped, so workers share them
+SIM_FEATURES_ARTIFACT = ArtifactSpec(
+    name="plan_features",
+    sources=[USER_DATA_PATH],
+    build=_sim_features,
+    extra={"columns": SIM_COLUMNS, "unit": SIM_UNIT.tolist()},
 )
 
-bool_cols = {"Hypertension": "hypertension", "Diabetes": "diabetes"}
-for col in bool_cols:
-    user_data[col] = (
-        user_data[col]
-        .astype(str)
-        .str.strip()
+
+def _load_plan_data() -> PlanData:
+    user_data = _read_user_data()
+    exercise_raw = pd.read_csv(f"{DATA_DIR}/weightlifting_721_workouts.csv")
+
+    exercise_raw["exercise_clean"] = (
+        exercise_raw["Exercise Name"]
         .str.lower()
-        .isin(["yes", "true"])
-        .astype(int)
+        .str.replace(r"[^a-z0-9 ]", "", regex=True)
+        .str.strip()
+    )
+
+    best_set = (
+        exercise_raw.sort_values(["exercise_clean", "Weight"], ascending=[True, False])
+        .drop_duplicates(subset=["exercise_clean"])[
+            [
+                "Workout Name",
+                "exercise_clean",
+                "Exercise Name",
+                "Weight",
+                "Reps",
+                "Set Order",
+            ]
+        ]
+        .rename(columns={"Set Order": "Sets"})
+        .reset_index(drop=True)
+    )
+
+    features = SIM_FEATURES_ARTIFACT.load()
+    by_sex = {}
+    for sex, rows in _sex_groups(user_data):
+        by_sex[sex] = SexGroup(
+            features=features[sex],
+            equipment=[
+                [eq.strip() for eq in str(v).split(",") if eq.strip()] for v in rows["Equipment"]
+            ],
+            recommendation=[str(v) for v in rows["Recommendation"]],
+            diet=[str(v) for v in rows["Diet"]],
+        )
+
+    return PlanData(
+        user_data=user_data,
+        best_set=best_set,
+        by_sex=by_sex,
+        max_group=max((len(g.equipment) for g in by_sex.values()), default=0),
+        group_exercises=_index_group_exercises(best_set),
     )
 
 
+def _or_default(value, default):
+    return default if pd.isna(value) or not value else value
+
+
+def _index_group_exercises(best_set: pd.DataFrame) -> dict:
+    """Muscle group → its exercises as ready ExerciseDetail (one per clean name)."""
+    details = [
+        ExerciseDetail(
+            exercise=name,
+            sets=int(_or_default(sets, 3)),
+            reps=int(_or_default(reps, 10)),
+            weight=float(_or_default(weight, 0.0)),
+        )
+        for name, sets, reps, weight in zip(
+            best_set["Exercise Name"], best_set["Sets"], best_set["Reps"], best_set["Weight"]
+        )
+    ]
+    clean = best_set["exercise_clean"].to_numpy(dtype=str)
+    index = {}
+    for group, keywords in MUSCLE_GROUPS.items():
+        rows = np.flatnonzero(
+            np.any([np.char.find(clean, kw) >= 0 for kw in keywords], axis=0)
+        )
+        index[group] = tuple(details[i] for i in rows)
+    return index
+
+
+register("plan_data", _load_plan_data)
+
+
 # =====================================================================
 # 🧠 Models & Mappings
 # =====================================================================
@@ -66,6 +185,7 @@ class UserProfile(BaseModel):
     hypertension: Union[str, bool] = "No"
     diabetes: Union[str, bool] = "No"
     userId: str | None = None  # ID MongoDB optionnel
+    seed: int | None = None  # même profil + même seed → même plan
 
 
 class ExerciseDetail(BaseModel):
@@ -80,6 +200,7 @@ class GeneratedPlan(BaseModel):
     equipment: List[str]
     recommendation: str
     diet: str | None = None
+    seed: int | None = None  # seed used, to reproduce this plan
 
 
 MUSCLE_GROUPS = {
@@ -98,124 +219,190 @@ def _bool(v: Union[str, bool]) -> bool:
     return str(v).strip().lower() in {"yes", "true", "1"}
 
 
-def top_k_similar(profile: UserProfile, k: int = 5) -> pd.DataFrame:
-    df = user_data.copy()
-    df["sim"] = 0.0
-    df = df[(df["Sex"].str.lower() == profile.sex.lower())]
-    if df.empty:
-        return pd.DataFrame()
-    df["sim"] += abs(df["Age"] - profile.age) / 5.0
-    df["sim"] += abs(df["Weight"] - profile.weight) / 10.0
-    df["sim"] += abs(df["Height"] * 100 - profile.height) / 10.0
-    for csv_col, prof_attr in bool_cols.items():
-        df["sim"] += (df[csv_col] != int(_bool(getattr(profile, prof_attr)))).astype(
-            int
-        ) * 2
-    return df.sort_values("sim").head(k)
+# Per-thread scratch buffers: no per-request allocation sized by the dataset
+_scratch = threading.local()
+
+
+def _buffers(rows: int, cols: int) -> tuple[np.ndarray, ...]:
+    """(diff, sim, partition copy of sim, mask), at least ``rows`` long."""
+    bufs = getattr(_scratch, "bufs", None)
+    if bufs is None or bufs[0].shape[0] < rows:
+        bufs = (np.empty((rows, cols)), np.empty(rows), np.empty(rows), np.empty(rows, dtype=bool))
+        _scratch.bufs = bufs
+    return tuple(b[:rows] for b in bufs)
+
+
+def top_k_similar(profile: UserProfile, k: int = 5) -> List[dict]:
+    """
+    The k closest rows of the same sex, closest first (plan fields only).
+    Rows at the same distance come back in dataset order.
+    """
+    data = get_service("plan_data")
+    group = data.by_sex.get(profile.sex.lower())
+    if group is None:
+        return []
+    query = np.array(
+        [
+            profile.age,
+            profile.weight,
+            profile.height,
+            _bool(profile.hypertension),
+            _bool(profile.diabetes),
+        ],
+        dtype=float,
+    )
+    n = len(group.features)
+    diff, sim, part, mask = (b[:n] for b in _buffers(data.max_group, len(query)))
+    np.subtract(group.features, query, out=diff)
+    np.abs(diff, out=diff)
+    np.divide(diff, SIM_DIVISOR, out=diff)
+    # Column by column, in the legacy order: same rounding, same ties
+    np.copyto(sim, diff[:, 0])
+    for j in range(1, diff.shape[1]):
+        np.add(sim, diff[:, j], out=sim)
+
+    k = min(k, n)
+    if k <= 0:
+        return []
+    # Sélection partielle en place sur une copie : seule la k-ième distance compte
+    np.copyto(part, sim)
+    part.partition(k - 1)
+    np.less_equal(sim, part[k - 1], out=mask)
+    # Candidats (k plus les ex æquo de la k-ième) : distance, puis ordre du dataset
+    top = np.flatnonzero(mask)
+    top = top[np.lexsort((top, sim[top]))][:k]
+    return [
+        {
+            "sim": float(sim[i]),
+            "equipment": group.equipment[i],
+            "recommendation": group.recommendation[i],
+            "diet": group.diet[i],
+        }
+        for i in top
+    ]
 
 
 # =====================================================================
 # 🏋️ Utilities
 # =====================================================================
-def get_group_exercises(group: str, count: int) -> List[str]:
-    keywords = MUSCLE_GROUPS.get(group, [])
-    filtered = best_set[
-        best_set["exercise_clean"].apply(lambda x: any(kw in x for kw in keywords))
-    ]
-    return filtered.drop_duplicates("exercise_clean").sample(min(count, len(filtered)))
-
-
-def detail_list(rows: pd.DataFrame) -> List[ExerciseDetail]:
-    seen = set()
-    details = []
-    for _, row in rows.iterrows():
-        clean = re.sub(r"[^a-z0-9 ]", "", str(row["Exercise Name"]).lower())
-        if clean in seen:
-            continue
-        seen.add(clean)
-        details.append(
-            ExerciseDetail(
-                exercise=row["Exercise Name"],
-                sets=int(row["Sets"] if row["Sets"] else 3),
-                reps=int(row["Reps"] if row["Reps"] else 10),
-                weight=float(row["Weight"] if row["Weight"] else 0.0),
-            )
-        )
-    return details
+def get_group_exercises(
+    group: str, count: int, rng: random.Random = random
+) -> List[ExerciseDetail]:
+    exercises = get_service("plan_data").group_exercises.get(group, ())
+    return rng.sample(exercises, min(count, len(exercises)))
 
 
 # =====================================================================
 # 📨 Send to Node.js Backend
 # =====================================================================
-NODE_BACKEND_URL = "http://localhost:5000/api/plan/save"
-
-
-def send_to_nodejs(user_id: str, plan: dict):
-    try:
-        payload = {
-            "userId": user_id,
-            "weekly_plan": plan["weekly_plan"],
-            "equipment": plan["equipment"],
-            "recommendation": plan["recommendation"],
-            "diet": plan["diet"],
-        }
-        res = requests.post(NODE_BACKEND_URL, json=payload)
-        res.raise_for_status()
-        return res.json()
-    except Exception as e:
-        print("❌ Failed to send to Node.js backend:", e)
-        return None
+def send_to_nodejs(user_id: str, plan: dict) -> None:
+    """Queue the plan for the Node.js backend (non-blocking, retried, spooled)."""
+    payload = {
+        "userId": user_id,
+        "weekly_plan": jsonable_encoder(plan["weekly_plan"]),
+        "equipment": plan["equipment"],
+        "recommendation": plan["recommendation"],
+        "diet": plan["diet"],
+    }
+    outbox.enqueue("plan", payload)
 
 
 # =====================================================================
 # 🚀 Main Endpoint
 # =====================================================================
-@router.post("/plan/generate", response_model=GeneratedPlan)
-def generate_plan(profile: UserProfile):
-    df_sim = top_k_similar(profile)
+# Plans per (profile bucket, seed): same body and ETag while the profile is unchanged
+_plan_cache = ResponseCache("plan", maxsize=settings.plan_cache_size, ttl=settings.plan_cache_ttl)
+_plan_flights = SingleFlight("plan")
+# userId → ETag of the plan last queued for Node.js
+_sent_plans = TTLCache(maxsize=settings.plan_cache_size, ttl=settings.plan_cache_ttl)
+
+
+def profile_bucket(profile: UserProfile) -> str:
+    """Inputs that shape a plan, rounded so trivial changes hit the same entry."""
+    return "|".join(
+        str(v)
+        for v in (
+            profile.sex.strip().lower(),
+            profile.age,
+            round(profile.height),  # cm
+            round(profile.weight * 2) / 2,  # 0.5 kg
+            profile.level.strip().lower(),
+            profile.goal.strip().lower(),
+            round(profile.target_weight * 2) / 2,
+            profile.days_per_week,
+            _bool(profile.hypertension),
+            _bool(profile.diabetes),
+        )
+    )
+
+
+def build_plan(profile: UserProfile, seed: int) -> dict:
+    with stage("plan.similarity"):
+        similar = top_k_similar(profile)
     equipment: set[str] = set()
     recommendation = ""
     diet = ""
 
-    for _, row in df_sim.iterrows():
-        equipment.update(
-            [eq.strip() for eq in str(row["Equipment"]).split(",") if eq.strip()]
-        )
+    for row in similar:
+        equipment.update(row["equipment"])
         if not recommendation:
-            recommendation = str(row["Recommendation"])
+            recommendation = row["recommendation"]
         if not diet:
-            diet = str(row["Diet"])
+            diet = row["diet"]
 
-    selected_groups = random.sample(
-        list(MUSCLE_GROUPS.keys()), k=min(profile.days_per_week, len(MUSCLE_GROUPS))
-    )
-    random.shuffle(selected_groups)
-
-    day_names = [
-        "Monday",
-        "Tuesday",
-        "Wednesday",
-        "Thursday",
-        "Friday",
-        "Saturday",
-        "Sunday",
-    ]
-    weekly_plan: Dict[str, List[ExerciseDetail]] = {}
+    # Tout le tirage passe par ce générateur : le plan est reproductible
+    with stage("plan.sampling"):
+        rng = random.Random(seed)
+        selected_groups = rng.sample(
+            list(MUSCLE_GROUPS.keys()), k=min(profile.days_per_week, len(MUSCLE_GROUPS))
+        )
+        rng.shuffle(selected_groups)
+
+        day_names = [
+            "Monday",
+            "Tuesday",
+            "Wednesday",
+            "Thursday",
+            "Friday",
+            "Saturday",
+            "Sunday",
+        ]
+        weekly_plan: Dict[str, List[ExerciseDetail]] = {}
 
-    for i in range(profile.days_per_week):
-        group = selected_groups[i % len(selected_groups)]
-        day = day_names[i % 7]
-        exercises = get_group_exercises(group, 5)
-        weekly_plan[day] = detail_list(exercises)
+        for i in range(profile.days_per_week):
+            group = selected_groups[i % len(selected_groups)]
+            day = day_names[i % 7]
+            weekly_plan[day] = get_group_exercises(group, 5, rng)
 
     result = {
         "weekly_plan": weekly_plan,
         "equipment": sorted(equipment),
         "recommendation": recommendation,
         "diet": diet or None,
+        "seed": seed,
     }
+    return result
 
-    if profile.userId:
-        send_to_nodejs(profile.userId, result)
 
-    return result
+@router.post("/plan/generate", response_model=GeneratedPlan)
+async def generate_plan(profile: UserProfile, request: Request):
+    bucket = profile_bucket(profile)
+    # Seed par défaut stable : un profil inchangé retrouve le même plan
+    seed = profile.seed if profile.seed is not None else stable_seed(bucket)
+    key = f"{bucket}|{seed}"
+
+    async def compute() -> dict:
+        body = jsonable_encoder(await asyncio.to_thread(build_plan, profile, seed))
+        entry = {"body": body, "etag": etag_for(body)}
+        await _plan_cache.set(key, entry)
+        return entry
+
+    entry = await _plan_cache.get(key) or await _plan_flights.do(key, compute)
+
+    # Node.js a déjà ce plan pour cet utilisateur : pas de nouvel envoi
+    if profile.userId and _sent_plans.get(profile.userId) != entry["etag"]:
+        with stage("plan.node_enqueue"):
+            send_to_nodejs(profile.userId, entry["body"])
+        _sent_plans.set(profile.userId, entry["etag"])
+
+    return conditional_response(request, entry["body"], entry["etag"])
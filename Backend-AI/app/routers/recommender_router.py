@@ -1,11 +1,21 @@
 # routers/recommender_router.py
-from fastapi import APIRouter
+import asyncio
+import random
+
+from fastapi import APIRouter, Request
 from pydantic import BaseModel, Field
-from typing import Literal, Optional
-from app.services.recommender_service import recommender
+from typing import List, Literal, Optional
+from app.core.cache import ResponseCache, stable_seed
+from app.core.conditional import conditional_response, etag_for
+from app.core.metrics import stage
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.services.recommender_service import get_recommender
 
 router = APIRouter()
 
+MAX_BATCH_SIZE = 10_000
+
 
 class UserProfile(BaseModel):
     sex: Literal["Male", "Female"]
@@ -19,9 +29,66 @@ class UserProfile(BaseModel):
     fitness_goal: str
     fitness_type: str
     days_per_week: Optional[int] = Field(default=3, ge=1, le=7)
+    seed: Optional[int] = None  # même profil + même seed → même programme
+
+
+# Programs per (profile bucket, seed); the profile echo is added per response
+_recommend_cache = ResponseCache(
+    "recommend", maxsize=settings.plan_cache_size, ttl=settings.plan_cache_ttl
+)
+_recommend_flights = SingleFlight("recommend")
+
+
+def profile_bucket(user: UserProfile) -> str:
+    """Inputs that shape a program, rounded so trivial changes hit the same entry."""
+    return "|".join(
+        str(v)
+        for v in (
+            user.sex,
+            user.age,
+            round(user.height, 2),
+            round(user.weight * 2) / 2,
+            round(user.bmi, 1),
+            user.hypertension,
+            user.diabetes,
+            user.level.strip().lower(),
+            user.fitness_goal.strip().lower(),
+            user.fitness_type.strip().lower(),
+            user.days_per_week,
+        )
+    )
 
 
 @router.post("/recommend")
-def recommend_plan(user: UserProfile):
-    response = recommender.match(user.dict(), days_per_week=user.days_per_week)
-    return response
+async def recommend_plan(user: UserProfile, request: Request):
+    bucket = profile_bucket(user)
+    seed = user.seed if user.seed is not None else stable_seed(bucket)
+    key = f"{bucket}|{seed}"
+
+    async def compute() -> dict:
+        with stage("recommend.match"):
+            response = await asyncio.to_thread(
+                lambda: get_recommender().match(
+                    user.dict(), days_per_week=user.days_per_week, rng=random.Random(seed)
+                )
+            )
+        await _recommend_cache.set(key, response)
+        return response
+
+    cached = await _recommend_cache.get(key) or await _recommend_flights.do(key, compute)
+    body = {**cached, "profile": {**user.dict(), "seed": seed}}
+    return conditional_response(request, body, etag_for(body))
+
+
+class UserProfileBatch(BaseModel):
+    profiles: List[UserProfile] = Field(..., min_length=1, max_length=MAX_BATCH_SIZE)
+
+
+@router.post("/recommend/batch")
+def recommend_batch(batch: UserProfileBatch):
+    # Un seul encodage + kneighbors vectorisés pour tout le lot
+    results = get_recommender().match_batch(
+        [u.dict() for u in batch.profiles],
+        days_per_week=[u.days_per_week for u in batch.profiles],
+    )
+    return {"count": len(results), "results": results}
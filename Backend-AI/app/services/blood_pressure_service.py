@@ -4,24 +4,52 @@ import os
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
-# Charger et entraîner le modèle depuis le CSV
+from app.core.artifacts import ArtifactSpec
+from app.core.services import register, get_service
+
 csv_path = os.path.join(os.path.dirname(__file__), "../datasets/blood_pressure_large_dataset.csv")
-df = pd.read_csv(csv_path)
 
-# Convertir la colonne hypertension en 0/1
-df['hypertension'] = df['hypertension'].map({'No': 0, 'Yes': 1})
 
-X = df[["age", "systolic_pressure", "diastolic_pressure"]]
-y = df["hypertension"]
+def _train() -> LogisticRegression:
+    """Entraîne le modèle depuis le CSV (build hors-ligne ou manifeste périmé)."""
+    df = pd.read_csv(csv_path)
+
+    # Convertir la colonne hypertension en 0/1
+    df['hypertension'] = df['hypertension'].map({'No': 0, 'Yes': 1})
+
+    X = df[["age", "systolic_pressure", "diastolic_pressure"]]
+    y = df["hypertension"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_train, y_train)
+    return model
 
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train, y_train)
+MODEL_ARTIFACT = ArtifactSpec(name="hypertension_logreg", sources=[csv_path], build=_train)
+
+# Chargé à la demande (ou au warmup) : modèle persisté, ré-entraîné seulement si le CSV a changé
+register("hypertension", MODEL_ARTIFACT.load)
 
 def predict_hypertension(input_data: np.ndarray) -> str:
     """
     Prend un tableau numpy (shape: [1,3]) et retourne la prédiction ("Hypertensive" ou "Normal").
     """
+    model = get_service("hypertension")
     prediction = model.predict(input_data)[0]
-    return "Hypertensive" if prediction == 1 else "Normal"
\ No newline at end of file
+    return "Hypertensive" if prediction == 1 else "Normal"
+
+
+def predict_hypertension_batch(input_data: np.ndarray) -> list[dict]:
+    """
+    Prend un tableau numpy (shape: [n,3]) et score toutes les lignes en une seule passe.
+    Retourne pour chaque ligne la prédiction et la probabilité d'hypertension.
+    """
+    model = get_service("hypertension")
+    proba = model.predict_proba(input_data)[:, list(model.classes_).index(1)]
+    labels = np.where(proba > 0.5, "Hypertensive", "Normal")
+    return [
+        {"prediction": label, "probability": round(float(p), 4)}
+        for label, p in zip(labels.tolist(), proba.tolist())
+    ]
\ No newline at end of file
@@ -1,4 +1,4 @@
-import httpx
+from app.core.http import llm_client
 from app.prompts.templates import get_prompt
 import os
 
@@ -25,7 +25,6 @@ async def get_chat_response(user_prompt: str, chat_type: str):
         "temperature": 0.7,
     }
 
-    async with httpx.AsyncClient() as client:
-        res = await client.post(API_URL, headers=HEADERS, json=payload)
-        res.raise_for_status()
-        return res.json()["choices"][0]["message"]["content"]
+    res = await llm_client.post(API_URL, headers=HEADERS, json=payload)
+    res.raise_for_status()
+    return res.json()["choices"][0]["message"]["content"]
@@ -1,50 +1,48 @@
 # app/services/deepseek_client.py
+import asyncio
+import hashlib
 import re
-from collections import deque
-
-import httpx
-from langdetect import detect
+from typing import AsyncIterator
 
+from app.core.cache import ResponseCache
 from app.core.config import settings
+from app.core.http import llm_client
+from app.core.metrics import stage
+from app.core.singleflight import SingleFlight
 from app.prompts.templates import get_prompt
-from app.services.food_info import get_food_info
+from app.services.food_info import get_food_info, get_food_suggestions
+from app.services.language import GREETINGS, detect_language
+from app.services.session_store import session_store, trim_to_budget
 from app.services.disease_matcher import (
     get_probable_diseases,
     get_disease_explanation,
 )
 
-# Greeting sets per language
-GREETINGS = {
-    "English": {"hi", "hello", "hey"},
-    "French": {"salut", "bonjour", "coucou"},
-}
-
 # Responses per language
 GREETING_RESPONSES = {
     "English": "Hi! How can I help you today?",
     "French": "Bonjour ! Comment puis-je vous aider aujourd’hui ?",
 }
 
-# In-memory chat history (swap for Redis in production)
-_chat_history: dict[str, deque] = {}
-
+# Explore answers are stateless: cache them per normalized query/lang/model
+_explore_cache = ResponseCache(
+    "explore",
+    maxsize=settings.explore_cache_size,
+    ttl=settings.explore_cache_ttl,
+    path=settings.explore_cache_path or None,
+)
 
-def detect_language(text: str) -> str:
-    """
-    Detect language using langdetect. Defaults to English, handles French.
-    """
-    try:
-        code = detect(text)
-        return {"fr": "French"}.get(code[:2], "English")
-    except Exception:
-        return "English"
+# Identical concurrent lookups/upstream calls share one in-flight task
+_flights = SingleFlight("chat")
 
 
 async def _handle_food(query: str, lang: str) -> str:
     """
     Lookup nutrition info for a food.
     """
-    info = get_food_info(query)
+    key = query.lower().strip()
+    with stage("chat.food_lookup"):
+        info = await _flights.do(f"food:{key}", lambda: asyncio.to_thread(get_food_info, query))
     if info:
         return (
             f"**{info['name']}** per 100g:\n"
@@ -54,17 +52,34 @@ async def _handle_food(query: str, lang: str) -> str:
             f"- Protein: {info['protein_g']} g\n"
             f"- Fiber: {info['fiber_g']} g"
         )
+    with stage("chat.food_suggestions"):
+        suggestions = await asyncio.to_thread(get_food_suggestions, query)
+    if suggestions:
+        names = ", ".join(f"**{s}**" for s in suggestions)
+        return {
+            "English": f"Sorry, I don't have data on '{query}'. Did you mean: {names}?",
+            "French": f"Désolé, pas de données sur '{query}'. Vouliez-vous dire : {names} ?",
+        }.get(lang, f"Sorry, no data found. Did you mean: {names}?")
     return {
         "English": f"Sorry, I don't have data on '{query}'. Try another food.",
         "French": f"Désolé, pas de données sur '{query}'. Essayez un autre aliment.",
     }.get(lang, "Sorry, no data found.")
 
 
-def _handle_symptom(text: str) -> str:
+async def _handle_symptom(text: str) -> str:
     """
     Return top probable diseases for symptoms.
     """
-    probable = get_probable_diseases(text)
+    key = text.strip().lower()
+    with stage("chat.symptom_match"):
+        probable = await _flights.do(
+            f"symptom:{key}", lambda: asyncio.to_thread(get_probable_diseases, text)
+        )
+    if not probable:
+        return (
+            "I couldn't match these symptoms to any known condition. "
+            "Please describe them in more detail."
+        )
     lines = [
         f"**{d['disease']} ({d['probability']})**\n- {d['reason']}" for d in probable
     ]
@@ -75,31 +90,81 @@ def _handle_symptom(text: str) -> str:
     )
 
 
-async def _handle_explore(raw: str, lang: str) -> str:
+def _explore_request(raw: str, lang: str) -> dict:
     """
-    Provide a concise overview (max 5 sentences).
+    Upstream request for a concise overview (max 5 sentences).
     """
     prompt = (
         f"Provide a concise (max 5 sentences) overview of '{raw}': definition, symptoms, "
         f"treatments, and red flags. Respond in {lang}."
     )
-    async with httpx.AsyncClient(timeout=settings.chat_timeout) as client:
-        resp = await client.post(
-            f"{settings.openrouter_base_url}/chat/completions",
-            headers={"Authorization": f"Bearer {settings.openrouter_api_key}"},
-            json={
-                "model": settings.model_name,
-                "messages": [
-                    {
-                        "role": "system",
-                        "content": "You are a knowledgeable medical assistant.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-            },
-        )
+    return {
+        "url": f"{settings.openrouter_base_url}/chat/completions",
+        "headers": {"Authorization": f"Bearer {settings.openrouter_api_key}"},
+        "json": {
+            "model": settings.model_name,
+            "messages": [
+                {
+                    "role": "system",
+                    "content": "You are a knowledgeable medical assistant.",
+                },
+                {"role": "user", "content": prompt},
+            ],
+        },
+    }
+
+
+def _explore_cache_key(raw: str, lang: str) -> str:
+    query = re.sub(r"\s+", " ", raw.lower()).strip(" ?!.,;:")
+    digest = hashlib.sha256(f"{settings.model_name}|{lang}|{query}".encode()).hexdigest()
+    return f"explore:{digest}"
+
+
+async def _handle_explore(raw: str, lang: str) -> str:
+    """
+    Provide a concise overview (max 5 sentences).
+    """
+    key = _explore_cache_key(raw, lang)
+    cached = await _explore_cache.get(key)
+    if cached is not None:
+        return cached
+
+    async def fetch() -> str:
+        with stage("chat.upstream"):
+            resp = await llm_client.post(**_explore_request(raw, lang))
         resp.raise_for_status()
-        return resp.json()["choices"][0]["message"]["content"]
+        reply = resp.json()["choices"][0]["message"]["content"]
+        if reply and reply.strip():
+            await _explore_cache.set(key, reply)
+        return reply
+
+    # Même question au même moment : un seul appel upstream
+    return await _flights.do(key, fetch)
+
+
+async def _chat_request(session_id: str, text: str, chat_type: str, lang: str) -> tuple[dict, dict]:
+    """
+    Build the generic Deepseek chat request from the stored history + the user turn.
+    The history is cut to the token budget so the upstream payload stays bounded.
+    """
+    system_prompt = f"{get_prompt(chat_type)}\nRespond in {lang}."
+    user_turn = {"role": "user", "content": text}
+    with stage("chat.history"):
+        history = trim_to_budget(
+            await session_store.get(session_id), settings.chat_history_token_budget
+        )
+    messages = [{"role": "system", "content": system_prompt}] + history + [user_turn]
+    return user_turn, {
+        "url": settings.deepseek_api_url,
+        "headers": {"Authorization": f"Bearer {settings.deepseek_api_key}"},
+        "json": {"model": settings.model_name, "messages": messages},
+    }
+
+
+def _greeting_reply(text: str, lang: str) -> str | None:
+    if text.lower() in GREETINGS.get(lang, {}):
+        return GREETING_RESPONSES.get(lang, GREETING_RESPONSES["English"])
+    return None
 
 
 async def get_response(session_id: str, user_input: str, chat_type: str) -> str:
@@ -107,36 +172,87 @@ async def get_response(session_id: str, user_input: str, chat_type: str) -> str:
     Entry point: handles greetings, specialized modes, and generic chat.
     """
     text = user_input.strip()
-    lang = detect_language(text)
+    with stage("chat.detect_language"):
+        lang = detect_language(text, session_id)
 
     # Greeting
-    if text.lower() in GREETINGS.get(lang, {}):
-        return GREETING_RESPONSES.get(lang, GREETING_RESPONSES["English"])
+    greeting = _greeting_reply(text, lang)
+    if greeting is not None:
+        return greeting
 
     # Dispatch
     if chat_type == "food":
         return await _handle_food(text, lang)
     if chat_type == "symptom":
-        return _handle_symptom(text)
+        return await _handle_symptom(text)
     if chat_type == "explore":
         return await _handle_explore(text, lang)
 
     # Generic LLM chat via Deepseek
-    system_prompt = f"{get_prompt(chat_type)}\nRespond in {lang}."
-    history = _chat_history.setdefault(
-        session_id, deque(maxlen=settings.chat_history_max)
-    )
-    history.append({"role": "user", "content": text})
-    messages = [{"role": "system", "content": system_prompt}] + list(history)
-
-    async with httpx.AsyncClient(timeout=settings.chat_timeout) as client:
-        resp = await client.post(
-            settings.deepseek_api_url,
-            headers={"Authorization": f"Bearer {settings.deepseek_api_key}"},
-            json={"model": settings.model_name, "messages": messages},
-        )
-        resp.raise_for_status()
-        reply = resp.json()["choices"][0]["message"]["content"]
+    user_turn, request = await _chat_request(session_id, text, chat_type, lang)
+    with stage("chat.upstream"):
+        resp = await llm_client.post(**request)
+    resp.raise_for_status()
+    reply = resp.json()["choices"][0]["message"]["content"]
 
-    history.append({"role": "assistant", "content": reply})
+    # Le tour n'est enregistré qu'une fois la réponse obtenue
+    await session_store.append(session_id, [user_turn, {"role": "assistant", "content": reply}])
     return reply
+
+
+async def _stream_deltas(request: dict) -> AsyncIterator[str]:
+    body = {**request["json"], "stream": True}
+    async for event in llm_client.stream_sse(
+        request["url"], headers=request["headers"], json=body
+    ):
+        choices = event.get("choices") or [{}]
+        delta = (choices[0].get("delta") or {}).get("content")
+        if delta:
+            yield delta
+
+
+async def stream_response(session_id: str, user_input: str, chat_type: str) -> AsyncIterator[str]:
+    """
+    Streaming variant of ``get_response``: yields reply chunks as they arrive.
+    Local answers (greeting, symptom, food) are yielded as a single chunk.
+    """
+    text = user_input.strip()
+    with stage("chat.detect_language"):
+        lang = detect_language(text, session_id)
+
+    greeting = _greeting_reply(text, lang)
+    if greeting is not None:
+        yield greeting
+        return
+    if chat_type == "food":
+        yield await _handle_food(text, lang)
+        return
+    if chat_type == "symptom":
+        yield await _handle_symptom(text)
+        return
+    if chat_type == "explore":
+        key = _explore_cache_key(text, lang)
+        cached = await _explore_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+        parts: list[str] = []
+        with stage("chat.upstream_stream"):
+            async for delta in _stream_deltas(_explore_request(text, lang)):
+                parts.append(delta)
+                yield delta
+        reply = "".join(parts)
+        if reply.strip():
+            await _explore_cache.set(key, reply)
+        return
+
+    user_turn, request = await _chat_request(session_id, text, chat_type, lang)
+    parts: list[str] = []
+    with stage("chat.upstream_stream"):
+        async for delta in _stream_deltas(request):
+            parts.append(delta)
+            yield delta
+    # Stream interrompu (erreur ou client parti) : rien n'est enregistré
+    await session_store.append(
+        session_id, [user_turn, {"role": "assistant", "content": "".join(parts)}]
+    )
@@ -4,24 +4,52 @@ import os
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
-# Charger et entraîner le modèle depuis le CSV au démarrage
+from app.core.artifacts import ArtifactSpec
+from app.core.services import register, get_service
+
 csv_path = os.path.join(os.path.dirname(__file__), "../datasets/diabetes.csv")
-df = pd.read_csv(csv_path)
 
-X = df.drop("Outcome", axis=1)
-y = df["Outcome"]
 
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
+def _train() -> LogisticRegression:
+    """Entraîne le modèle depuis le CSV (build hors-ligne ou manifeste périmé)."""
+    df = pd.read_csv(csv_path)
+
+    X = df.drop("Outcome", axis=1)
+    y = df["Outcome"]
+
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42
+    )
+
+    model = LogisticRegression(max_iter=1000)
+    model.fit(X_train, y_train)
+    return model
+
 
-model = LogisticRegression(max_iter=1000)
-model.fit(X_train, y_train)
+MODEL_ARTIFACT = ArtifactSpec(name="diabetes_logreg", sources=[csv_path], build=_train)
+
+# Chargé à la demande (ou au warmup) : modèle persisté, ré-entraîné seulement si le CSV a changé
+register("diabetes", MODEL_ARTIFACT.load)
 
 
 def predict_diabetes(input_data: np.ndarray) -> str:
     """
     Prend un tableau numpy (shape: [1,8]) et retourne la prédiction ("Diabetic" ou "Not Diabetic").
     """
+    model = get_service("diabetes")
     prediction = model.predict(input_data)[0]
     return "Diabetic" if prediction == 1 else "Not Diabetic"
+
+
+def predict_diabetes_batch(input_data: np.ndarray) -> list[dict]:
+    """
+    Prend un tableau numpy (shape: [n,8]) et score toutes les lignes en une seule passe.
+    Retourne pour chaque ligne la prédiction et la probabilité d'être diabétique.
+    """
+    model = get_service("diabetes")
+    proba = model.predict_proba(input_data)[:, list(model.classes_).index(1)]
+    labels = np.where(proba > 0.5, "Diabetic", "Not Diabetic")
+    return [
+        {"prediction": label, "probability": round(float(p), 4)}
+        for label, p in zip(labels.tolist(), proba.tolist())
+    ]
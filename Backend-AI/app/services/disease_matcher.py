@@ -7,22 +7,30 @@ Loads the symptom-disease dataset and provides matching/explanation logic.
 import re
 import pandas as pd
 import json
-from difflib import get_close_matches
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from dataclasses import dataclass
+
+from app.core.artifacts import ArtifactSpec
+from app.core.config import settings
+from app.core.services import register, get_service
+from app.services.symptom_index import (
+    N_HASHED,
+    AdditionsLog,
+    AppendableIndex,
+    IndexUpdater,
+    TermSpace,
+    index_arrays,
+)
+from app.utils.ngram_index import NgramIndex
 
 # Paths
 DF_PATH = "app/datasets/symptom-disease-train-dataset.csv"
 MAPPING_PATH = "app/datasets/mapping.json"
 
-# Load data
-df = pd.read_csv(DF_PATH)
-with open(MAPPING_PATH, "r") as f:
-    mapping = json.load(f)
+# Queries scored per sparse product in the batch API
+BATCH_CHUNK = 256
 
-# Original keys for fuzzy matches
-original_keys = list(mapping.keys())
-original_keys_lower = [k.lower() for k in original_keys]
+# Symptom descriptions added at runtime (admin API / file drop), shared by workers
+ADDITIONS = AdditionsLog(settings.symptom_additions_path, settings.symptom_inbox_dir)
 
 
 # Normalize disease names
@@ -33,35 +41,131 @@ def normalize_disease_key(name: str) -> str:
     return key.replace(" ", "_")
 
 
-# Build lookup maps
-index_to_disease = {v: k for k, v in mapping.items()}
-disease_to_index = {normalize_disease_key(k): v for k, v in mapping.items()}
+def _read_symptoms() -> pd.DataFrame:
+    df = pd.read_csv(DF_PATH)
+    # Prepare symptom texts
+    df["text"] = df["text"].fillna("").str.strip().str.lower()
+    return df
+
+
+def _count_symptoms() -> dict:
+    """Vocabulary and term counts of the training texts plus their weighted postings."""
+    texts = _read_symptoms()["text"]
+    space = TermSpace.fit(texts)
+    counts = space.counts(texts)
+    counts.sum_duplicates()
+    return {"vocabulary": space.vocabulary, "counts": counts, **index_arrays(counts)}
+
+
+COUNTS_ARTIFACT = ArtifactSpec(
+    name="symptom_counts",
+    sources=[DF_PATH],
+    build=_count_symptoms,
+    extra={"n_hashed": N_HASHED, "vocabulary": 1, "postings": 1},
+)
+
+
+@dataclass
+class SymptomIndex:
+    df: pd.DataFrame
+    mapping: dict
+    original_keys: list
+    original_keys_lower: list
+    index_to_disease: dict
+    disease_to_index: dict
+    lower_to_original: dict  # first original key for each lowercased key
+    normalized_keys: NgramIndex  # fuzzy lookup over disease_to_index keys
+    lower_keys: NgramIndex  # fuzzy lookup over original_keys_lower
+    examples: dict  # label → first symptom description of that label
+    store: AppendableIndex  # training rows + runtime additions
+
+
+def _load_index() -> SymptomIndex:
+    with open(MAPPING_PATH, "r") as f:
+        mapping = json.load(f)
+
+    # Counts, IDF and postings are memory-mapped (shared by workers); recount only if stale
+    arrays = COUNTS_ARTIFACT.load()
+    df = _read_symptoms()
+    space = TermSpace(arrays.pop("vocabulary"))
+    store = AppendableIndex(
+        space, arrays.pop("counts"), df["label"].to_numpy(), df["text"], base=arrays
+    )
+    # Rejoue le journal des ajouts ; la suite arrive par refresh_index()
+    added = ADDITIONS.read_new()
+    if added:
+        texts, labels = zip(*added)
+        store.append(list(texts), list(labels))
+    original_keys = list(mapping.keys())
+    original_keys_lower = [k.lower() for k in original_keys]
+    disease_to_index = {normalize_disease_key(k): v for k, v in mapping.items()}
+    lower_to_original: dict = {}
+    for orig, low in zip(original_keys, original_keys_lower):
+        lower_to_original.setdefault(low, orig)
+    firsts = df.drop_duplicates("label")
+    return SymptomIndex(
+        df=df,
+        mapping=mapping,
+        # Original keys for fuzzy matches
+        original_keys=original_keys,
+        original_keys_lower=original_keys_lower,
+        # Build lookup maps
+        index_to_disease={v: k for k, v in mapping.items()},
+        disease_to_index=disease_to_index,
+        lower_to_original=lower_to_original,
+        normalized_keys=NgramIndex(list(disease_to_index.keys())),
+        lower_keys=NgramIndex(original_keys_lower),
+        examples=dict(zip(firsts["label"].astype(int), firsts["text"].str.strip())),
+        store=store,
+    )
 
-# Prepare symptom texts
-df["text"] = df["text"].fillna("").str.strip().str.lower()
 
-# Fit TF-IDF
-vectorizer = TfidfVectorizer()
-tfidf_matrix = vectorizer.fit_transform(df["text"])
+register("symptom_matcher", _load_index)
 
 
-def get_probable_diseases(user_input: str, top_k: int = 3) -> list[dict]:
-    """Top-k probable diseases for given symptoms."""
-    query = user_input.strip().lower()
-    vec = vectorizer.transform([query])
-    sims = cosine_similarity(vec, tfidf_matrix).flatten()
-    idxs = sims.argsort()[-top_k:][::-1]
-    scores = sims[idxs]
+def resolve_label(label: int | None = None, disease: str | None = None) -> int | None:
+    """Known label id from an id or a (fuzzy-normalized) disease name."""
+    index = get_service("symptom_matcher")
+    if label is not None:
+        return label if label in index.index_to_disease else None
+    if disease:
+        return index.disease_to_index.get(normalize_disease_key(disease))
+    return None
+
+
+def add_symptom_examples(pairs: list[tuple[str, int]]) -> int:
+    """Append validated ``(text, label)`` pairs to the shared log."""
+    ADDITIONS.append(pairs)
+    symptom_updater.trigger()
+    return len(pairs)
+
+
+def refresh_index() -> int:
+    """Ingest dropped files, then apply the log lines this worker has not seen."""
+    index = get_service("symptom_matcher")
+    ADDITIONS.ingest_inbox(lambda label: label in index.index_to_disease)
+    added = ADDITIONS.read_new()
+    if not added:
+        return 0
+    texts, labels = zip(*added)
+    return index.store.append(list(texts), list(labels))
+
+
+symptom_updater = IndexUpdater("symptom_matcher", refresh_index, settings.symptom_refresh_interval)
+
 
+def symptom_index_status() -> dict:
+    index = get_service("symptom_matcher")
+    return {**index.store.stats(), "pending_log_bytes": ADDITIONS.pending_bytes()}
+
+
+def _format(index: SymptomIndex, matches: list[tuple[int, float, str]]) -> list[dict]:
     results = []
-    for i, score in zip(idxs, scores):
-        label = str(df.iloc[i]["label"])
-        disease = index_to_disease.get(int(label), "Unknown")
-        prob = round(float(score) * 100, 2)
-        snippet = df.iloc[i]["text"][:80] + "..."
+    for label, score, snippet in matches:
+        prob = round(score * 100, 2)
         results.append(
             {
-                "disease": disease,
+                "disease": index.index_to_disease.get(label, "Unknown"),
                 "probability": f"{prob}%",
                 "reason": f"Matched against: '{snippet}'",
             }
@@ -69,34 +173,50 @@ def get_probable_diseases(user_input: str, top_k: int = 3) -> list[dict]:
     return results
 
 
+def get_probable_diseases(user_input: str, top_k: int = 3) -> list[dict]:
+    """Top-k probable (distinct) diseases for given symptoms."""
+    index = get_service("symptom_matcher")
+    return _format(index, index.store.search([user_input], top_k)[0])
+
+
+def get_probable_diseases_batch(texts: list[str], top_k: int = 3) -> list[list[dict]]:
+    """``get_probable_diseases`` for many texts, one sparse product per chunk."""
+    index = get_service("symptom_matcher")
+    results = []
+    for i in range(0, len(texts), BATCH_CHUNK):
+        for matches in index.store.search(texts[i : i + BATCH_CHUNK], top_k):
+            results.append(_format(index, matches))
+    return results
+
+
 def get_disease_explanation(disease_key: str, raw_input: str = None) -> str | None:
     """Return a patient example for a disease, with fuzzy fallbacks."""
+    index = get_service("symptom_matcher")
+    disease_to_index = index.disease_to_index
     key = normalize_disease_key(disease_key)
     label = disease_to_index.get(key)
     used_key = key
 
     if label is None:
-        c1 = get_close_matches(key, disease_to_index.keys(), n=1, cutoff=0.6)
+        # Mêmes résultats que get_close_matches(..., n=1, cutoff=0.6)
+        c1 = index.normalized_keys.close_matches(key, n=1, cutoff=0.6)
         if c1:
             used_key = c1[0]
             label = disease_to_index[used_key]
         elif raw_input:
-            c2 = get_close_matches(
-                raw_input.lower(), original_keys_lower, n=1, cutoff=0.6
-            )
+            c2 = index.lower_keys.close_matches(raw_input.lower(), n=1, cutoff=0.6)
             if c2:
-                orig = original_keys[original_keys_lower.index(c2[0])]
+                orig = index.lower_to_original[c2[0]]
                 used_key = normalize_disease_key(orig)
-                label = mapping.get(orig)
+                label = index.mapping.get(orig)
 
     if label is None:
         return None
 
-    entry = df[df["label"].astype(str) == str(label)]
-    if entry.empty:
+    example = index.examples.get(int(label))
+    if example is None:
         return None
 
-    example = entry.iloc[0]["text"].strip()
     display = used_key.replace("_", " ").title()
     return (
         f"Here’s a real-world symptom description related to {display}:\n\n> {example}"
@@ -0,0 +1,310 @@
+# app/services/domain_classifier.py
+"""
+Compiled single-pass domain classifier for the chat guardrails.
+
+Every term list is compiled once into a few regexes, one per first letter,
+whose alternatives are factored into a prefix trie, so classifying a text
+costs a few literal-led scans instead of one ``re.search`` per term. Matching keeps the legacy substring semantics
+("symptom" matches "symptoms", "burn" matches "heartburn"), except:
+
+- the short words found inside many unrelated words (``WHOLE_WORD``: "os" in
+  "most", "ear" in "year", "GP") must be a whole word, optionally plural;
+  "_" counts as a separator so dataset tokens like "pain_in_ear" still match;
+- a few terms carry a hand-written suffix (``*_SUFFIXES``: "fat" is not
+  "fatigue", "du pain" is bread, not pain);
+- accented letters in a term also accept the unaccented spelling
+  ("médicament" matches "medicament"), except for ``ACCENT_STRICT`` terms
+  whose unaccented form is a common word ("thé" vs "the").
+
+The medical classifier also knows the disease names of ``mapping.json``,
+matched as whole phrases ("cirrhosis", "what is migraine"): many of them
+used to pass only through "os" or "ear" inside a word. They are not part of
+the regex: the text is split into words once and a phrase is looked up from
+its first word, so an off-domain text costs one set check for all of them.
+An accented phrase also accepts its fully unaccented spelling.
+"""
+
+import json
+import re
+from pathlib import Path
+
+from app.core.logger import logger
+
+# Liste de domaines médicaux (français et anglais)
+MEDICAL_DOMAINS = [
+    r"médic", r"health", r"santé", r"illness", r"maladie", r"condition",
+    r"symptom", r"symptôme", r"douleur", r"pain", r"fièvre", r"fever",
+    r"toux", r"cough", r"nausée", r"nausea", r"vertige", r"dizziness",
+    r"fatigue", r"tiredness", r"infection", r"inflammation", r"blessure",
+    r"injury", r"fracture", r"brûlure", r"burn", r"allergie", r"allergy",
+    r"éruption", r"rash", r"vomit", r"vomissement", r"cardiaque", r"cardiac",
+    r"respiratoire", r"respiratory", r"digestif", r"digestive", r"nerveux",
+    r"nervous", r"musculo", r"muscular", r"squelettique", r"skeletal",
+    r"endocrinien", r"endocrine", r"immunitaire", r"immune", r"reproducteur",
+    r"reproductive", r"blood", r"sang", r"médicament", r"drug", r"traitement",
+    r"treatment", r"thérapie", r"therapy", r"vaccin", r"vaccine", r"chirurgie",
+    r"surgery", r"diagnostic", r"prévention", r"prevention", r"rétablissement",
+    r"recovery", r"réhabilitation", r"rehab", r"tête", r"head", r"coeur", r"heart",
+    r"poumon", r"lung", r"estomac", r"stomach", r"foie", r"liver", r"rein", r"kidney",
+    r"muscle", r"os", r"bone", r"peau", r"skin", r"yeux", r"eyes", r"oreille", r"ear",
+    r"nez", r"nose", r"gorge", r"throat", r"dent", r"tooth", r"brain", r"cerveau",
+    r"spine", r"colonne", r"médecin", r"doctor", r"infirmier", r"nurse", r"hôpital",
+    r"hospital", r"clinique", r"clinic", r"urgence", r"emergency", r"généraliste",
+    r"GP", r"spécialiste", r"specialist", r"dermatologue", r"dermatologist",
+    r"cardiologue", r"cardiologist", r"neurologue", r"neurologist", r"pédiatre",
+    r"pediatrician", r"gynécologue", r"gynecologist", r"psychiatre", r"psychiatrist",
+    r"cancer", r"diabète", r"diabetes", r"asthme", r"asthma", r"hypertension",
+    r"cholestérol", r"cholesterol", r"depression", r"dépression", r"anxiété", r"anxiety",
+    r"arthrite", r"arthritis", r"alzheimer", r"parkinson", r"epilepsy", r"épilepsie"
+]
+
+# Matched by the compiled classifier only: words that used to pass through "os"
+# inside a word, and inflections the list above misses
+MEDICAL_EXTRA = [r"osis", r"tired", r"dizzy"]
+
+MAPPING_PATH = Path(__file__).resolve().parent.parent / "datasets" / "mapping.json"
+
+
+# Termes alimentaires (français et anglais)
+FOOD_DOMAINS = [
+    r"food", r"aliment", r"nourriture", r"nutrition", r"nutritif", r"meal", r"repas",
+    r"fruit", r"fruits", r"légume", r"vegetable", r"viande", r"meat", r"poisson", r"fish",
+    r"produit laitier", r"dairy", r"céréale", r"grain", r"légumineuse", r"legume",
+    r"noix", r"nut", r"graine", r"seed", r"épice", r"spice", r"herbe", r"herb",
+    r"boisson", r"drink", r"recette", r"recipe", r"cuisine", r"cooking", r"calorie",
+    r"protéine", r"protein", r"glucide", r"carb", r"carbohydrate", r"lipide", r"fat",
+    r"vitamine", r"vitamin", r"minéral", r"mineral", r"fibre", r"fiber", r"régime",
+    r"diet", r"allergie alimentaire", r"food allergy", r"intolérance", r"intolerance",
+    r"valeur nutritive", r"nutritional value", r"composition", r"ingrédient", r"ingredient",
+    r"bienfait", r"benefit", r"healthy", r"sain", r"manger", r"eat", r"consommer", r"consume",
+    r"apple", r"pomme", r"banana", r"banane", r"orange", r"tomato", r"tomate", r"potato",
+    r"patate", r"riz", r"rice", r"pâtes", r"pasta", r"pain", r"bread", r"fromage", r"cheese",
+    r"lait", r"milk", r"œuf", r"egg", r"sucre", r"sugar", r"sel", r"salt", r"huile", r"oil",
+    r"beurre", r"butter", r"yaourt", r"yogurt", r"café", r"coffee", r"thé", r"tea", r"eau", r"water"
+]
+
+# Short words found inside many unrelated words ("most", "year"): whole word only
+WHOLE_WORD = {"os", "ear", "gp"}
+
+# Unaccented spelling is a different, very common word
+ACCENT_STRICT = {"thé"}
+
+# Word edges where "_" separates words, unlike \b. The start of a whole word
+# is checked once the whole term is read (a lookbehind reaching back past it),
+# so every alternative begins with a literal and the check only runs on the
+# rare positions where the term itself matched, not at every "o" or "e"
+_END = r"(?![^\W_])"
+
+
+def _after_start(term: str) -> str:
+    return rf"(?<![^\W_]{'.' * len(term)})"
+
+
+# Regex appended after the term, for terms the generic rules get wrong
+MEDICAL_SUFFIXES = {
+    # "du pain", "le pain" … is bread, not pain
+    "pain": "".join(f"(?<!{p} pain)" for p in ("du", "le", "de", "au", "un")),
+    "ear": r"(?:s|ache)?" + _END,
+}
+FOOD_SUFFIXES = {
+    "fat": r"(?:s|ty)?" + _END,
+    "sain": r"e?s?" + _END,
+    "pain": r"s?" + _END,
+}
+
+# Accented letter → unaccented spelling
+_FOLD = {
+    "é": "e", "è": "e", "ê": "e", "ë": "e", "à": "a", "â": "a",
+    "î": "i", "ï": "i", "ô": "o", "û": "u", "ù": "u", "ç": "c", "œ": "oe",
+}
+_FOLD_TABLE = str.maketrans(_FOLD)
+
+# A word for phrase matching: "_" separates words, as in _after_start/_END
+_WORD = re.compile(r"[^\W_]+")
+# Same split for ASCII text (most replies) with str methods, several times faster
+_ASCII_SEPARATORS = str.maketrans(
+    {chr(c): " " for c in range(128) if not (chr(c).isascii() and chr(c).isalnum())}
+)
+
+
+def _words(text: str) -> list[str]:
+    if text.isascii():
+        return text.translate(_ASCII_SEPARATORS).split()
+    return _WORD.findall(text)
+
+
+def _lower(text: str, pos: int) -> tuple[str, int]:
+    # Minuscules de part et d'autre : quelques lettres changent de longueur
+    head = text[:pos].lower()
+    return head + text[pos:].lower(), len(head)
+
+
+def _tokens(term: str, strict: bool = False) -> list[str]:
+    out = []
+    for ch in term:
+        if ch == " ":
+            out.append(r"\s+")
+        elif not strict and ch in _FOLD:
+            out.append(f"(?:{ch}|{_FOLD[ch]})")
+        else:
+            out.append(re.escape(ch))
+    return out
+
+
+def _literal_first(tokens: list[str], first: str, strict: bool = False) -> list[list[str]]:
+    """Split an accent-folded first letter into one literal alternative per spelling."""
+    if strict or first not in _FOLD:
+        return [tokens]
+    return [[first, *tokens[1:]], [*_FOLD[first], *tokens[1:]]]
+
+
+def disease_names() -> list[str]:
+    try:
+        return list(json.loads(MAPPING_PATH.read_text(encoding="utf-8")))
+    except (OSError, ValueError) as e:
+        logger.warning(f"[Domain] disease names unavailable ({e}); medical terms only")
+        return []
+
+
+def _trie_regex(alternatives: list[list[str]]) -> str:
+    """
+    Factor token sequences into a nested alternation (a regex prefix trie).
+    A term that is a prefix of another absorbs it: only a boolean is needed.
+    """
+    trie: dict = {}
+    for tokens in alternatives:
+        node = trie
+        for tok in tokens:
+            node = node.setdefault(tok, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        if "" in node:
+            return ""
+        branches = [tok + build(child) for tok, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class DomainClassifier:
+    def __init__(
+        self,
+        terms: list[str],
+        suffixes: dict[str, str] | None = None,
+        phrases: list[str] | None = None,
+    ):
+        """``phrases`` (e.g. disease names) must match whole words."""
+        suffixes = suffixes or {}
+        alternatives = []
+        terms = list(dict.fromkeys(t.lower() for t in terms))
+        # Texte qu'un match peut couvrir, contexte des lookarounds et suffixes compris
+        # (un séparateur compté pour un caractère) : borne la fenêtre du garde en streaming
+        self.max_span = max(map(len, [*terms, *(phrases or [])]), default=0) + 8
+        # Contexte lu avant le début d'un match (lookbehinds "du pain", frontière de mot)
+        self.context = 8
+
+        for term in terms:
+            strict = term in ACCENT_STRICT
+            tokens = _tokens(term, strict)
+            if term in WHOLE_WORD:
+                # Termes ASCII : la largeur du lookbehind est celle du terme
+                tokens.append(_after_start(term))
+                tokens.append(suffixes.get(term, r"s?" + _END))
+            elif term in suffixes:
+                tokens.append(suffixes[term])
+            alternatives.extend(_literal_first(tokens, term[0], strict))
+        # Une regex par première lettre : chacune commence par un littéral que sre
+        # cherche d'abord, au lieu d'essayer tout le trie à chaque position
+        by_first: dict[str, list[list[str]]] = {}
+        for tokens in alternatives:
+            by_first.setdefault(tokens[0], []).append(tokens)
+        # Les lettres qui portent le plus de termes d'abord : matches s'arrête au premier hit
+        groups = sorted(by_first.items(), key=lambda item: (-len(item[1]), item[0]))
+        self.patterns = [re.compile(_trie_regex(group)) for _, group in groups]
+
+        # Phrases hors de la regex : un millier d'alternatives coûte surtout quand
+        # rien ne matche. Premier mot → suites de mots possibles
+        self.phrase_starts: dict[str, set[tuple[str, ...]]] = {}
+        for phrase in phrases or []:
+            words = _WORD.findall(phrase.lower())
+            folded = [w.translate(_FOLD_TABLE) for w in words]
+            for variant in dict.fromkeys([tuple(words), tuple(folded)]):
+                if variant:
+                    self.phrase_starts.setdefault(variant[0], set()).add(variant[1:])
+        self.first_words = frozenset(self.phrase_starts)
+
+    def find_phrase(self, text: str, pos: int = 0) -> str | None:
+        """First phrase found as consecutive words of lowercased ``text[pos:]``."""
+        if not self.phrase_starts:
+            return None
+        words = _words(text[pos:])
+        if pos and (m := _WORD.match(text, pos - 1)) and m.end() > pos:
+            words = words[1:]  # mot coupé par ``pos`` : pas un début de mot
+        # Seules les positions des premiers mots présents sont visitées
+        for word in self.first_words.intersection(words):
+            rests = self.phrase_starts[word]
+            if () in rests:
+                return word
+            i = -1
+            while True:
+                try:
+                    i = words.index(word, i + 1)
+                except ValueError:
+                    break
+                for rest in rests:
+                    if tuple(words[i + 1 : i + 1 + len(rest)]) == rest:
+                        return " ".join((word, *rest))
+        return None
+
+    def _find(self, text: str, pos: int = 0) -> str | None:
+        # Premières lettres distinctes : le match le plus à gauche est celui de la
+        # regex unique
+        hits = [m for pattern in self.patterns if (m := pattern.search(text, pos))]
+        if hits:
+            return min(hits, key=lambda m: m.start()).group(0)
+        return self.find_phrase(text, pos)
+
+    def _matches(self, text: str, pos: int = 0) -> bool:
+        return (
+            any(pattern.search(text, pos) for pattern in self.patterns)
+            or self.find_phrase(text, pos) is not None
+        )
+
+    def matches(self, text: str, pos: int = 0) -> bool:
+        """
+        ``pos``: matches must start there; ``text[:pos]`` is only context for
+        the word boundaries (at least ``context`` characters when it is cut).
+        """
+        return self._matches(*_lower(text, pos))
+
+    def matches_prefix(self, text: str, pos: int = 0) -> bool:
+        """
+        ``matches`` for the start of a text still being received: a match that
+        ends at the end of ``text`` is not counted, the next chunk may extend
+        its word ("pain" → "painful"). No term contains a digit, so one
+        appended after the text is a word character no term can absorb, and
+        it turns a last word into one no phrase contains.
+        """
+        text, pos = _lower(text, pos)
+        return self._matches(text + "0", pos)
+
+    def find(self, text: str) -> str | None:
+        """Return the first matching span (useful to explain a decision)."""
+        return self._find(text.lower())
+
+
+medical_classifier = DomainClassifier(
+    MEDICAL_DOMAINS + MEDICAL_EXTRA, MEDICAL_SUFFIXES, disease_names()
+)
+food_classifier = DomainClassifier(FOOD_DOMAINS, FOOD_SUFFIXES)
+
+
+def is_medical_question(prompt: str) -> bool:
+    """Vérifie si la question concerne le domaine médical"""
+    return medical_classifier.matches(prompt)
+
+
+def is_food_related(prompt: str) -> bool:
+    """Vérifie si la question concerne l'alimentation"""
+    return food_classifier.matches(prompt)
@@ -1,37 +1,144 @@
 # app/services/food_info.py
+import numpy as np
 import pandas as pd
-from difflib import get_close_matches
+from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
+from typing import NamedTuple
+
+from app.core.services import register, get_service
+from app.utils.ngram_index import NgramIndex
 
-# Load and normalize once at import time
 _DATA_PATH = Path(__file__).resolve().parent.parent / "datasets" / "food_nutrition.csv"
-_FOOD_DF = pd.read_csv(_DATA_PATH)
-_FOOD_DF["key"] = _FOOD_DF["food"].str.lower().str.strip()
-_FOOD_KEYS = _FOOD_DF["key"].tolist()
+
+# Up to this many foods every key is bounded (exact difflib results); above it
+# only the MAX_CANDIDATES keys sharing most trigrams with the query are re-ranked
+EXHAUSTIVE_MAX_KEYS = 20_000
+MAX_CANDIDATES = 200
+
+# Nutrient values are per 100 g; an item given as a count ("1 apple") is one portion
+PORTION_GRAMS = 100.0
+
+
+class FoodRecord(NamedTuple):
+    name: str
+    calories: float
+    fat_g: float
+    saturated_fat_g: float
+    carbs_g: float
+    sugars_g: float
+    protein_g: float
+    fiber_g: float
+
+
+# Dataset column of each FoodRecord field (after "name")
+RECORD_COLUMNS = [
+    "Caloric Value", "Fat", "Saturated Fats", "Carbohydrates",
+    "Sugars", "Protein", "Dietary Fiber",
+]
+NUTRIENTS = FoodRecord._fields[1:]
+
+
+@dataclass
+class FoodTable:
+    df: pd.DataFrame
+    keys: list[str]
+    records: dict[str, FoodRecord]  # key → first row with that key
+    index: NgramIndex
+    row_of: dict[str, int]  # key → row of ``matrix``
+    matrix: np.ndarray  # (foods, NUTRIENTS) values per 100 g
+
+
+def _load_foods() -> FoodTable:
+    """Load and normalize the nutrition table once (lazily or at warmup)."""
+    df = pd.read_csv(_DATA_PATH)
+    df["key"] = df["food"].str.lower().str.strip()
+    records: dict[str, FoodRecord] = {}
+    rows = zip(df["key"], df["food"], *(df[c].astype(float) for c in RECORD_COLUMNS))
+    for key, name, *values in rows:
+        records.setdefault(key, FoodRecord(name, *values))
+    keys = df["key"].tolist()
+    return FoodTable(
+        df=df,
+        keys=keys,
+        records=records,
+        index=NgramIndex(list(records)),
+        row_of={key: i for i, key in enumerate(records)},
+        matrix=np.array([r[1:] for r in records.values()], dtype=float).reshape(-1, len(NUTRIENTS)),
+    )
+
+
+register("food", _load_foods)
+
+
+def _search(foods: FoodTable, q: str, n: int, cutoff: float) -> list[str]:
+    return foods.index.close_matches(
+        q,
+        n=n,
+        cutoff=cutoff,
+        exhaustive=len(foods.index) <= EXHAUSTIVE_MAX_KEYS,
+        max_candidates=MAX_CANDIDATES,
+    )
 
 
 @lru_cache(maxsize=256)
 def get_food_match(query: str) -> str | None:
     """Return the best matching food key or None."""
     q = query.lower().strip()
-    matches = get_close_matches(q, _FOOD_KEYS, n=1, cutoff=0.6)
+    foods = get_service("food")
+    if q in foods.records:
+        return q
+    matches = _search(foods, q, n=1, cutoff=0.6)
     return matches[0] if matches else None
 
 
+def get_food_suggestions(query: str, n: int = 3, cutoff: float = 0.4) -> list[str]:
+    """Closest food names, best first, for a "did you mean" prompt."""
+    foods = get_service("food")
+    matches = _search(foods, query.lower().strip(), n=n, cutoff=cutoff)
+    return [foods.records[key].name for key in matches]
+
+
+def get_food_record(name: str) -> FoodRecord | None:
+    """Nutrition record of the best match for ``name`` (O(1) after the match)."""
+    key = get_food_match(name)
+    return get_service("food").records[key] if key else None
+
+
 def get_food_info(name: str) -> dict | None:
     """Return nutrition info for the given food name or None."""
-    key = get_food_match(name)
-    if not key:
-        return None
-    row = _FOOD_DF[_FOOD_DF["key"] == key].iloc[0]
+    record = get_food_record(name)
+    return record._asdict() if record else None
+
+
+def analyze_meal(items: list[tuple[str, float | None, float]]) -> dict:
+    """
+    Nutrients of a meal given as ``(food, grams, count)`` items (``grams`` None →
+    ``count`` portions). Matched rows are scaled and summed in one matrix product.
+    """
+    foods = get_service("food")
+    rows, grams, matched, unmatched = [], [], [], []
+    for query, weight, count in items:
+        key = get_food_match(query)
+        if key is None:
+            unmatched.append({"query": query, "suggestions": get_food_suggestions(query)})
+            continue
+        g = weight if weight is not None else count * PORTION_GRAMS
+        rows.append(foods.row_of[key])
+        grams.append(g)
+        matched.append({"query": query, "food": foods.records[key].name, "grams": round(g, 1)})
+
+    values = foods.matrix[rows]  # (items, nutrients)
+    factors = np.asarray(grams, dtype=float) / 100.0
+    per_item = values * factors[:, None]
+    totals = factors @ values
+    for entry, row in zip(matched, per_item.round(1).tolist()):
+        entry.update(zip(NUTRIENTS, row))
     return {
-        "name": row["food"],
-        "calories": row["Caloric Value"],
-        "fat_g": row["Fat"],
-        "saturated_fat_g": row["Saturated Fats"],
-        "carbs_g": row["Carbohydrates"],
-        "sugars_g": row["Sugars"],
-        "protein_g": row["Protein"],
-        "fiber_g": row["Dietary Fiber"],
+        "items": matched,
+        "unmatched": unmatched,
+        "totals": {
+            "grams": round(float(factors.sum() * 100), 1),
+            **dict(zip(NUTRIENTS, totals.round(1).tolist())),
+        },
     }
@@ -0,0 +1,108 @@
+# app/services/language.py
+"""
+French / English detection for chat messages.
+
+``langdetect`` builds n-gram probability profiles and runs several randomized
+trials per call (a few ms, and non-deterministic unless seeded), while the chat
+only needs "French or English". Cheap signals are tried first: the greeting
+words, French accents and elisions (``j'ai``, ``c'est``) and function-word
+counts. The seeded model only runs when they are inconclusive, and its answer
+is remembered per session so later ambiguous turns ("ok", "3 days") reuse it.
+"""
+
+import re
+from functools import lru_cache
+
+from langdetect import DetectorFactory, detect
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+DetectorFactory.seed = 0  # résultats reproductibles
+
+# Greeting sets per language
+GREETINGS = {
+    "English": {"hi", "hello", "hey"},
+    "French": {"salut", "bonjour", "coucou"},
+}
+
+_FRENCH_WORDS = {
+    "le", "la", "les", "un", "une", "des", "du", "de", "au", "aux", "et", "est",
+    "sont", "je", "tu", "il", "elle", "nous", "vous", "ils", "elles", "mon", "ma",
+    "mes", "ta", "tes", "sa", "ses", "ce", "cette", "ces", "que", "qui", "quoi",
+    "quel", "quelle", "quels", "pour", "dans", "avec", "sur", "pas", "ne", "mais",
+    "ou", "donc", "très", "bien", "mal", "suis", "ai", "avez", "avoir", "être",
+    "fait", "faire", "depuis", "quand", "comment", "pourquoi", "aussi", "peux",
+    "puis", "dois", "merci", "oui", "non", "aujourd", "hier", "jours", "beaucoup",
+    "trop", "peu", "moi", "leur", "chez", "sans", "sous", "entre", "après", "avant",
+    "tout", "tous",
+}
+_ENGLISH_WORDS = {
+    "the", "and", "is", "are", "was", "were", "i", "you", "he", "she", "it", "we",
+    "they", "my", "your", "his", "her", "our", "their", "this", "that", "these",
+    "those", "what", "which", "who", "how", "why", "when", "where", "to", "of",
+    "in", "for", "with", "at", "not", "no", "but", "or", "so", "very", "have",
+    "has", "had", "do", "does", "did", "be", "been", "am", "can", "could", "should",
+    "would", "will", "from", "about", "after", "because", "there", "here", "its",
+    "thanks", "thank", "yes", "since", "days", "feel", "get", "much", "some", "any",
+    "eat", "all", "if", "than", "then", "just",
+}
+# Mots communs aux deux langues : aucun signal
+_FRENCH_WORDS, _ENGLISH_WORDS = _FRENCH_WORDS - _ENGLISH_WORDS, _ENGLISH_WORDS - _FRENCH_WORDS
+for _lang, _words in GREETINGS.items():
+    (_FRENCH_WORDS if _lang == "French" else _ENGLISH_WORDS).update(_words)
+
+_WORD = re.compile(r"[a-zà-ÿœæ]+")
+_ACCENTED = re.compile(r"[àâçéèêëîïôûùüÿœæ]")
+_ELISION = re.compile(r"\b(?:[cdjlmnst]|qu)['’][a-zà-ÿ]")
+
+# Remembered per session; expires with the chat history
+_session_languages = TTLCache(maxsize=settings.session_max_sessions, ttl=settings.session_ttl)
+
+
+def quick_language(text: str) -> str | None:
+    """
+    "French"/"English" from cheap signals, or None when they are inconclusive.
+    """
+    lower = text.lower().strip()
+    for lang, words in GREETINGS.items():
+        if lower in words:
+            return lang
+    words = _WORD.findall(lower)
+    french = sum(w in _FRENCH_WORDS for w in words) + len(_ELISION.findall(lower))
+    french += sum(1 for w in words if _ACCENTED.search(w))
+    english = sum(w in _ENGLISH_WORDS for w in words)
+    # Il faut un écart net : un mot isolé de l'autre langue ne suffit pas
+    if french >= 2 * english + 1:
+        return "French"
+    if english >= 2 * french + 1:
+        return "English"
+    return None
+
+
+@lru_cache(maxsize=4096)
+def model_language(text: str) -> str:
+    """
+    Seeded langdetect. Defaults to English, handles French.
+    """
+    try:
+        code = detect(text)
+        return {"fr": "French"}.get(code[:2], "English")
+    except Exception:
+        return "English"
+
+
+def detect_language(text: str, session_id: str | None = None) -> str:
+    """
+    Cheap signals first; then the session's previous language; then the model.
+    """
+    lang = quick_language(text)
+    if lang is None and session_id is not None:
+        lang = _session_languages.get(session_id)
+        if lang is not None:
+            return lang
+    if lang is None:
+        lang = model_language(text)
+    if session_id is not None:
+        _session_languages.set(session_id, lang)
+    return lang
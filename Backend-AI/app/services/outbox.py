@@ -0,0 +1,349 @@
+# app/services/outbox.py
+"""
+Non-blocking persistence outbox towards the Node.js backend.
+
+Handlers call ``outbox.enqueue(target, payload)`` and return immediately.
+A background task drains the in-memory queue in batches over a pooled
+``httpx.AsyncClient`` (bulk routes when Node has one), retries with
+exponential backoff, and spools to a local SQLite file whenever Node is
+unreachable so no prediction or plan is lost. Spooled rows are replayed
+once Node answers again, including rows left by a previous process.
+"""
+
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import httpx
+
+from app.core.config import settings
+from app.core.logger import logger
+from app.core.metrics import observe_upstream
+
+
+@dataclass(frozen=True)
+class Target:
+    path: str
+    bulk_path: str | None = None  # POST {"predictions": [...]} in one write
+
+
+TARGETS = {
+    "diabetes": Target("/api/save", "/api/save/bulk"),
+    "hypertension": Target("/api/save1", "/api/save1/bulk"),
+    "plan": Target("/api/plan/save"),
+}
+
+# A spooled row claimed by a worker is invisible to the others for this long
+_LEASE_SECONDS = 60.0
+
+
+class _Spool:
+    """SQLite-backed on-disk queue, safe to share between uvicorn workers."""
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS outbox ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " target TEXT NOT NULL,"
+                " payload TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " lease_until REAL NOT NULL DEFAULT 0)"
+            )
+
+    def push(self, items: list[tuple[str, dict]]) -> None:
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO outbox (target, payload, created_at) VALUES (?, ?, ?)",
+                [(t, json.dumps(p), now) for t, p in items],
+            )
+
+    def claim(self, limit: int) -> list[tuple[int, str, dict]]:
+        now = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(
+                    "SELECT id, target, payload FROM outbox"
+                    " WHERE lease_until < ? ORDER BY id LIMIT ?",
+                    (now, limit),
+                ).fetchall()
+                self._db.executemany(
+                    "UPDATE outbox SET lease_until = ? WHERE id = ?",
+                    [(now + _LEASE_SECONDS, r[0]) for r in rows],
+                )
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        return [(i, t, json.loads(p)) for i, t, p in rows]
+
+    def release(self, ids: list[int]) -> None:
+        with self._lock:
+            self._db.executemany("UPDATE outbox SET lease_until = 0 WHERE id = ?", [(i,) for i in ids])
+
+    def delete(self, ids: list[int]) -> None:
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+
+    def count(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class PersistenceOutbox:
+    def __init__(
+        self,
+        base_url: str = settings.node_backend_url,
+        spool_path: str = settings.outbox_spool_path,
+        batch_size: int = settings.outbox_batch_size,
+        flush_interval: float = settings.outbox_flush_interval,
+        max_retries: int = settings.outbox_max_retries,
+        queue_size: int = settings.outbox_queue_size,
+        timeout: float = settings.node_timeout,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+        self._queue: asyncio.Queue | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._client: httpx.AsyncClient | None = None
+        self._spool: _Spool | None = None
+        self._tasks: list[asyncio.Task] = []
+        # Batch taken off the queue by _drain_queue and not yet sent or spooled
+        self._in_hand: list[tuple[str, dict]] = []
+        self._node_down_until = 0.0
+        self.stats = {"enqueued": 0, "sent": 0, "spooled": 0, "replayed": 0, "dropped": 0}
+
+    # ------------------------------------------------------------------ lifecycle
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._spool = self._spool or await asyncio.to_thread(_Spool, self.spool_path)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(self.timeout),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+        self._tasks = [
+            asyncio.create_task(self._drain_queue()),
+            asyncio.create_task(self._replay_spool()),
+        ]
+        pending = await asyncio.to_thread(self._spool.count)
+        logger.info(f"[Outbox] started → {self.base_url} ({pending} spooled rows pending)")
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Ce qui reste en mémoire part sur disque : rejoué au prochain démarrage
+        leftovers = []
+        while self._queue is not None and not self._queue.empty():
+            leftovers.append(self._queue.get_nowait())
+        if leftovers:
+            self._spool.push(leftovers)
+            self.stats["spooled"] += len(leftovers)
+        if self._client:
+            await self._client.aclose()
+        if self._spool:
+            self._spool.close()
+            self._spool = None
+        self._loop = None
+        logger.info(f"[Outbox] stopped ({len(leftovers)} queued writes spooled)")
+
+    # ------------------------------------------------------------------ producers
+    def enqueue(self, target: str, payload: dict) -> None:
+        self.enqueue_many(target, [payload])
+
+    def enqueue_many(self, target: str, payloads: list[dict]) -> None:
+        """Queue writes for ``target``; safe to call from sync handlers' threads."""
+        if target not in TARGETS:
+            raise ValueError(f"Unknown outbox target: {target}")
+        items = [(target, p) for p in payloads]
+        if self._loop is None:
+            # Outbox not started (scripts, tests): persist directly to the spool
+            self._spool = self._spool or _Spool(self.spool_path)
+            self._spool.push(items)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._put(items)
+        else:
+            self._loop.call_soon_threadsafe(self._put, items)
+
+    def _put(self, items: list[tuple[str, dict]]) -> None:
+        overflow = []
+        for item in items:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                overflow.append(item)
+        self.stats["enqueued"] += len(items) - len(overflow)
+        if overflow:
+            self._spool.push(overflow)
+            self.stats["spooled"] += len(overflow)
+
+    # ------------------------------------------------------------------ consumers
+    async def _drain_queue(self) -> None:
+        while True:
+            try:
+                try:
+                    await self._drain_once()
+                except Exception:
+                    # Spool indisponible (disque plein, base verrouillée) : on garde le lot
+                    logger.exception(f"[Outbox] drain failed, {len(self._in_hand)} writes held for retry")
+                    await asyncio.sleep(self.flush_interval)
+            except asyncio.CancelledError:
+                # Arrêt : le lot déjà retiré de la file ne doit pas être perdu
+                if self._in_hand:
+                    try:
+                        self._spool.push(self._in_hand)
+                        self.stats["spooled"] += len(self._in_hand)
+                    except Exception:
+                        logger.exception(f"[Outbox] {len(self._in_hand)} writes lost at shutdown")
+                    self._in_hand = []
+                raise
+
+    async def _drain_once(self) -> None:
+        if not self._in_hand:
+            self._in_hand = [await self._queue.get()]
+        deadline = self._loop.time() + self.flush_interval
+        while len(self._in_hand) < self.batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                self._in_hand.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        if time.monotonic() >= self._node_down_until:
+            await self._send_in_hand()
+            if not self._in_hand:
+                return
+            self._node_down_until = time.monotonic() + self._replay_interval
+        await self._spool_in_hand()
+
+    async def _spool_in_hand(self) -> None:
+        items, self._in_hand = self._in_hand, []
+        try:
+            await asyncio.to_thread(self._spool.push, items)
+        except asyncio.CancelledError:
+            # Le thread termine l'écriture malgré l'annulation
+            raise
+        except Exception:
+            self._in_hand = items + self._in_hand
+            raise
+        self.stats["spooled"] += len(items)
+
+    async def _send_in_hand(self) -> None:
+        """Send the held batch with retries; what Node never accepted stays in hand."""
+        for attempt in range(self.max_retries + 1):
+            failed = await self._send(self._in_hand)
+            self._in_hand = [self._in_hand[i] for i in failed]
+            if not self._in_hand:
+                return
+            if attempt < self.max_retries:
+                await asyncio.sleep(min(10.0, 0.2 * 2**attempt) * (1 + random.random()))
+
+    @property
+    def _replay_interval(self) -> float:
+        return max(5.0, self.flush_interval * 10)
+
+    async def _replay_spool(self) -> None:
+        while True:
+            await asyncio.sleep(self._replay_interval)
+            try:
+                await self._replay_once()
+            except Exception:
+                logger.exception("[Outbox] spool replay failed; retrying later")
+
+    async def _replay_once(self) -> None:
+        rows = await asyncio.to_thread(self._spool.claim, self.batch_size)
+        if not rows:
+            return
+        failed = set(await self._send([(t, p) for _, t, p in rows]))
+        done = [row[0] for i, row in enumerate(rows) if i not in failed]
+        retry = [row[0] for i, row in enumerate(rows) if i in failed]
+        await asyncio.to_thread(self._spool.delete, done)
+        if retry:
+            await asyncio.to_thread(self._spool.release, retry)
+            self._node_down_until = time.monotonic() + self._replay_interval
+        else:
+            self._node_down_until = 0.0
+        self.stats["replayed"] += len(done)
+
+    async def _send(self, batch: list[tuple[str, dict]]) -> list[int]:
+        """POST the batch grouped by target; return the indexes of the items not accepted."""
+        groups: dict[str, list[int]] = {}
+        for i, (target, _) in enumerate(batch):
+            groups.setdefault(target, []).append(i)
+
+        results = await asyncio.gather(
+            *(
+                self._send_group(TARGETS[name], [(i, batch[i][1]) for i in indexes])
+                for name, indexes in groups.items()
+            )
+        )
+        return sorted(i for failed in results for i in failed)
+
+    async def _send_group(self, target: Target, items: list[tuple[int, dict]]) -> list[int]:
+        if target.bulk_path:
+            ok = await self._post(target.bulk_path, {"predictions": [p for _, p in items]}, len(items))
+            return [] if ok else [i for i, _ in items]
+        oks = await asyncio.gather(*(self._post(target.path, p, 1) for _, p in items))
+        return [i for (i, _), ok in zip(items, oks) if not ok]
+
+    async def _post(self, path: str, body: dict, count: int) -> bool:
+        start = time.perf_counter()
+        try:
+            res = await self._client.post(path, json=body)
+        except httpx.HTTPError as e:
+            observe_upstream("node", "error", start)
+            logger.warning(f"[Outbox] {path} unreachable: {e!r}")
+            return False
+        observe_upstream("node", res.status_code, start)
+        if res.status_code < 400:
+            self.stats["sent"] += count
+            return True
+        if res.status_code < 500:
+            # Requête invalide : la rejouer ne changera rien
+            logger.error(f"[Outbox] {path} rejected {count} writes ({res.status_code}): {res.text[:200]}")
+            self.stats["dropped"] += count
+            return True
+        logger.warning(f"[Outbox] {path} failed with {res.status_code}")
+        return False
+
+    def status(self) -> dict:
+        return {
+            **self.stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "node_down": time.monotonic() < self._node_down_until,
+            "pid": os.getpid(),
+        }
+
+
+outbox = PersistenceOutbox()
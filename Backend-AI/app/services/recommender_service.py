@@ -1,7 +1,27 @@
 from app.models.knn_matcher import KNNFitnessRecommender
+from app.core.artifacts import ArtifactSpec
+from app.core.config import settings
+from app.core.services import register, get_service
 import os
 
 MODEL_PATH = os.path.join("app", "datasets", "gym_data_cleaned.csv")
 
-recommender = KNNFitnessRecommender(data_path=MODEL_PATH)
-recommender.load_and_prepare_data()
+
+def _fit_recommender() -> KNNFitnessRecommender:
+    model = KNNFitnessRecommender(data_path=MODEL_PATH, index=settings.recommender_index)
+    model.load_and_prepare_data()
+    return model
+
+
+RECOMMENDER_ARTIFACT = ArtifactSpec(
+    name="knn_recommender",
+    sources=[MODEL_PATH],
+    build=_fit_recommender,
+    extra={"n_neighbors": 10, "fast_path": 1, "index": settings.recommender_index},
+)
+
+register("recommender", RECOMMENDER_ARTIFACT.load)
+
+
+def get_recommender() -> KNNFitnessRecommender:
+    return get_service("recommender")
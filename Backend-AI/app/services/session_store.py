@@ -0,0 +1,209 @@
+# app/services/session_store.py
+"""
+Chat session history stores.
+
+``MemorySessionStore`` is a per-worker LRU with TTL and a cap on both the number
+of sessions and the approximate bytes held. ``RedisSessionStore`` keeps each
+history in a Redis list (one key per session, trimmed and expiring), so every
+worker sees the same conversation and it survives restarts; it needs the
+optional ``redis`` package. Select one with ``SESSION_STORE=memory|redis``.
+
+History sent upstream is further cut to a token budget (``trim_to_budget``).
+"""
+
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+
+from app.core.config import settings
+from app.core.logger import logger
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # dépendance optionnelle
+    aioredis = None
+
+# Per-message bookkeeping added to the content length in the memory cap
+_MESSAGE_OVERHEAD = 64
+
+
+def approx_tokens(message: dict) -> int:
+    """~4 characters per token plus the role/format overhead of a chat message."""
+    return len(message["content"]) // 4 + 4
+
+
+def trim_to_budget(history: list[dict], budget: int) -> list[dict]:
+    """Most recent messages whose estimated tokens fit ``budget``."""
+    kept, used = [], 0
+    for message in reversed(history):
+        used += approx_tokens(message)
+        if used > budget:
+            break
+        kept.append(message)
+    kept.reverse()
+    # Ne pas commencer par une réponse dont la question a été coupée
+    while kept and kept[0]["role"] == "assistant":
+        kept.pop(0)
+    return kept
+
+
+class SessionStore(ABC):
+    name = "abstract"
+
+    @abstractmethod
+    async def get(self, session_id: str) -> list[dict]:
+        """Stored history, oldest first (empty for unknown/expired sessions)."""
+
+    @abstractmethod
+    async def append(self, session_id: str, messages: list[dict]) -> None:
+        """Append turns, keep the last ``max_messages`` and refresh the TTL."""
+
+    @abstractmethod
+    async def clear(self, session_id: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    def stats(self) -> dict: ...
+
+
+class MemorySessionStore(SessionStore):
+    name = "memory"
+
+    def __init__(self, max_messages: int, ttl: float, max_sessions: int, max_bytes: int):
+        self.max_messages = max_messages
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        # session → (expires_at, messages); order = least recently used first
+        self._sessions: OrderedDict[str, tuple[float, deque]] = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _size(messages) -> int:
+        return sum(len(m["content"]) + _MESSAGE_OVERHEAD for m in messages)
+
+    def _drop(self, session_id: str) -> None:
+        _, messages = self._sessions.pop(session_id)
+        self._bytes -= self._size(messages)
+
+    def _live(self, session_id: str) -> deque | None:
+        entry = self._sessions.get(session_id)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._drop(session_id)
+            self.expirations += 1
+            return None
+        return entry[1]
+
+    async def get(self, session_id: str) -> list[dict]:
+        messages = self._live(session_id)
+        if messages is None:
+            return []
+        self._sessions.move_to_end(session_id)
+        return list(messages)
+
+    async def append(self, session_id: str, messages: list[dict]) -> None:
+        history = self._live(session_id)
+        if history is None:
+            history = deque(maxlen=self.max_messages)
+        before = self._size(history)
+        history.extend(messages)
+        self._bytes += self._size(history) - before
+        self._sessions[session_id] = (time.monotonic() + self.ttl, history)
+        self._sessions.move_to_end(session_id)
+        # LRU : on évince les plus anciennes sessions au-delà des plafonds
+        while len(self._sessions) > 1 and (
+            len(self._sessions) > self.max_sessions or self._bytes > self.max_bytes
+        ):
+            self._drop(next(iter(self._sessions)))
+            self.evictions += 1
+
+    async def clear(self, session_id: str) -> None:
+        if session_id in self._sessions:
+            self._drop(session_id)
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class RedisSessionStore(SessionStore):
+    """One Redis list per session; errors degrade to an empty history."""
+
+    name = "redis"
+
+    def __init__(self, url: str, max_messages: int, ttl: float, prefix: str = "medchat:session:"):
+        self.url = url
+        self.max_messages = max_messages
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self._redis = aioredis.from_url(url, decode_responses=True)
+        self.errors = 0
+
+    def _key(self, session_id: str) -> str:
+        return self.prefix + session_id
+
+    async def get(self, session_id: str) -> list[dict]:
+        try:
+            raw = await self._redis.lrange(self._key(session_id), 0, -1)
+        except (aioredis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning(f"[Sessions] redis read failed, empty history: {e}")
+            return []
+        return [json.loads(m) for m in raw]
+
+    async def append(self, session_id: str, messages: list[dict]) -> None:
+        key = self._key(session_id)
+        try:
+            async with self._redis.pipeline(transaction=True) as pipe:
+                pipe.rpush(key, *(json.dumps(m, ensure_ascii=False) for m in messages))
+                pipe.ltrim(key, -self.max_messages, -1)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except (aioredis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning(f"[Sessions] redis write failed, turn not stored: {e}")
+
+    async def clear(self, session_id: str) -> None:
+        try:
+            await self._redis.delete(self._key(session_id))
+        except (aioredis.RedisError, OSError) as e:
+            self.errors += 1
+            logger.warning(f"[Sessions] redis delete failed: {e}")
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": self.name, "url": self.url.split("@")[-1], "errors": self.errors}
+
+
+def create_session_store() -> SessionStore:
+    if settings.session_store == "redis":
+        if aioredis is not None:
+            return RedisSessionStore(
+                settings.redis_url, settings.chat_history_max, settings.session_ttl
+            )
+        logger.warning("[Sessions] SESSION_STORE=redis but 'redis' is not installed; using memory")
+    return MemorySessionStore(
+        max_messages=settings.chat_history_max,
+        ttl=settings.session_ttl,
+        max_sessions=settings.session_max_sessions,
+        max_bytes=settings.session_max_bytes,
+    )
+
+
+session_store = create_session_store()
@@ -0,0 +1,361 @@
+# app/services/symptom_index.py
+"""
+Append-only symptom index.
+
+Texts become term counts in a ``TermSpace``: the vocabulary of the training
+texts keeps one exact column per term (the columns ``TfidfVectorizer`` would
+fit), and only terms outside it, which can only come from runtime additions,
+are hashed into ``N_HASHED`` extra columns. Adding rows therefore never refits
+a vocabulary: document frequencies are maintained online and the smoothed IDF
+(``ln((1 + n) / (1 + df)) + 1``, as ``TfidfVectorizer``) is re-applied to the
+stored counts, which is a vectorized pass over the sparse data without
+re-tokenizing anything. Rankings over the training rows are those of a fitted
+``TfidfVectorizer``; two new terms sharing a hash bucket is the only
+approximation (benchmarks/bench_symptom_index.py measures the agreement).
+
+Queries read an immutable ``IndexSnapshot``; an append builds the next one off
+the request path and publishes it with a single attribute assignment. The
+inverted (term → rows) matrix is kept so a query only touches the postings of
+its own terms.
+
+New labelled rows go through an append-only CSV log shared by every worker
+(the admin API and the file-drop inbox both write to it). Each worker tails the
+log and applies the lines it has not seen yet, so all workers converge.
+"""
+
+import asyncio
+import csv
+import io
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import CountVectorizer, HashingVectorizer
+from sklearn.preprocessing import normalize
+
+from app.core import services
+from app.core.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows : appends non verrouillés
+    fcntl = None
+
+# Columns for the terms the training vocabulary does not know
+N_HASHED = 2**20
+
+
+def clean_text(text: str) -> str:
+    """One line, lowercased: the form stored in the index and in the log."""
+    return " ".join(str(text).split()).lower()
+
+
+class TermSpace:
+    """
+    Exact columns ``[0, len(vocabulary))`` for the fitted vocabulary, hashed
+    columns after them for every other term. Same tokenization as the default
+    ``TfidfVectorizer``, raw counts out.
+    """
+
+    def __init__(self, vocabulary: dict[str, int]):
+        self.vocabulary = vocabulary
+        self.n_exact = len(vocabulary)
+        self.n_features = self.n_exact + N_HASHED
+        self._exact = CountVectorizer(vocabulary=vocabulary)
+        analyze = self._exact.build_analyzer()
+        self._hasher = HashingVectorizer(
+            n_features=N_HASHED,
+            alternate_sign=False,
+            norm=None,
+            analyzer=lambda doc: [t for t in analyze(doc) if t not in vocabulary],
+        )
+
+    @classmethod
+    def fit(cls, texts: Iterable[str]) -> "TermSpace":
+        return cls(CountVectorizer().fit(texts).vocabulary_)
+
+    def counts(self, texts: Iterable[str]) -> sp.csr_matrix:
+        texts = list(texts)
+        return sp.hstack(
+            [self._exact.transform(texts), self._hasher.transform(texts)], format="csr"
+        )
+
+
+def _snippet(text: str) -> str:
+    return text[:80] + "..."
+
+
+def _weigh(counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+    """L2-normalized TF-IDF rows, without building an n_features diagonal."""
+    weighted = counts.astype(np.float64)
+    weighted.data *= idf[weighted.indices]
+    return normalize(weighted, copy=False)
+
+
+def index_arrays(counts: sp.csr_matrix, df: np.ndarray | None = None) -> dict:
+    """Document frequencies, smoothed IDF and term → rows postings of ``counts``."""
+    if df is None:
+        # Un terme compte une fois par ligne (indices uniques après sum_duplicates)
+        df = np.bincount(counts.indices, minlength=counts.shape[1])
+    n = counts.shape[0]
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    # Unseen terms are out of the vocabulary: no weight in the query norm
+    idf[df == 0] = 0.0
+    return {"df": df, "idf": idf, "postings": _weigh(counts, idf).T.tocsr()}
+
+
+@dataclass(frozen=True)
+class IndexSnapshot:
+    idf: np.ndarray
+    postings: sp.csr_matrix  # terms × rows, transposed normalized TF-IDF
+    labels: np.ndarray
+    snippets: np.ndarray
+    version: int
+
+    @property
+    def rows(self) -> int:
+        return len(self.labels)
+
+
+class AppendableIndex:
+    """
+    ``counts`` are the training rows in ``space``. ``base`` is ``index_arrays(counts)`` when it was persisted with the counts:
+    the first snapshot then uses those (memory-mapped, shared) buffers as is,
+    and only appends allocate private arrays.
+    """
+
+    def __init__(
+        self,
+        space: TermSpace,
+        counts: sp.csr_matrix,
+        labels: Iterable[int],
+        texts: Iterable[str],
+        base: dict | None = None,
+    ):
+        self._space = space
+        self._counts = sp.csr_matrix(counts)
+        self._counts.sum_duplicates()
+        self._labels = np.asarray(labels, dtype=np.int64)
+        self._snippets = np.array([_snippet(t) for t in texts], dtype=object)
+        base = base or index_arrays(self._counts)
+        self._df = base["df"]
+        self._lock = threading.Lock()
+        self._version = 0
+        self.base_rows = len(self._labels)
+        self.last_apply_seconds: float | None = None
+        self.snapshot = self._build_snapshot(base)
+
+    def _build_snapshot(self, arrays: dict | None = None) -> IndexSnapshot:
+        arrays = arrays or index_arrays(self._counts, self._df)
+        return IndexSnapshot(
+            idf=arrays["idf"],
+            postings=arrays["postings"],
+            labels=self._labels,
+            snippets=self._snippets,
+            version=self._version,
+        )
+
+    def append(self, texts: list[str], labels: list[int]) -> int:
+        """Add rows and publish a new snapshot; queries keep the old one meanwhile."""
+        if not texts:
+            return 0
+        texts = [clean_text(t) for t in texts]
+        with self._lock:
+            start = time.perf_counter()
+            new = self._space.counts(texts)
+            self._counts = sp.vstack([self._counts, new], format="csr")
+            self._df = self._df + np.bincount(new.indices, minlength=self._space.n_features)
+            self._labels = np.concatenate([self._labels, np.asarray(labels, dtype=np.int64)])
+            self._snippets = np.concatenate(
+                [self._snippets, np.array([_snippet(t) for t in texts], dtype=object)]
+            )
+            self._version += 1
+            self.snapshot = self._build_snapshot()
+            self.last_apply_seconds = round(time.perf_counter() - start, 3)
+        logger.info(
+            f"[SymptomIndex] +{len(texts)} rows → {len(self._labels)} "
+            f"(v{self._version}, {self.last_apply_seconds}s)"
+        )
+        return len(texts)
+
+    def search(self, texts: list[str], top_k: int) -> list[list[tuple[int, float, str]]]:
+        """
+        Top-k distinct labels per text as ``(label, cosine, snippet)``, the score
+        of a label being its best matching row.
+        """
+        snap = self.snapshot  # une seule lecture : cohérent pendant tout l'appel
+        queries = _weigh(self._space.counts(clean_text(t) for t in texts), snap.idf)
+        # Only the postings of the query terms are touched
+        sims = (queries @ snap.postings).tocsr()
+
+        results = []
+        for q in range(sims.shape[0]):
+            lo, hi = sims.indptr[q], sims.indptr[q + 1]
+            rows, scores = sims.indices[lo:hi], sims.data[lo:hi]
+            if not len(rows) or top_k <= 0:
+                results.append([])
+                continue
+            labels = snap.labels[rows]
+            # Best row of each label: sort by (label, -score), keep the first
+            order = np.lexsort((-scores, labels))
+            labels, rows, scores = labels[order], rows[order], scores[order]
+            first = np.r_[True, labels[1:] != labels[:-1]]
+            labels, rows, scores = labels[first], rows[first], scores[first]
+
+            k = min(top_k, len(scores))
+            top = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(k)
+            top = top[np.argsort(-scores[top], kind="stable")]
+            results.append(
+                [(int(labels[j]), float(scores[j]), snap.snippets[rows[j]]) for j in top]
+            )
+        return results
+
+    def stats(self) -> dict:
+        snap = self.snapshot
+        return {
+            "rows": snap.rows,
+            "base_rows": self.base_rows,
+            "added_rows": snap.rows - self.base_rows,
+            "labels": int(len(np.unique(snap.labels))),
+            "version": snap.version,
+            "last_apply_seconds": self.last_apply_seconds,
+        }
+
+
+class AdditionsLog:
+    """
+    Shared append-only CSV of ``text,label`` rows, plus a drop directory whose
+    ``*.csv`` files (same columns as the training dataset) are moved into it.
+    """
+
+    def __init__(self, path: str, inbox_dir: str):
+        self.path = Path(path)
+        self.inbox = Path(inbox_dir)
+        self.offset = 0  # bytes of the log already applied by this worker
+
+    def append(self, rows: list[tuple[str, int]]) -> None:
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator="\n")
+        for text, label in rows:
+            writer.writerow([clean_text(text), int(label)])
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(buf.getvalue())
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def read_new(self) -> list[tuple[str, int]]:
+        """Complete lines appended since the last call."""
+        if not self.path.exists():
+            return []
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        end = chunk.rfind(b"\n") + 1  # une ligne en cours d'écriture attend le prochain tour
+        if end == 0:
+            return []
+        self.offset += end
+        rows = []
+        for record in csv.reader(io.StringIO(chunk[:end].decode("utf-8"))):
+            try:
+                rows.append((record[0], int(record[1])))
+            except (IndexError, ValueError):
+                logger.warning(f"[SymptomIndex] skipped malformed log line: {record!r}")
+        return rows
+
+    def pending_bytes(self) -> int:
+        try:
+            return max(self.path.stat().st_size - self.offset, 0)
+        except OSError:
+            return 0
+
+    def ingest_inbox(self, valid_label: Callable[[int], bool]) -> int:
+        """Move dropped files into the log; a rename claims a file for one worker."""
+        if not self.inbox.is_dir():
+            return 0
+        added = 0
+        for path in sorted(self.inbox.glob("*.csv")):
+            claimed = path.with_name(f"{path.name}.{os.getpid()}.claimed")
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue  # pris par un autre worker
+            rows, skipped = [], 0
+            with open(claimed, encoding="utf-8", newline="") as f:
+                for record in csv.DictReader(f):
+                    try:
+                        text, label = record["text"], int(record["label"])
+                    except (KeyError, TypeError, ValueError):
+                        skipped += 1
+                        continue
+                    if clean_text(text) and valid_label(label):
+                        rows.append((text, label))
+                    else:
+                        skipped += 1
+            if rows:
+                self.append(rows)
+            done = self.inbox / "processed"
+            done.mkdir(exist_ok=True)
+            os.replace(claimed, done / path.name)
+            logger.info(f"[SymptomIndex] inbox {path.name}: {len(rows)} rows, {skipped} skipped")
+            added += len(rows)
+        return added
+
+
+class IndexUpdater:
+    """
+    Background task running ``refresh`` when triggered or every ``interval``
+    seconds, once ``service`` is loaded (never forces a load itself).
+    """
+
+    def __init__(self, service: str, refresh: Callable[[], int], interval: float):
+        self.service = service
+        self.refresh = refresh
+        self.interval = interval
+        self._event: asyncio.Event | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._event = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def trigger(self) -> None:
+        """Wake the task now; callable from any thread."""
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._event.set)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._event.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._event.clear()
+            if not services.all_ready([self.service]):
+                continue
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception(f"[SymptomIndex] refresh of {self.service} failed")
@@ -0,0 +1,124 @@
+# app/utils/ngram_index.py
+"""
+Fuzzy string lookup compatible with ``difflib.get_close_matches``.
+
+``difflib`` runs a ``SequenceMatcher`` against every possibility. Here each
+key is indexed once as a character-count vector and a set of padded trigrams:
+
+- exhaustive mode returns exactly what ``get_close_matches`` returns (same
+  scores, same ``cutoff``, same tie-break on the larger string): the
+  ``quick_ratio`` upper bound of every key is computed in one vectorized pass,
+  and the exact ``ratio`` only runs on the survivors, best bound first, until
+  no remaining key can enter the top ``n``;
+- otherwise candidates come from the trigram postings (keys sharing the most
+  trigrams with the query), which keeps lookups flat on very large key sets
+  at the cost of missing matches with no trigram in common.
+"""
+
+import heapq
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+
+
+def trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class NgramIndex:
+    def __init__(self, keys: list[str]):
+        self.keys = list(keys)
+        alphabet = sorted({ch for key in self.keys for ch in key})
+        self._char_id = {ch: i for i, ch in enumerate(alphabet)}
+        counts = np.zeros((len(self.keys), len(alphabet)), dtype=np.uint16)
+        for row, key in enumerate(self.keys):
+            for ch in key:
+                counts[row, self._char_id[ch]] += 1
+        self._counts = counts
+        self._lengths = np.array([len(k) for k in self.keys], dtype=np.int64)
+
+        postings = defaultdict(list)
+        for row, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                postings[gram].append(row)
+        self._postings = {g: np.array(rows, dtype=np.int64) for g, rows in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _query_counts(self, query: str) -> np.ndarray:
+        q = np.zeros(self._counts.shape[1], dtype=np.uint16)
+        for ch in query:
+            i = self._char_id.get(ch)
+            if i is not None:  # absent de toutes les clés : ne compte que dans la longueur
+                q[i] += 1
+        return q
+
+    def _upper_bounds(self, query: str, rows: np.ndarray | None = None) -> np.ndarray:
+        """``SequenceMatcher.quick_ratio`` of each key (an upper bound of ``ratio``)."""
+        counts = self._counts if rows is None else self._counts[rows]
+        lengths = self._lengths if rows is None else self._lengths[rows]
+        common = np.minimum(counts, self._query_counts(query)).sum(axis=1, dtype=np.int64)
+        total = lengths + len(query)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            bounds = np.where(total > 0, 2.0 * common / total, 1.0)
+        return bounds
+
+    def _trigram_candidates(self, query: str, limit: int) -> np.ndarray:
+        hits = [self._postings[g] for g in trigrams(query) if g in self._postings]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        shared = np.bincount(np.concatenate(hits), minlength=len(self.keys))
+        rows = np.flatnonzero(shared)
+        if len(rows) > limit:
+            rows = rows[np.argpartition(-shared[rows], limit - 1)[:limit]]
+        return rows
+
+    def scored_matches(
+        self,
+        query: str,
+        n: int = 3,
+        cutoff: float = 0.6,
+        exhaustive: bool = True,
+        max_candidates: int = 500,
+    ) -> list[tuple[float, str]]:
+        """Best ``(ratio, key)`` pairs, best first, as ``get_close_matches`` ranks them."""
+        if n <= 0 or not self.keys:
+            return []
+        if exhaustive:
+            rows = None
+            bounds = self._upper_bounds(query)
+        else:
+            rows = self._trigram_candidates(query, max_candidates)
+            bounds = self._upper_bounds(query, rows)
+
+        keep = np.flatnonzero(bounds >= cutoff)
+        keep = keep[np.argsort(-bounds[keep], kind="stable")]
+        if rows is not None:
+            bounds, keep = bounds[keep], rows[keep]
+        else:
+            bounds = bounds[keep]
+
+        s = SequenceMatcher()
+        s.set_seq2(query)  # même orientation que difflib : la requête est seq2
+        best: list[tuple[float, str]] = []  # min-heap of the current top n
+        for bound, row in zip(bounds, keep):
+            # Une clé ne peut plus entrer (ni égaler : départage par la chaîne)
+            if len(best) == n and bound < best[0][0]:
+                break
+            key = self.keys[row]
+            s.set_seq1(key)
+            score = s.ratio()
+            if score < cutoff:
+                continue
+            if len(best) < n:
+                heapq.heappush(best, (score, key))
+            elif (score, key) > best[0]:
+                heapq.heapreplace(best, (score, key))
+        return sorted(best, reverse=True)
+
+    def close_matches(self, query: str, n: int = 3, cutoff: float = 0.6, **kwargs) -> list[str]:
+        """Drop-in for ``get_close_matches(query, keys, n, cutoff)``."""
+        return [key for _, key in self.scored_matches(query, n, cutoff, **kwargs)]
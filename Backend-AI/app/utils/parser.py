@@ -7,3 +7,48 @@ def extract_items(text: str, section: str):
     if match:
         return [item.strip() for item in match.group(1).split(",")]
     return []
+
+
+# Grams per unit; "ml"/"l" assume a density of 1
+UNIT_GRAMS = {
+    "mg": 0.001, "g": 1.0, "gr": 1.0, "gram": 1.0, "grams": 1.0, "gramme": 1.0, "grammes": 1.0,
+    "kg": 1000.0, "oz": 28.35, "lb": 453.6, "lbs": 453.6, "ml": 1.0, "cl": 10.0, "l": 1000.0,
+}
+
+# "and"/"et" ne sépare que devant une quantité : "fish and chips", "poulet et riz" restent entiers
+_MEAL_SPLIT = re.compile(r"\s*(?:,|;|\+|\n|\b(?:and|et)\s+(?=\d))\s*", re.IGNORECASE)
+_MEAL_ITEM = re.compile(
+    r"^(?P<qty>\d+(?:[.,]\d+)?)?\s*(?P<unit>[a-z]+\b)?\s*(?:(?:of|de)(?:\s+|$)|d')?(?P<food>.*)$",
+    re.IGNORECASE,
+)
+
+
+def parse_meal(text: str) -> tuple[list[tuple[str, float | None, float]], list[str]]:
+    """
+    Split "200g rice, 150 g of chicken and 1 apple" into ``(food, grams, count)``:
+    ``grams`` when a weight/volume unit is given, else ``None`` and a count.
+    Entries left without a food name ("100 g", "2") are returned apart, as written.
+    """
+    items, unparsed = [], []
+    for part in _MEAL_SPLIT.split(text.strip()):
+        m = _MEAL_ITEM.match(part)
+        if not part:
+            continue
+        if not m:
+            unparsed.append(part)
+            continue
+        qty = float(m["qty"].replace(",", ".")) if m["qty"] else None
+        unit, food = (m["unit"] or "").lower(), m["food"].strip()
+        if unit in UNIT_GRAMS and (qty is not None or not food):
+            if not food:
+                unparsed.append(part)
+            else:
+                items.append((food, qty * UNIT_GRAMS[unit], 1.0))
+        else:
+            # Pas d'unité : le "mot" capturé fait partie du nom de l'aliment
+            food = f"{m['unit']} {food}".strip() if m["unit"] else food
+            if not food:
+                unparsed.append(part)
+            else:
+                items.append((food, None, qty if qty is not None else 1.0))
+    return items, unparsed
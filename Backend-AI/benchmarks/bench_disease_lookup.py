@@ -0,0 +1,129 @@
+# benchmarks/bench_disease_lookup.py
+"""
+Equivalence check + microbenchmark for the disease-name fuzzy lookup.
+
+    cd Backend-AI && python -m benchmarks.bench_disease_lookup
+
+For every mapping key, a few misspelled variants are looked up both with
+``difflib.get_close_matches`` and with ``NgramIndex`` (same ``n`` and
+``cutoff``); any difference is a failure. Then both lookups and the whole
+``get_disease_explanation`` (legacy DataFrame scan vs. precomputed table) are
+timed over all keys. The difflib reference makes the check take a few minutes.
+"""
+
+import random
+import sys
+import time
+from difflib import get_close_matches
+
+from app.core.services import get_service
+from app.services.disease_matcher import get_disease_explanation, normalize_disease_key
+
+CUTOFF = 0.6
+
+
+def variants(key: str, rng: random.Random) -> list[str]:
+    """The key itself plus a dropped, a swapped and a replaced character."""
+    out = [key]
+    if len(key) > 3:
+        i = rng.randrange(1, len(key) - 1)
+        out.append(key[:i] + key[i + 1 :])
+        out.append(key[: i - 1] + key[i] + key[i - 1] + key[i + 1 :])
+        out.append(key[:i] + rng.choice("aeiouxyz") + key[i + 1 :])
+    out.append(key.split("_")[0].split(" ")[0])  # first word only
+    return out
+
+
+def legacy_explanation(index, disease_key: str, raw_input: str | None = None) -> str | None:
+    """``get_disease_explanation`` as it was: difflib + DataFrame scan."""
+    df = index.df
+    disease_to_index = index.disease_to_index
+    original_keys, original_keys_lower = index.original_keys, index.original_keys_lower
+    key = normalize_disease_key(disease_key)
+    label = disease_to_index.get(key)
+    used_key = key
+    if label is None:
+        c1 = get_close_matches(key, disease_to_index.keys(), n=1, cutoff=CUTOFF)
+        if c1:
+            used_key = c1[0]
+            label = disease_to_index[used_key]
+        elif raw_input:
+            c2 = get_close_matches(raw_input.lower(), original_keys_lower, n=1, cutoff=CUTOFF)
+            if c2:
+                orig = original_keys[original_keys_lower.index(c2[0])]
+                used_key = normalize_disease_key(orig)
+                label = index.mapping.get(orig)
+    if label is None:
+        return None
+    entry = df[df["label"].astype(str) == str(label)]
+    if entry.empty:
+        return None
+    example = entry.iloc[0]["text"].strip()
+    display = used_key.replace("_", " ").title()
+    return f"Here’s a real-world symptom description related to {display}:\n\n> {example}"
+
+
+def check(index, queries: list[tuple[str, str]]) -> int:
+    failures = 0
+    keys = list(index.disease_to_index.keys())
+    for normalized, lower in queries:
+        for n in (1, 3):
+            pairs = [
+                (normalized, keys, index.normalized_keys),
+                (lower, index.original_keys_lower, index.lower_keys),
+            ]
+            for query, possibilities, fuzzy in pairs:
+                expected = get_close_matches(query, possibilities, n=n, cutoff=CUTOFF)
+                got = fuzzy.close_matches(query, n=n, cutoff=CUTOFF)
+                if got != expected:
+                    failures += 1
+                    print(f"❌ {query!r} n={n}: difflib={expected} index={got}")
+    for normalized, lower in queries:
+        if legacy_explanation(index, normalized, lower) != get_disease_explanation(normalized, lower):
+            failures += 1
+            print(f"❌ explanation differs for {normalized!r}")
+    print(f"Equivalence: {len(queries)} queries, {failures} differences")
+    return failures
+
+
+def timed(fn, queries) -> float:
+    start = time.perf_counter()
+    for q in queries:
+        fn(q)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def bench(index, queries: list[tuple[str, str]]) -> None:
+    keys = list(index.disease_to_index.keys())
+    # Only the misses exercise the fuzzy path
+    misses = [(n, l) for n, l in queries if n not in index.disease_to_index]
+    rows = [
+        (
+            "fuzzy key",
+            lambda q: get_close_matches(q[0], keys, n=1, cutoff=CUTOFF),
+            lambda q: index.normalized_keys.close_matches(q[0], n=1, cutoff=CUTOFF),
+        ),
+        (
+            "explanation",
+            lambda q: legacy_explanation(index, q[0], q[1]),
+            lambda q: get_disease_explanation(q[0], q[1]),
+        ),
+    ]
+    for label, old, new in rows:
+        t_old, t_new = timed(old, misses), timed(new, misses)
+        print(
+            f"{label:12} {len(misses):5} misses  difflib/scan {t_old * 1e3:7.3f} ms  "
+            f"indexed {t_new * 1e3:7.3f} ms  ×{t_old / t_new:6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    index = get_service("symptom_matcher")
+    rng = random.Random(0)
+    queries = []
+    for orig in index.original_keys:
+        for v in variants(orig.lower(), rng):
+            queries.append((normalize_disease_key(v), v))
+    failures = check(index, queries)
+    bench(index, queries)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,216 @@
+# benchmarks/bench_domain_classifier.py
+"""
+Equivalence check + microbenchmark for the chat domain classifier.
+
+    cd Backend-AI && python -m benchmarks.bench_domain_classifier [-v]
+
+Runs the compiled classifier and the legacy per-term ``re.search`` loop on
+the real data the gates see: every food name of the nutrition dataset (food
+gate), every disease name of mapping.json and every text of the symptom
+dataset (medical gate). Any disagreement must be explained by one of the
+intended changes listed in ``STRICTER`` (legacy matched only through these
+terms) or ``WIDER`` (a matcher the legacy loop did not have); anything else
+fails the run. A few hand-written sentences pin the fixes themselves. Then
+both classifiers are timed on long LLM-style replies.
+"""
+
+import json
+import re
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+
+from app.services.domain_classifier import (
+    FOOD_DOMAINS,
+    FOOD_SUFFIXES,
+    MAPPING_PATH,
+    MEDICAL_DOMAINS,
+    MEDICAL_EXTRA,
+    MEDICAL_SUFFIXES,
+    WHOLE_WORD,
+    DomainClassifier,
+    disease_names,
+    is_food_related,
+    is_medical_question,
+    medical_classifier,
+)
+
+DATASETS = Path(__file__).resolve().parent.parent / "app" / "datasets"
+
+
+def legacy_is_medical(text: str) -> bool:
+    text = text.lower()
+    return any(re.search(d, text) for d in MEDICAL_DOMAINS)
+
+
+def legacy_is_food(text: str) -> bool:
+    text = text.lower()
+    return any(re.search(d, text) for d in FOOD_DOMAINS)
+
+
+def _legacy_terms(text: str, terms: list[str]) -> set[str]:
+    text = text.lower()
+    return {t.lower() for t in terms if re.search(t, text)}
+
+
+# Terms matched more strictly on purpose: a text the legacy loop accepted only
+# through these may be rejected now
+STRICTER = {
+    "medical": {
+        **{t: "whole word" for t in WHOLE_WORD},
+        **{t: "hand-written suffix" for t in MEDICAL_SUFFIXES},
+    },
+    "food": {
+        **{t: "whole word" for t in WHOLE_WORD},
+        **{t: "hand-written suffix" for t in FOOD_SUFFIXES},
+    },
+}
+
+
+def _accented(terms: list[str]) -> DomainClassifier:
+    return DomainClassifier([t for t in terms if not t.isascii()])
+
+
+# Matchers the legacy loop did not have: a text may be accepted now when one of
+# these matches it
+WIDER = {
+    "medical": {
+        "disease name": DomainClassifier([], phrases=disease_names()),
+        "extra term": DomainClassifier(MEDICAL_EXTRA),
+        "unaccented spelling": _accented(MEDICAL_DOMAINS),
+        "GP": DomainClassifier(["gp"]),
+    },
+    "food": {"unaccented spelling": _accented(FOOD_DOMAINS)},
+}
+
+# Hand-written sentences: text → (medical, food)
+INTENDED = {
+    "the cost of most things": (False, False),  # "os" in "cost", "most"
+    "happy new year": (False, False),  # "ear" in "year"
+    "I need to see my GP": (True, False),  # "GP" never matched lowercased text
+    "constant fatigue and weakness": (True, False),  # "fat" in "fatigue"
+    "du pain et du beurre": (False, True),  # French bread is not pain
+    "medicament contre la fievre": (True, False),  # unaccented spelling
+    "what is cirrhosis": (True, False),
+    "I feel tired and dizzy": (True, False),
+    "earache and ringing in my ears": (True, False),
+    "heartburn after dinner": (True, False),
+    "ringing_in_ear,high_fever": (True, False),  # "_" separates dataset tokens
+    "steak sandwich": (False, True),
+    "blue mussels cooked": (False, True),
+}
+
+
+def _sources() -> list[tuple[str, str, list[str]]]:
+    foods = pd.read_csv(DATASETS / "food_nutrition.csv")["food"].dropna().astype(str)
+    diseases = list(json.loads(MAPPING_PATH.read_text(encoding="utf-8")))
+    symptoms = pd.read_csv(DATASETS / "symptom-disease-train-dataset.csv")["text"].dropna().astype(str)
+    return [
+        ("food names", "food", list(dict.fromkeys(foods))),
+        ("disease names", "medical", diseases),
+        ("symptom texts", "medical", list(dict.fromkeys(symptoms))),
+    ]
+
+
+def _explain(domain: str, text: str, legacy: bool) -> str | None:
+    """Reason a disagreement is intended, or None."""
+    if legacy:
+        terms = _legacy_terms(text, MEDICAL_DOMAINS if domain == "medical" else FOOD_DOMAINS)
+        stricter = STRICTER[domain]
+        if terms and terms <= stricter.keys():
+            return "stricter " + ", ".join(sorted(terms))
+        return None
+    for reason, matcher in WIDER[domain].items():
+        if matcher.matches(text):
+            return reason
+    return None
+
+
+def check_datasets(verbose: bool = False) -> int:
+    failures = 0
+    for source, domain, texts in _sources():
+        legacy_fn, new_fn = (
+            (legacy_is_medical, is_medical_question) if domain == "medical" else (legacy_is_food, is_food_related)
+        )
+        reasons: dict[str, int] = {}
+        for text in texts:
+            legacy, new = legacy_fn(text), new_fn(text)
+            if legacy == new:
+                continue
+            reason = _explain(domain, text, legacy)
+            if reason is None:
+                failures += 1
+                print(f"❌ {source}: {text[:100]!r} legacy={legacy} new={new} (unexplained)")
+                continue
+            key = f"{'rejected' if legacy else 'accepted'} ({reason})"
+            reasons[key] = reasons.get(key, 0) + 1
+            if verbose and legacy:
+                print(f"   {source}: {text[:100]!r} now rejected ({reason})")
+        accepted = sum(new_fn(t) for t in texts)
+        print(f"{source:14} {domain:8} {len(texts):5} texts, {accepted:5} accepted; changes: {reasons or 'none'}")
+    return failures
+
+
+def check_intended() -> int:
+    failures = 0
+    for text, expected in INTENDED.items():
+        new = (is_medical_question(text), is_food_related(text))
+        if new != expected:
+            failures += 1
+            print(f"❌ {text!r}: new={new} expected={expected}")
+    print(f"Intended fixes: {len(INTENDED) - failures}/{len(INTENDED)} as expected")
+    return failures
+
+
+LONG_REPLY = (
+    "Hypertension, or high blood pressure, is a chronic condition in which the force of "
+    "blood against the artery walls is consistently too high. It often has no symptoms, "
+    "which is why it is called the silent killer, but some people experience headaches, "
+    "shortness of breath or nosebleeds. Treatment includes lifestyle changes such as a "
+    "low-salt diet, regular exercise and weight loss, and medications like ACE inhibitors "
+    "or diuretics. Seek emergency care for chest pain, vision problems or confusion. "
+) * 8
+OFF_DOMAIN_REPLY = (
+    "The quick brown fox jumps over the lazy dog while the orchestra plays a symphony "
+    "about distant galaxies, quantum computers and the history of ancient Rome. "
+) * 20
+
+
+def _time(fn, n: int = 200) -> float:
+    """Best of 5 runs, per call: the least disturbed by other processes."""
+    return min(timeit.repeat(fn, number=n, repeat=5)) / n
+
+
+def bench() -> None:
+    speedups = {}
+    for label, text in [("in-domain reply", LONG_REPLY), ("off-domain reply", OFF_DOMAIN_REPLY)]:
+        for name, legacy, new in [
+            ("medical", legacy_is_medical, is_medical_question),
+            ("food", legacy_is_food, is_food_related),
+        ]:
+            t_old = _time(lambda: legacy(text))
+            t_new = _time(lambda: new(text))
+            speedups[label, name] = t_old / t_new
+            print(
+                f"{label:17} {name:8} {len(text):6} chars  legacy {t_old * 1e6:9.1f} µs  "
+                f"compiled {t_new * 1e6:8.1f} µs  ×{t_old / t_new:6.1f}"
+            )
+
+    # Le cas que le garde existe pour attraper : rien ne matche, tout est parcouru
+    text = OFF_DOMAIN_REPLY.lower()
+    patterns = medical_classifier.patterns
+    terms = _time(lambda: [p.search(text) for p in patterns])
+    phrases = _time(lambda: medical_classifier.find_phrase(text))
+    print(
+        f"Off-domain long reply ({len(text)} chars): medical ×{speedups['off-domain reply', 'medical']:.1f} "
+        f"({len(patterns)} term regexes {terms * 1e6:.1f} µs + {len(medical_classifier.first_words)} disease-name "
+        f"first words {phrases * 1e6:.1f} µs), food ×{speedups['off-domain reply', 'food']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    failures = check_datasets("-v" in sys.argv) + check_intended()
+    bench()
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,90 @@
+# benchmarks/bench_language.py
+"""
+Accuracy + microbenchmark of the chat language detection.
+
+    cd Backend-AI && python -m benchmarks.bench_language [--sample TSV] [--rounds N]
+
+On a labelled FR/EN sample of chat messages (benchmarks/data/lang_sample.tsv)
+it reports the accuracy of plain ``langdetect`` (what the chat used before),
+of the cheap signals alone (and how many messages they decide) and of
+``detect_language``; then a conversation replay shows the per-session memory
+picking the language of ambiguous follow-ups. Finally each path is timed.
+"""
+
+import argparse
+import csv
+import time
+from pathlib import Path
+
+from app.services.language import detect_language, model_language, quick_language
+
+SAMPLE = Path(__file__).parent / "data" / "lang_sample.tsv"
+
+# Suivi en français dont les derniers tours sont ambigus pour les signaux rapides
+CONVERSATION = [
+    "bonjour",
+    "j'ai mal au ventre depuis hier soir",
+    "ok",
+    "3 jours",
+    "paracetamol 1g",
+]
+
+
+def load(path: Path) -> list[tuple[str, str]]:
+    with path.open(encoding="utf-8") as f:
+        return [(row["lang"], row["text"]) for row in csv.DictReader(f, delimiter="\t")]
+
+
+def accuracy(rows: list[tuple[str, str]]) -> None:
+    legacy = sum(model_language.__wrapped__(text) == lang for lang, text in rows)
+    decided = [(lang, quick_language(text)) for lang, text in rows]
+    decided = [(lang, got) for lang, got in decided if got is not None]
+    quick = sum(lang == got for lang, got in decided)
+    fast = 0
+    for lang, text in rows:
+        got = detect_language(text)
+        fast += got == lang
+        if got != lang:
+            print(f"❌ {lang:7} {text!r} -> {got}")
+    n = len(rows)
+    print(f"langdetect       {legacy}/{n} correct ({legacy / n:.1%})")
+    print(f"cheap signals    {quick}/{len(decided)} correct, decided {len(decided) / n:.0%} of messages")
+    print(f"detect_language  {fast}/{n} correct ({fast / n:.1%})")
+
+    replay = [detect_language(text, "bench-session") for text in CONVERSATION]
+    print(f"session replay   {list(zip(CONVERSATION, replay))}")
+
+
+def timed(fn, texts: list[str], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for text in texts:
+            fn(text)
+    return (time.perf_counter() - start) / (rounds * len(texts))
+
+
+def bench(rows: list[tuple[str, str]], rounds: int) -> None:
+    texts = [text for _, text in rows]
+
+    def uncached(text: str) -> str:
+        # Chemin complet sans le cache par texte du modèle
+        return quick_language(text) or model_language.__wrapped__(text)
+
+    for label, fn in [
+        ("langdetect", model_language.__wrapped__),
+        ("cheap signals", quick_language),
+        ("fast, uncached", uncached),
+        ("detect_language", detect_language),
+    ]:
+        print(f"{label:16} {timed(fn, texts, rounds) * 1e6:9.1f} µs/message")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sample", type=Path, default=SAMPLE)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = load(args.sample)
+    accuracy(rows)
+    bench(rows, args.rounds)
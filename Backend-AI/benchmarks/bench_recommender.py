@@ -0,0 +1,212 @@
+# benchmarks/bench_recommender.py
+"""
+Equivalence check + microbenchmark for the recommender's fast path.
+
+    cd Backend-AI && python -m benchmarks.bench_recommender [--data CSV] [--profiles N]
+
+Profiles are drawn from the dataset rows plus random combinations (including
+unseen categories and missing numbers). The reference is the legacy path:
+``pipeline.transform`` on a DataFrame, brute cosine ``kneighbors``,
+``drop_duplicates`` over the neighbour rows and ``iterrows``-style parsing.
+For every index mode (brute, kd_tree, ball_tree) the run asserts:
+
+- ``encode`` gives the reference vectors;
+- ``kneighbors`` gives the reference neighbours and distances (rows at the
+  same distance may swap places, which is counted apart);
+- ``match`` and ``match_batch`` give the reference program, both sampling
+  the distinct neighbours with the same seeded ``random.Random``.
+
+Any other difference fails the run. Then the legacy ``match`` is timed
+against the current one.
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from app.models.knn_matcher import FEATURES, INDEX_MODES, KNNFitnessRecommender
+from app.services.recommender_service import MODEL_PATH
+from app.utils.parser import extract_items
+
+
+def legacy_match(model: KNNFitnessRecommender, user_input: dict, days_per_week: int = 4):
+    X_input = model.pipeline.transform(pd.DataFrame([user_input], columns=FEATURES))
+    distances, indices = model.nn_model.kneighbors(X_input)
+    matched_rows = model.data.iloc[indices[0]].drop_duplicates(
+        subset=["exercises", "equipment", "diet"]
+    )
+    if len(matched_rows) < days_per_week:
+        matched_rows = model.data.sample(n=days_per_week)
+    else:
+        matched_rows = matched_rows.sample(n=days_per_week)
+    program = []
+    for i, (_, row) in enumerate(matched_rows.iterrows()):
+        program.append(
+            {
+                "day": i + 1,
+                "exercises": [e.strip() for e in row["exercises"].split(",")],
+                "equipment": [e.strip() for e in row["equipment"].split(",")],
+                "nutrition": {
+                    "vegetables": extract_items(row["diet"], "Vegetables"),
+                    "proteins": extract_items(row["diet"], "Protein Intake"),
+                    "juice": extract_items(row["diet"], "Juice"),
+                },
+                "tips": row["recommendation"],
+            }
+        )
+    return {"profile": user_input, "days_per_week": days_per_week, "program": program}
+
+
+def make_profiles(model: KNNFitnessRecommender, n: int, rng: random.Random) -> list[dict]:
+    rows = model.data[FEATURES].to_dict("records")
+    values = {f: sorted({str(r[f]) for r in rows}) for f in FEATURES}
+    profiles = []
+    for i in range(n):
+        if i % 2 == 0:
+            profiles.append(dict(rng.choice(rows)))
+            continue
+        p = {
+            f: rng.choice(values[f] + ["Unknown"])
+            for f in ("sex", "hypertension", "diabetes", "level", "fitness_goal", "fitness_type")
+        }
+        p.update(
+            age=rng.randint(15, 80),
+            height=round(rng.uniform(1.3, 2.1), 2),
+            weight=round(rng.uniform(35, 150), 1),
+            bmi=round(rng.uniform(15, 45), 1),
+        )
+        if i % 10 == 1:
+            p["bmi"] = None  # imputed with the training mean
+        profiles.append(p)
+    return profiles
+
+
+TOL = 1e-9
+DUPLICATE_SUBSET = ["exercises", "equipment", "diet"]
+
+
+def reference_neighbours(model: KNNFitnessRecommender, profiles: list[dict]):
+    """Vectors, cosine distances and rows of the legacy path (pipeline + brute)."""
+    X = model.pipeline.transform(pd.DataFrame(profiles, columns=FEATURES))
+    X = X.toarray() if hasattr(X, "toarray") else X
+    return (X, *model.nn_model.kneighbors(X))
+
+
+def same_neighbours(d_ref, i_ref, d_got, i_got) -> str | None:
+    """``exact``, ``tie`` (same distances, tied rows swapped) or None."""
+    if not np.allclose(d_ref, d_got, atol=TOL, rtol=0):
+        return None
+    if np.array_equal(i_ref, i_got):
+        return "exact"
+    # Below the k-th distance the same rows must come back, in any order
+    inner = d_ref < d_ref[-1] - TOL
+    if set(i_ref[inner]) != set(i_got[d_got < d_ref[-1] - TOL]):
+        return None
+    return "tie"
+
+
+def legacy_day(row: pd.Series) -> dict:
+    diet = row["diet"] if isinstance(row["diet"], str) else ""
+    return {
+        "exercises": [e.strip() for e in row["exercises"].split(",")] if isinstance(row["exercises"], str) else [],
+        "equipment": [e.strip() for e in row["equipment"].split(",")] if isinstance(row["equipment"], str) else [],
+        "nutrition": {
+            "vegetables": extract_items(diet, "Vegetables"),
+            "proteins": extract_items(diet, "Protein Intake"),
+            "juice": extract_items(diet, "Juice"),
+        },
+        "tips": row["recommendation"] if isinstance(row["recommendation"], str) else None,
+    }
+
+
+def expected_match(model, user_input: dict, neighbours: np.ndarray, days: int, rng: random.Random) -> dict:
+    """Legacy program for these neighbours, sampled with ``rng`` instead of ``DataFrame.sample``."""
+    rows = model.data.iloc[neighbours]
+    distinct = [int(i) for i in neighbours[~rows.duplicated(subset=DUPLICATE_SUBSET).to_numpy()]]
+    if len(distinct) < days:
+        chosen = rng.sample(range(len(model.data)), days)
+    else:
+        chosen = rng.sample(distinct, days)
+    program = [{"day": d, **legacy_day(model.data.iloc[i])} for d, i in enumerate(chosen, start=1)]
+    return {"profile": user_input, "days_per_week": days, "program": program}
+
+
+def check(model: KNNFitnessRecommender, profiles: list[dict], reference) -> int:
+    X_ref, d_ref, i_ref = reference
+    days = [3 + i % 4 for i in range(len(profiles))]
+    failures = 0
+
+    X = model.encode(profiles)
+    bad = np.flatnonzero(~np.isclose(X, X_ref, atol=TOL, rtol=0).all(axis=1))
+    for j in bad[:3]:
+        print(f"❌ {model.index} encode: {profiles[j]}")
+    failures += len(bad)
+
+    d_got, i_got = model.kneighbors(X)
+    ties, neighbours = 0, []
+    for j in range(len(profiles)):
+        same = same_neighbours(d_ref[j], i_ref[j], d_got[j], i_got[j])
+        if same is None:
+            failures += 1
+            print(f"❌ {model.index} kneighbors: {profiles[j]}\n   {i_ref[j]} {d_ref[j]}\n   {i_got[j]} {d_got[j]}")
+        ties += same == "tie"
+        # Lignes à égalité permutées : le programme suit l'ordre de ce mode
+        neighbours.append(i_ref[j] if same == "exact" else i_got[j])
+
+    for j, p in enumerate(profiles):
+        expected = expected_match(model, p, neighbours[j], days[j], random.Random(j))
+        if model.match(p, days[j], rng=random.Random(j)) != expected:
+            failures += 1
+            print(f"❌ {model.index} match: {p}")
+
+    # match_batch tire avec le module random : même graine, même suite de tirages
+    rng = random.Random(0)
+    expected = [expected_match(model, p, neighbours[j], days[j], rng) for j, p in enumerate(profiles)]
+    random.seed(0)
+    got = model.match_batch(profiles, days)
+    bad = [j for j in range(len(profiles)) if got[j] != expected[j]]
+    for j in bad[:3]:
+        print(f"❌ {model.index} match_batch: {profiles[j]}")
+    failures += len(bad)
+
+    print(
+        f"{'✅' if not failures else '❌'} {model.index:9} {len(profiles)} profiles: encode, kneighbors, "
+        f"match, match_batch — {failures} differences ({ties} tied rows swapped)"
+    )
+    return failures
+
+
+def bench(model: KNNFitnessRecommender, profiles: list[dict]) -> None:
+    for label, fn in [
+        ("legacy match", lambda p: legacy_match(model, p)),
+        ("fast match", lambda p: model.match(p)),
+    ]:
+        start = time.perf_counter()
+        for p in profiles:
+            fn({**p, "bmi": p["bmi"] or 25.0})  # legacy parsing needs a full profile
+        per_call = (time.perf_counter() - start) / len(profiles)
+        print(f"{label:13} {per_call * 1e3:7.3f} ms/call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=MODEL_PATH)
+    parser.add_argument("--profiles", type=int, default=1000)
+    args = parser.parse_args()
+
+    model = KNNFitnessRecommender(data_path=args.data)
+    model.load_and_prepare_data()
+    profiles = make_profiles(model, args.profiles, random.Random(0))
+    reference = reference_neighbours(model, profiles)
+    failures = check(model, profiles, reference)
+    for mode in INDEX_MODES:
+        if mode != "brute":
+            tree = KNNFitnessRecommender(data_path=args.data, index=mode)
+            tree.load_and_prepare_data()
+            failures += check(tree, profiles, reference)
+    bench(model, profiles[:300])
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,94 @@
+# benchmarks/bench_recommender_index.py
+"""
+Brute-force vs. tree neighbour search for the fitness recommender, as the
+dataset grows.
+
+    cd Backend-AI && python -m benchmarks.bench_recommender_index [--data CSV]
+        [--sizes 15000 60000 240000] [--queries 2000]
+
+Larger datasets are made by resampling the real rows and jittering their
+numeric columns. For every size and index mode it reports the fit time,
+single-profile ``match`` latency, ``match_batch`` throughput and recall@k
+against the brute-force reference (a neighbour counts as found when its cosine
+distance is within the reference k-th distance, so ties do not count as misses).
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.models.knn_matcher import INDEX_MODES, KNNFitnessRecommender
+from app.services.recommender_service import MODEL_PATH
+from benchmarks.bench_recommender import make_profiles
+
+
+def grow(data: Path, rows: int, out: Path, rng: np.random.Generator) -> Path:
+    df = pd.read_csv(data)
+    big = df.sample(n=rows, replace=True, random_state=int(rng.integers(1 << 31)))
+    for col in ("Age", "Height", "Weight", "BMI"):
+        if col in big:
+            big[col] = big[col] * rng.normal(1.0, 0.03, len(big))
+    big.to_csv(out, index=False)
+    return out
+
+
+def recall(reference: KNNFitnessRecommender, X: np.ndarray, found: np.ndarray) -> float:
+    ref_dist, _ = reference.nn_model.kneighbors(X)
+    kth = ref_dist[:, -1:]
+    # Cosine distance of each returned row, computed exactly
+    Xn = X / np.linalg.norm(X, axis=1, keepdims=True)
+    hits = 0
+    for q, rows in enumerate(found):
+        train = reference.nn_model._fit_X[rows]
+        train = train / np.linalg.norm(train, axis=1, keepdims=True)
+        dist = 1 - train @ Xn[q]
+        hits += int((dist <= kth[q] + 1e-9).sum())
+    return hits / found.size
+
+
+def run(path: Path, rows: int, queries: int) -> None:
+    reference = None
+    for mode in INDEX_MODES:
+        start = time.perf_counter()
+        model = KNNFitnessRecommender(data_path=str(path), index=mode)
+        model.load_and_prepare_data()
+        fit = time.perf_counter() - start
+        reference = reference or model
+
+        profiles = make_profiles(model, queries, random.Random(1))
+        profiles = [{**p, "bmi": p["bmi"] or 25.0} for p in profiles]
+
+        start = time.perf_counter()
+        for p in profiles[:200]:
+            model.match(p)
+        single = (time.perf_counter() - start) / 200
+
+        start = time.perf_counter()
+        model.match_batch(profiles)
+        batch = (time.perf_counter() - start) / len(profiles)
+
+        X = model.encode(profiles)
+        _, found = model.kneighbors(X)
+        print(
+            f"{rows:8} rows  {mode:9}  fit {fit:6.2f}s  match {single * 1e3:7.3f} ms  "
+            f"batch {batch * 1e3:7.3f} ms/profile  recall@{model.n_neighbors} "
+            f"{recall(reference, X, found):.3f}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data", default=MODEL_PATH)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[15_000, 60_000, 240_000])
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            run(grow(Path(args.data), size, Path(tmp) / f"gym_{size}.csv", rng), size, args.queries)
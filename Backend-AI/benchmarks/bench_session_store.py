@@ -0,0 +1,131 @@
+# benchmarks/bench_session_store.py
+"""
+Semantics check + microbenchmark for the chat session stores.
+
+    cd Backend-AI && python -m benchmarks.bench_session_store [--sessions N] [--redis URL]
+
+Without ``--redis`` the Redis backend runs against the in-process RESP
+stand-in (benchmarks/stubs/resp_server.py). Both backends must keep the last
+``max_messages`` turns in order, isolate sessions and clear them; the memory
+store must also expire idle sessions and stay under its session/byte caps.
+Then append+get round trips are timed, and the token-budget trimming is
+checked on a long conversation.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+
+from app.services.session_store import (
+    MemorySessionStore,
+    RedisSessionStore,
+    SessionStore,
+    approx_tokens,
+    trim_to_budget,
+)
+from benchmarks.stubs.resp_server import serve
+
+MAX_MESSAGES = 6
+
+
+def turn(i: int) -> list[dict]:
+    return [
+        {"role": "user", "content": f"question {i} é"},
+        {"role": "assistant", "content": f"answer {i} " + "x" * 50},
+    ]
+
+
+async def check_common(store: SessionStore) -> int:
+    failures = 0
+    for i in range(5):
+        await store.append("a", turn(i))
+    await store.append("b", turn(99))
+    history = await store.get("a")
+    expected = [m for i in range(5) for m in turn(i)][-MAX_MESSAGES:]
+    if history != expected:
+        failures += 1
+        print(f"❌ {store.name}: last {MAX_MESSAGES} turns not kept in order")
+    if await store.get("b") != turn(99) or await store.get("missing") != []:
+        failures += 1
+        print(f"❌ {store.name}: sessions not isolated")
+    await store.clear("a")
+    if await store.get("a") != []:
+        failures += 1
+        print(f"❌ {store.name}: clear left history behind")
+    return failures
+
+
+async def check_memory_bounds() -> int:
+    failures = 0
+    store = MemorySessionStore(MAX_MESSAGES, ttl=0.05, max_sessions=100, max_bytes=10**9)
+    await store.append("old", turn(0))
+    await asyncio.sleep(0.1)
+    if await store.get("old") != [] or store.stats()["expirations"] != 1:
+        failures += 1
+        print("❌ memory: idle session not expired")
+
+    store = MemorySessionStore(MAX_MESSAGES, ttl=60, max_sessions=100, max_bytes=20_000)
+    for s in range(1000):
+        await store.append(f"s{s}", turn(s))
+        await store.get("s0")  # la session la plus utilisée doit survivre
+    stats = store.stats()
+    if stats["sessions"] > 100 or stats["bytes"] > 20_000 or not await store.get("s0"):
+        failures += 1
+        print(f"❌ memory: caps or LRU order not honoured {stats}")
+    return failures
+
+
+def check_budget() -> int:
+    history = [m for i in range(200) for m in turn(i)]
+    for budget in (0, 25, 100, 3000):
+        kept = trim_to_budget(history, budget)
+        used = sum(approx_tokens(m) for m in kept)
+        if used > budget or kept != history[len(history) - len(kept) :] or (
+            kept and kept[0]["role"] != "user"
+        ):
+            print(f"❌ budget {budget}: {len(kept)} messages, {used} tokens")
+            return 1
+    return 0
+
+
+async def bench(store: SessionStore, sessions: int) -> None:
+    start = time.perf_counter()
+    for s in range(sessions):
+        await store.get(f"bench{s}")
+        await store.append(f"bench{s}", turn(s))
+    per_turn = (time.perf_counter() - start) / sessions
+    print(f"{store.name:7} get+append {per_turn * 1e6:8.1f} µs/turn  {store.stats()}")
+
+
+async def main(sessions: int, redis_url: str | None) -> int:
+    server = None
+    if redis_url is None:
+        server = await serve(port=0)
+        port = server.sockets[0].getsockname()[1]
+        redis_url = f"redis://127.0.0.1:{port}/0"
+
+    memory = MemorySessionStore(MAX_MESSAGES, ttl=60, max_sessions=10_000, max_bytes=10**8)
+    redis = RedisSessionStore(redis_url, MAX_MESSAGES, ttl=60)
+    failures = 0
+    for store in (memory, redis):
+        failures += await check_common(store)
+    failures += await check_memory_bounds()
+    failures += check_budget()
+    print(f"Semantics: {failures} failures")
+
+    for store in (memory, redis):
+        await bench(store, sessions)
+    await redis.close()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--redis", default=None, help="real server URL (default: stand-in)")
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.sessions, args.redis)) else 0)
@@ -0,0 +1,124 @@
+# benchmarks/bench_symptom_index.py
+"""
+Top-k agreement of the appendable symptom index with a fitted TfidfVectorizer.
+
+    cd Backend-AI && python -m benchmarks.bench_symptom_index [--top-k 3] [-v]
+
+Two scenarios, each against ``TfidfVectorizer().fit_transform`` over the same
+rows, ranked as the legacy ``_rank`` did (per-disease max, top-k diseases):
+
+- base: the index built from the whole training dataset;
+- appended: the index built from 90 % of the rows, the other 10 % added with
+  ``append`` (their new terms land in the hashed columns), against a reference
+  refitted on all of them.
+
+Queries are the first text of every disease, every disease name of
+mapping.json and three-word samples of training texts. A result agrees when
+its scores are the reference top-k scores and every returned disease has that
+score in the reference (diseases tied at the cut may come in any order).
+Diseases the reference returns with a score of 0 (no shared term) are not
+compared: the index only returns diseases sharing a term with the query.
+Any disagreement fails the run.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from app.services.disease_matcher import MAPPING_PATH, _read_symptoms
+from app.services.symptom_index import AppendableIndex, TermSpace
+
+TOL = 1e-9
+
+
+def build(texts: list[str], labels: np.ndarray, base_rows: int) -> AppendableIndex:
+    space = TermSpace.fit(texts[:base_rows])
+    store = AppendableIndex(space, space.counts(texts[:base_rows]), labels[:base_rows], texts[:base_rows])
+    if base_rows < len(texts):
+        store.append(texts[base_rows:], list(labels[base_rows:]))
+    return store
+
+
+def reference_scores(texts: list[str], labels: np.ndarray, queries: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Per-disease best cosine of a refitted TfidfVectorizer: (diseases, queries × diseases)."""
+    vec = TfidfVectorizer()
+    matrix = vec.fit_transform(texts)
+    order = np.argsort(labels, kind="stable")
+    sorted_labels = labels[order]
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    sims = (vec.transform(queries) @ matrix[order].T).toarray()
+    return sorted_labels[starts], np.maximum.reduceat(sims, starts, axis=1)
+
+
+def agrees(got: list[tuple[int, float, str]], ref: np.ndarray, diseases: np.ndarray, top_k: int) -> bool:
+    expected = np.sort(ref)[::-1][:top_k]
+    expected = expected[expected > TOL]
+    scores = np.array([score for _, score, _ in got])
+    if len(scores) != len(expected) or not np.allclose(scores, expected, atol=TOL, rtol=0):
+        return False
+    column = {int(d): i for i, d in enumerate(diseases)}
+    return all(abs(ref[column[label]] - score) <= TOL for label, score, _ in got)
+
+
+def queries_for(texts: list[str], labels: np.ndarray, rng: random.Random) -> dict[str, list[str]]:
+    firsts = {}
+    for text, label in zip(texts, labels):
+        firsts.setdefault(int(label), text)
+    with open(MAPPING_PATH) as f:
+        names = list(json.load(f))
+    samples = []
+    for text in rng.sample(texts, min(1000, len(texts))):
+        words = text.split()
+        samples.append(" ".join(rng.sample(words, min(3, len(words)))))
+    return {"first text per disease": list(firsts.values()), "disease names": names, "3-word samples": samples}
+
+
+def check(name: str, texts: list[str], labels: np.ndarray, base_rows: int, queries: dict, top_k: int, verbose: bool) -> int:
+    start = time.perf_counter()
+    store = build(texts, labels, base_rows)
+    built = time.perf_counter() - start
+    failures = 0
+    for source, items in queries.items():
+        diseases, ref = reference_scores(texts, labels, items)
+        got = store.search(items, top_k)
+        bad = [i for i in range(len(items)) if not agrees(got[i], ref[i], diseases, top_k)]
+        failures += len(bad)
+        mark = "❌" if bad else "✅"
+        print(f"{mark} {name:9} {source:23} {len(items) - len(bad):5}/{len(items)} top-{top_k} agree")
+        for i in bad[: 10 if verbose else 3]:
+            top = np.argsort(-ref[i], kind="stable")[:top_k]
+            print(f"     {items[i][:60]!r}: index={[(l, round(s, 4)) for l, s, _ in got[i]]} "
+                  f"reference={[(int(diseases[j]), round(float(ref[i, j]), 4)) for j in top]}")
+    print(f"   {name}: {store.stats()['rows']} rows, built in {built:.2f}s")
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    df = _read_symptoms()
+    texts, labels = df["text"].tolist(), df["label"].to_numpy()
+    queries = queries_for(texts, labels, rng)
+
+    failures = check("base", texts, labels, len(texts), queries, args.top_k, args.verbose)
+    # Rows mélangées : les ajouts couvrent toutes les maladies et apportent des termes nouveaux
+    perm = np.random.default_rng(0).permutation(len(texts))
+    shuffled, shuffled_labels = [texts[i] for i in perm], labels[perm]
+    base_rows = int(len(texts) * 0.9)
+    new_terms = set(TermSpace.fit(shuffled).vocabulary) - set(TermSpace.fit(shuffled[:base_rows]).vocabulary)
+    print(f"   appended rows bring {len(new_terms)} terms outside the base vocabulary (hashed)")
+    failures += check("appended", shuffled, shuffled_labels, base_rows, queries, args.top_k, args.verbose)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
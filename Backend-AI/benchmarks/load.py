@@ -0,0 +1,317 @@
+# benchmarks/load.py
+"""
+End-to-end load driver for the API.
+
+    cd Backend-AI && python -m benchmarks.load [--concurrency 1 8 32]
+        [--requests 200] [--scenarios chat_symptom plan ...] [--workers 1]
+        [--llm-latency 0.5] [--node-latency 0.01] [--unique] [--target URL]
+
+Without ``--target`` it starts the LLM and Node stand-ins
+(benchmarks/stubs) and the app itself under uvicorn, pointed at them through
+the usual settings (``OPENROUTER_BASE_URL``, ``DEEPSEEK_API_URL``,
+``NODE_BACKEND_URL``) with throw-away outbox/symptom-log paths, and waits for
+/health/ready. Each scenario then runs closed-loop at every concurrency level
+(``c`` clients, each sending its next request when the previous one answers)
+after a short unmeasured warm-up. Latency percentiles, requests per second and
+failures (non-200, or a chat error reply) are printed and saved as JSON (see benchmarks/report.py).
+
+Payloads vary per request but repeat, like real traffic, so response caches
+hit; ``--unique`` makes every payload distinct to measure the uncached paths.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import httpx
+
+from benchmarks.report import print_rows, save, summarize
+
+SYMPTOMS = [
+    "I have a fever, headache and a dry cough since two days",
+    "itchy skin with red rash and small blisters on my arms",
+    "chest pain and shortness of breath when I climb stairs",
+    "stomach pain, nausea and vomiting after eating",
+    "joint pain and stiffness in my knees every morning",
+    "frequent urination, excessive thirst and blurred vision, is it diabetes",
+    "sore throat, runny nose and sneezing all day",
+    "j'ai mal à la tête, de la fièvre et des frissons",
+]
+FOODS = ["apple", "banana", "rice", "bread", "cheese", "pasta", "tomato", "potato", "orange"]
+TOPICS = [
+    "hypertension", "diabetes", "asthma", "migraine", "malaria", "pneumonia",
+    "arthritis", "psoriasis", "anemia", "influenza", "bronchitis", "eczema",
+]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+GOALS = ["Weight Loss", "Weight Gain"]
+TYPES = ["Cardio Fitness", "Muscular Fitness"]
+
+
+def _chat(chat_type: str, pick: Callable[[random.Random, int], str]):
+    def payload(rng: random.Random, i: int, unique: bool) -> dict:
+        prompt = pick(rng, i)
+        if unique:
+            prompt = f"{prompt} (case {i})"
+        return {"session_id": f"bench-{i % 64}", "prompt": prompt, "chat_type": chat_type}
+
+    return payload
+
+
+def plan_payload(rng: random.Random, i: int, unique: bool) -> dict:
+    height = rng.uniform(1.5, 2.0)
+    weight = rng.uniform(50, 110)
+    return {
+        "sex": rng.choice(["Male", "Female"]),
+        "age": rng.randint(18, 70),
+        "height": round(height, 2),
+        "weight": round(weight, 1),
+        "level": rng.choice(LEVELS),
+        "goal": rng.choice(GOALS),
+        "target_weight": round(weight * rng.uniform(0.85, 1.1), 1),
+        "days_per_week": rng.randint(2, 6),
+        "hypertension": rng.choice(["Yes", "No"]),
+        "diabetes": rng.choice(["Yes", "No"]),
+        "userId": f"bench-user-{i % 256}",
+        "seed": i if unique else None,
+    }
+
+
+def recommend_payload(rng: random.Random, i: int, unique: bool) -> dict:
+    height = rng.uniform(1.5, 2.0)
+    weight = rng.uniform(50, 110)
+    return {
+        "sex": rng.choice(["Male", "Female"]),
+        "age": rng.randint(18, 70),
+        "height": round(height, 2),
+        "weight": round(weight, 1),
+        "hypertension": rng.choice(["Yes", "No"]),
+        "diabetes": rng.choice(["Yes", "No"]),
+        "bmi": round(weight / height**2, 1),
+        "level": rng.choice(LEVELS),
+        "fitness_goal": rng.choice(GOALS),
+        "fitness_type": rng.choice(TYPES),
+        "days_per_week": rng.randint(2, 6),
+        "seed": i if unique else None,
+    }
+
+
+def diabetes_payload(rng: random.Random, i: int, unique: bool) -> dict:
+    return {
+        "pregnancies": rng.randint(0, 8),
+        "glucose": rng.uniform(70, 200),
+        "blood_pressure": rng.uniform(50, 100),
+        "skin_thickness": rng.uniform(10, 40),
+        "insulin": rng.uniform(15, 250),
+        "bmi": rng.uniform(18, 45),
+        "diabetes_pedigree": rng.uniform(0.1, 1.5),
+        "age": rng.randint(21, 80),
+        "user_id": f"bench-user-{i % 256}",
+    }
+
+
+def blood_pressure_payload(rng: random.Random, i: int, unique: bool) -> dict:
+    return {
+        "age": rng.randint(18, 85),
+        "systolic_pressure": rng.uniform(95, 180),
+        "diastolic_pressure": rng.uniform(60, 110),
+        "user_id": f"bench-user-{i % 256}",
+    }
+
+
+# name → (path, payload(rng, i, unique), streamed)
+SCENARIOS = {
+    "chat_symptom": ("/api/chat", _chat("symptom", lambda r, i: r.choice(SYMPTOMS)), False),
+    "chat_food": ("/api/chat", _chat("food", lambda r, i: r.choice(FOODS)), False),
+    "chat_explore": (
+        "/api/chat", _chat("explore", lambda r, i: f"What are the symptoms of {r.choice(TOPICS)}?"), False
+    ),
+    "chat_explore_stream": (
+        "/api/chat/stream",
+        _chat("explore", lambda r, i: f"Symptoms and treatment of {r.choice(TOPICS)}"),
+        True,
+    ),
+    "plan": ("/api/plan/generate", plan_payload, False),
+    "recommend": ("/api/recommend", recommend_payload, False),
+    "diabetes_predict": ("/api/diabetes/predict", diabetes_payload, False),
+    "blood_pressure_predict": ("/api/blood_pressure/predict", blood_pressure_payload, False),
+}
+
+
+# /api/chat répond 200 même en cas d'échec ou de refus, avec un message
+FAILED_REPLIES = ("⚠️", "Please ", "Invalid chat type")
+
+
+async def _call(client: httpx.AsyncClient, path: str, body: dict, streamed: bool):
+    """(ok, total seconds, seconds to the first token event or None)."""
+    start = time.perf_counter()
+    if not streamed:
+        res = await client.post(path, json=body)
+        ok = res.status_code == 200
+        if ok and path == "/api/chat":
+            ok = not res.json()["response"].startswith(FAILED_REPLIES)
+        return ok, time.perf_counter() - start, None
+    first = None
+    async with client.stream("POST", path, json=body) as res:
+        ok = res.status_code == 200
+        async for line in res.aiter_lines():
+            if line.startswith("data:") and '"status"' in line:
+                ok = ok and '"status": "ok"' in line  # événement done
+            elif first is None and line.startswith("event: token"):
+                first = time.perf_counter() - start
+    return ok, time.perf_counter() - start, first
+
+
+async def run_level(
+    client: httpx.AsyncClient, name: str, concurrency: int, requests: int, unique: bool, seed: int
+) -> list[dict]:
+    path, payload, streamed = SCENARIOS[name]
+    rng = random.Random(seed)
+    bodies = [payload(rng, i, unique) for i in range(requests)]
+    latencies: list[float] = []
+    ttfts: list[float] = []
+    errors = 0
+    counter = iter(range(requests))
+
+    async def client_loop():
+        nonlocal errors
+        for i in counter:
+            try:
+                ok, elapsed, first = await _call(client, path, bodies[i], streamed)
+            except httpx.HTTPError:
+                ok, elapsed, first = False, 0.0, None
+            if not ok:
+                errors += 1
+                continue
+            latencies.append(elapsed)
+            if first is not None:
+                ttfts.append(first)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    rows = [{"name": f"{name}@c{concurrency}", "scenario": name, "concurrency": concurrency,
+             **summarize(latencies, elapsed, errors)}]
+    if streamed:
+        rows.append({"name": f"{name}.ttft@c{concurrency}", "scenario": f"{name}.ttft",
+                     "concurrency": concurrency, **summarize(ttfts, elapsed, errors)})
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _spawn(args: list[str], env: dict | None = None) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, *args],
+        env={**os.environ, **(env or {})},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+async def _wait_for(url: str, timeout: float, ok_status=(200,)) -> None:
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code in ok_status:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise TimeoutError(f"{url} not ready after {timeout}s")
+
+
+def start_stack(args, tmp: Path) -> tuple[str, str, list[subprocess.Popen]]:
+    """(API URL, Node stand-in URL, processes)."""
+    llm, node, api = _free_port(), _free_port(), _free_port()
+    procs = [
+        _spawn(["-m", "benchmarks.stubs.llm_server", "--port", str(llm),
+                "--latency", str(args.llm_latency), "--ttft", str(args.llm_ttft)]),
+        _spawn(["-m", "benchmarks.stubs.node_server", "--port", str(node),
+                "--latency", str(args.node_latency)]),
+    ]
+    env = {
+        "OPENROUTER_API_KEY": os.getenv("OPENROUTER_API_KEY", "bench"),
+        "OPENROUTER_BASE_URL": f"http://127.0.0.1:{llm}/api/v1",
+        "DEEPSEEK_API_URL": f"http://127.0.0.1:{llm}/v1/chat/completions",
+        "NODE_BACKEND_URL": f"http://127.0.0.1:{node}",
+        "OUTBOX_SPOOL_PATH": str(tmp / "outbox.sqlite3"),
+        "SYMPTOM_ADDITIONS_PATH": str(tmp / "symptom_additions.csv"),
+        "SYMPTOM_INBOX_DIR": str(tmp / "symptom_inbox"),
+        "EXPLORE_CACHE_PATH": "",
+    }
+    procs.append(_spawn(
+        ["-m", "uvicorn", "app.main:app", "--port", str(api), "--workers", str(args.workers),
+         "--log-level", "warning"],
+        env,
+    ))
+    return f"http://127.0.0.1:{api}", f"http://127.0.0.1:{node}", procs
+
+
+async def main(args) -> list[dict]:
+    procs: list[subprocess.Popen] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        target, node = args.target, None
+        try:
+            if target is None:
+                target, node, procs = start_stack(args, Path(tmp))
+                # 503 tant que les services chargent ; on attend qu'ils soient prêts
+                await _wait_for(f"{target}/health/live", 60)
+                try:
+                    await _wait_for(f"{target}/health/ready", args.ready_timeout)
+                except TimeoutError:
+                    print("⚠️ some services are not ready, measuring anyway")
+            limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+            rows: list[dict] = []
+            async with httpx.AsyncClient(base_url=target, timeout=60, limits=limits) as client:
+                for name in args.scenarios:
+                    await run_level(client, name, 4, args.warmup, args.unique, seed=-1)
+                    for c in args.concurrency:
+                        level = await run_level(client, name, c, args.requests, args.unique, seed=c)
+                        print_rows(level)
+                        rows.extend(level)
+                print(f"outbox: {(await client.get('/health/outbox')).json()}")
+                if node is not None:
+                    await asyncio.sleep(1.0)  # dernier flush de l'outbox
+                    print(f"node stand-in: {(await client.get(f'{node}/stats')).json()}")
+            return rows
+        finally:
+            for p in procs:
+                p.terminate()
+            for p in procs:
+                try:
+                    p.wait(10)
+                except subprocess.TimeoutExpired:
+                    p.kill()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target", default=None, help="running API base URL (no stand-ins)")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=200, help="per scenario and level")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--unique", action="store_true", help="distinct payloads (no cache hits)")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-ttft", type=float, default=0.2)
+    parser.add_argument("--node-latency", type=float, default=0.01)
+    parser.add_argument("--ready-timeout", type=float, default=120)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    rows = asyncio.run(main(args))
+    print(f"Results: {save('load', rows, vars(args), args.out)}")
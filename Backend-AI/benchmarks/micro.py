@@ -0,0 +1,96 @@
+# benchmarks/micro.py
+"""
+In-process microbenchmarks of the hot functions behind the endpoints.
+
+    cd Backend-AI && python -m benchmarks.micro [--calls 2000] [--only NAME ...]
+
+Each function is warmed up, then called ``--calls`` times on varied inputs;
+every call is timed on its own so percentiles are reported along with calls
+per second. A benchmark whose service cannot load (e.g. a missing dataset) is
+recorded with its error instead of aborting the run. Results are saved as JSON
+(see benchmarks/report.py) for comparison between runs.
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Callable
+
+from app.core.services import get_service
+from app.routers.plan_generator import UserProfile, top_k_similar
+from app.services.disease_matcher import get_probable_diseases
+from app.services.food_info import get_food_info, get_food_match
+from app.services.recommender_service import get_recommender
+from benchmarks.load import FOODS, SYMPTOMS, plan_payload, recommend_payload
+from benchmarks.report import print_rows, save, summarize
+
+
+def _symptom_inputs(rng: random.Random, n: int) -> list[str]:
+    index = get_service("symptom_matcher")
+    texts = list(index.df["text"].sample(n=min(n, len(index.df)), random_state=0))
+    return texts + [rng.choice(SYMPTOMS) for _ in range(max(0, n - len(texts)))]
+
+
+def _food_inputs(rng: random.Random, n: int) -> list[str]:
+    keys = get_service("food").keys
+    # Noms exacts, fautes de frappe et absents : les trois chemins de la recherche
+    out = []
+    for i in range(n):
+        name = rng.choice(keys) if i % 3 else rng.choice(FOODS)
+        if i % 3 == 1 and len(name) > 3:
+            j = rng.randrange(1, len(name) - 1)
+            name = name[:j] + name[j + 1 :]
+        out.append(name)
+    return out
+
+
+def _uncached_food_info(name: str):
+    get_food_match.cache_clear()
+    return get_food_info(name)
+
+
+# name → (inputs(rng, n), function)
+BENCHMARKS: dict[str, tuple[Callable, Callable]] = {
+    "get_probable_diseases": (_symptom_inputs, get_probable_diseases),
+    "get_food_info": (_food_inputs, get_food_info),
+    "get_food_info.uncached": (_food_inputs, _uncached_food_info),
+    "top_k_similar": (
+        lambda rng, n: [UserProfile(**plan_payload(rng, i, False)) for i in range(n)],
+        top_k_similar,
+    ),
+    "KNNFitnessRecommender.match": (
+        lambda rng, n: [recommend_payload(rng, i, False) for i in range(n)],
+        lambda profile: get_recommender().match(profile, profile["days_per_week"]),
+    ),
+}
+
+
+def run(name: str, calls: int) -> dict:
+    make_inputs, fn = BENCHMARKS[name]
+    try:
+        inputs = make_inputs(random.Random(0), calls)
+        for x in inputs[:50]:
+            fn(x)
+    except Exception as e:
+        return {"name": name, "error": f"{type(e).__name__}: {e}"}
+
+    latencies = []
+    start = time.perf_counter()
+    for x in inputs:
+        t = time.perf_counter()
+        fn(x)
+        latencies.append(time.perf_counter() - t)
+    return {"name": name, **summarize(latencies, time.perf_counter() - start)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    rows = [run(name, args.calls) for name in args.only]
+    print_rows(rows)
+    print(f"Results: {save('micro', rows, vars(args), args.out)}")
@@ -0,0 +1,115 @@
+# benchmarks/report.py
+"""
+Latency summaries and JSON result files shared by the benchmark suite.
+
+    cd Backend-AI && python -m benchmarks.report OLD.json NEW.json
+
+Each run of ``benchmarks.load`` / ``benchmarks.micro`` writes
+``benchmarks/results/<kind>-<timestamp>.json``: run metadata (commit, host,
+arguments) plus one row per measurement, keyed by ``name``. Comparing two files
+prints p50/p95/p99 and throughput side by side with the relative change.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "rps")
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """Percentiles in ms of per-call latencies (seconds) and calls per second."""
+    lat = np.asarray(latencies, dtype=float) * 1e3
+    if not len(lat):
+        return {"requests": 0, "errors": errors}
+    p50, p95, p99 = np.percentile(lat, [50, 95, 99])
+    return {
+        "requests": len(lat),
+        "errors": errors,
+        "rps": round(len(lat) / elapsed, 2) if elapsed > 0 else None,
+        "mean_ms": round(float(lat.mean()), 3),
+        "p50_ms": round(float(p50), 3),
+        "p95_ms": round(float(p95), 3),
+        "p99_ms": round(float(p99), 3),
+        "max_ms": round(float(lat.max()), 3),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def save(kind: str, rows: list[dict], args: dict, out: Path | None = None) -> Path:
+    out = out or RESULTS_DIR / f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    doc = {
+        "kind": kind,
+        "meta": {
+            "timestamp": time.time(),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "args": args,
+        },
+        "results": rows,
+    }
+    out.write_text(json.dumps(doc, indent=2, default=str))
+    return out
+
+
+def print_rows(rows: list[dict]) -> None:
+    for r in rows:
+        if "error" in r:
+            print(f"{r['name']:38} ERROR {r['error']}")
+            continue
+        if not r["requests"]:
+            print(f"{r['name']:38} no successful call ({r['errors']} errors)")
+            continue
+        print(
+            f"{r['name']:38} n={r['requests']:6} err={r['errors']:4} "
+            f"rps={r['rps'] or 0:9.1f}  p50={r['p50_ms']:9.3f}  p95={r['p95_ms']:9.3f}  "
+            f"p99={r['p99_ms']:9.3f} ms"
+        )
+
+
+def compare(old_path: Path, new_path: Path) -> None:
+    old = {r["name"]: r for r in json.loads(old_path.read_text())["results"]}
+    new = {r["name"]: r for r in json.loads(new_path.read_text())["results"]}
+    print(f"{'':38} " + "  ".join(f"{m:>24}" for m in COMPARED))
+    for name in [n for n in new if n in old]:
+        cells = []
+        for metric in COMPARED:
+            a, b = old[name].get(metric), new[name].get(metric)
+            if a is None or b is None:
+                cells.append(f"{'-':>24}")
+                continue
+            change = f"{(b - a) / a:+.0%}" if a else "n/a"
+            cells.append(f"{a:9.2f} → {b:9.2f} {change:>4}")
+        print(f"{name:38} " + "  ".join(cells))
+    for name in sorted(set(old) ^ set(new)):
+        print(f"{name:38} only in {'old' if name in old else 'new'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    args = parser.parse_args()
+    compare(args.old, args.new)
+    sys.exit(0)
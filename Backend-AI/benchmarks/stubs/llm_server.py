@@ -0,0 +1,97 @@
+# benchmarks/stubs/llm_server.py
+"""
+Local stand-in for the OpenAI-compatible LLM providers (OpenRouter, DeepSeek).
+
+    cd Backend-AI && python -m benchmarks.stubs.llm_server [--port 8901]
+        [--latency 0.5] [--ttft 0.2] [--chunks 20] [--chunk-interval 0.02]
+
+Any ``POST .../chat/completions`` answers a fixed medical paragraph (it passes
+the chat's domain guards): after ``--latency`` seconds as one JSON body, or,
+with ``"stream": true``, as ``--chunks`` SSE deltas, the first after ``--ttft``
+and the next every ``--chunk-interval`` seconds. ``GET /stats`` counts calls.
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPLY = (
+    "Hypertension is a chronic medical condition in which blood pressure stays "
+    "elevated. Common symptoms include headache, dizziness and blurred vision, "
+    "though many patients have none. Treatment combines lifestyle changes, a "
+    "low-salt diet and medication prescribed by a doctor. Seek urgent care for "
+    "chest pain, confusion or severe headache."
+)
+
+
+def _chunks(text: str, n: int) -> list[str]:
+    words = text.split(" ")
+    size = max(1, -(-len(words) // n))
+    return [" ".join(words[i : i + size]) + " " for i in range(0, len(words), size)]
+
+
+def create_app(
+    latency: float = 0.5, ttft: float = 0.2, chunks: int = 20, chunk_interval: float = 0.02
+) -> FastAPI:
+    app = FastAPI(title="LLM stand-in")
+    stats = {"requests": 0, "streams": 0, "started": time.time()}
+
+    @app.get("/stats")
+    def get_stats():
+        return stats
+
+    @app.post("/{path:path}")
+    async def completions(path: str, request: Request):
+        if not path.endswith("chat/completions"):
+            return JSONResponse(status_code=404, content={"error": "not found"})
+        body = await request.json()
+        stats["requests"] += 1
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            await asyncio.sleep(latency)
+            return {
+                "id": f"stub-{stats['requests']}",
+                "model": model,
+                "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": REPLY},
+                     "finish_reason": "stop"}
+                ],
+            }
+
+        stats["streams"] += 1
+
+        async def events():
+            await asyncio.sleep(ttft)
+            for i, part in enumerate(_chunks(REPLY, chunks)):
+                if i:
+                    await asyncio.sleep(chunk_interval)
+                event = {"model": model, "choices": [{"index": 0, "delta": {"content": part}}]}
+                yield f"data: {json.dumps(event)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per JSON reply")
+    parser.add_argument("--ttft", type=float, default=0.2, help="seconds to the first chunk")
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--chunk-interval", type=float, default=0.02)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.latency, args.ttft, args.chunks, args.chunk_interval),
+        host=args.host,
+        port=args.port,
+        log_level="warning",
+    )
@@ -0,0 +1,47 @@
+# benchmarks/stubs/node_server.py
+"""
+Local stand-in for the Node.js persistence backend (``NODE_BACKEND_URL``).
+
+    cd Backend-AI && python -m benchmarks.stubs.node_server [--port 8902] [--latency 0.01]
+
+Accepts every ``POST /api/...`` the outbox sends (single and ``/bulk`` saves)
+after ``--latency`` seconds and counts requests and records per path;
+``GET /stats`` returns the counters.
+"""
+
+import argparse
+import asyncio
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+
+
+def create_app(latency: float = 0.01) -> FastAPI:
+    app = FastAPI(title="Node backend stand-in")
+    requests: Counter = Counter()
+    records: Counter = Counter()
+
+    @app.get("/stats")
+    def get_stats():
+        return {"requests": dict(requests), "records": dict(records)}
+
+    @app.post("/api/{path:path}")
+    async def save(path: str, request: Request):
+        body = await request.json()
+        await asyncio.sleep(latency)
+        requests[path] += 1
+        # Les routes /bulk reçoivent {"predictions": [...]}
+        records[path] += len(body["predictions"]) if "predictions" in body else 1
+        return {"success": True}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8902)
+    parser.add_argument("--latency", type=float, default=0.01)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.latency), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,187 @@
+# benchmarks/stubs/resp_server.py
+"""
+Minimal in-memory Redis stand-in speaking RESP, enough for the session store.
+
+    cd Backend-AI && python -m benchmarks.stubs.resp_server [--port 6390]
+
+Supports HELLO, PING, ECHO, SELECT, CLIENT, RPUSH, LRANGE, LTRIM, LLEN,
+EXPIRE, TTL, DEL, FLUSHDB and MULTI/EXEC/DISCARD. Replies use RESP2 types,
+which are also valid RESP3, so clients negotiating ``HELLO 3`` (redis-py >= 8)
+work unchanged; only the HELLO reply itself is a RESP3 map. Expiry is lazy
+(checked on access). One process, one event loop: MULTI blocks are
+applied atomically because commands never await between each other.
+"""
+
+import argparse
+import asyncio
+import time
+
+
+class RespError(Exception):
+    pass
+
+
+class RespMap(dict):
+    pass
+
+
+def _encode(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, RespError):
+        return f"-{value}\r\n".encode()
+    if isinstance(value, str):  # simple string
+        return f"+{value}\r\n".encode()
+    if isinstance(value, int):
+        return f":{value}\r\n".encode()
+    if isinstance(value, bytes):
+        return b"$%d\r\n%s\r\n" % (len(value), value)
+    if isinstance(value, RespMap):
+        return b"%%%d\r\n" % len(value) + b"".join(
+            _encode(k) + _encode(v) for k, v in value.items()
+        )
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(_encode(v) for v in value)
+    raise TypeError(type(value))
+
+
+def _slice(length: int, start: int, stop: int) -> tuple[int, int]:
+    """Redis inclusive (start, stop) with negative indexes → Python slice bounds."""
+    if start < 0:
+        start = max(length + start, 0)
+    if stop < 0:
+        stop = length + stop
+    return start, min(stop, length - 1) + 1
+
+
+class Store:
+    def __init__(self):
+        self.data: dict[bytes, list[bytes]] = {}
+        self.expires: dict[bytes, float] = {}
+
+    def _get(self, key: bytes) -> list[bytes] | None:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return self.data.get(key)
+
+    def execute(self, args: list[bytes]):
+        cmd, args = args[0].upper().decode(), args[1:]
+        if cmd == "PING":
+            return args[0] if args else "PONG"
+        if cmd == "ECHO":
+            return args[0]
+        if cmd == "HELLO":
+            proto = int(args[0]) if args else 2
+            info = {"server": "resp-stand-in", "version": "7.0.0", "proto": proto}
+            if proto == 3:
+                return RespMap(info)
+            return [x for kv in info.items() for x in kv]
+        if cmd in ("SELECT", "CLIENT"):
+            return "OK"
+        if cmd == "FLUSHDB":
+            self.data.clear()
+            self.expires.clear()
+            return "OK"
+        if cmd == "RPUSH":
+            items = self._get(args[0])
+            if items is None:
+                items = self.data[args[0]] = []
+            items.extend(args[1:])
+            return len(items)
+        if cmd == "LRANGE":
+            items = self._get(args[0]) or []
+            start, stop = _slice(len(items), int(args[1]), int(args[2]))
+            return items[start:stop]
+        if cmd == "LTRIM":
+            items = self._get(args[0])
+            if items is not None:
+                start, stop = _slice(len(items), int(args[1]), int(args[2]))
+                items[:] = items[start:stop]
+                if not items:
+                    self.data.pop(args[0])
+                    self.expires.pop(args[0], None)
+            return "OK"
+        if cmd == "LLEN":
+            return len(self._get(args[0]) or [])
+        if cmd == "EXPIRE":
+            if self._get(args[0]) is None:
+                return 0
+            self.expires[args[0]] = time.monotonic() + int(args[1])
+            return 1
+        if cmd == "TTL":
+            if self._get(args[0]) is None:
+                return -2
+            deadline = self.expires.get(args[0])
+            return -1 if deadline is None else int(deadline - time.monotonic())
+        if cmd == "DEL":
+            removed = 0
+            for key in args:
+                if self._get(key) is not None:
+                    del self.data[key]
+                    self.expires.pop(key, None)
+                    removed += 1
+            return removed
+        return RespError(f"ERR unknown command '{cmd}'")
+
+
+async def _read_command(reader: asyncio.StreamReader) -> list[bytes]:
+    line = await reader.readline()
+    if not line:
+        raise EOFError
+    if not line.startswith(b"*"):  # commande inline (redis-cli / telnet)
+        return line.split()
+    args = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(size + 2))[:-2])
+    return args
+
+
+async def serve(host: str = "127.0.0.1", port: int = 6390) -> asyncio.AbstractServer:
+    store = Store()
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        queued: list[list[bytes]] | None = None
+        try:
+            while True:
+                args = await _read_command(reader)
+                if not args:
+                    continue
+                cmd = args[0].upper()
+                if cmd == b"MULTI":
+                    queued, reply = [], "OK"
+                elif cmd == b"DISCARD":
+                    queued, reply = None, "OK"
+                elif cmd == b"EXEC":
+                    reply = [store.execute(a) for a in queued or []]
+                    queued = None
+                elif queued is not None:
+                    queued.append(args)
+                    reply = "QUEUED"
+                else:
+                    reply = store.execute(args)
+                writer.write(_encode(reply))
+                await writer.drain()
+        except (EOFError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _main(host: str, port: int) -> None:
+    server = await serve(host, port)
+    print(f"RESP stand-in listening on {host}:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    asyncio.run(_main(args.host, args.port))
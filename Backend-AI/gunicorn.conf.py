@@ -0,0 +1,62 @@
+# gunicorn.conf.py
+"""
+Preload-then-fork deployment (Linux):
+
+    cd Backend-AI && gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the app and loads the services (datasets, fitted models,
+indexes) once, then forks the workers: they start with every model already in
+memory and share those pages copy-on-write instead of each holding a private
+copy. Large read-only arrays are memory-mapped artifact files, shared even
+without preloading. Compare workers with GET /health/memory.
+
+Environment: WEB_CONCURRENCY (workers, default 4), BIND (default 0.0.0.0:8000),
+PRELOAD (default 1; 0 = every worker imports and loads on its own),
+WARMUP_SERVICES (same as the app: "" = all, "none" = nothing preloaded),
+PROMETHEUS_MULTIPROC_DIR (directory where the workers write their metrics so
+GET /metrics aggregates all of them; emptied at startup).
+"""
+
+import gc
+import os
+from pathlib import Path
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("PRELOAD", "1") != "0"
+timeout = 120
+graceful_timeout = 30
+
+
+def on_starting(server):
+    # Fichiers de métriques d'un précédent lancement : compteurs faussés sinon
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        Path(metrics_dir).mkdir(parents=True, exist_ok=True)
+        for f in Path(metrics_dir).glob("*.db"):
+            f.unlink()
+
+
+def when_ready(server):
+    """Runs in the master after the app is imported, before the first fork."""
+    if not preload_app:
+        return
+    from app.core import services
+    from app.core.config import settings
+
+    names = [n.strip() for n in settings.warmup_services.split(",") if n.strip()]
+    if names != ["none"]:
+        services.preload(names or None)
+    # Les objets chargés passent en génération permanente : le GC des workers ne
+    # réécrit plus leurs en-têtes, donc les pages restent partagées
+    gc.collect()
+    gc.freeze()
+    server.log.info(f"Preloaded services; {gc.get_freeze_count()} objects frozen before fork")
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
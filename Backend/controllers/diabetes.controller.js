@@ -2,7 +2,7 @@ const DiabetesPrediction = require("../models/DiabetesPrediction");
 
 exports.saveDiabetesPrediction = async (req, res) => {
   try {
-    const { userId, input, result } = req.body;
+    const { userId, input, result, probability } = req.body;
 
     if (!userId || !input || result === undefined) {
       return res.status(400).json({ message: "Missing fields" });
@@ -12,6 +12,7 @@ exports.saveDiabetesPrediction = async (req, res) => {
       user: userId,
       input,
       result,
+      probability,
     });
 
     const saved = await prediction.save();
@@ -21,3 +22,29 @@ exports.saveDiabetesPrediction = async (req, res) => {
     res.status(500).json({ message: "Error saving diabetes prediction" });
   }
 };
+
+exports.saveDiabetesPredictionsBulk = async (req, res) => {
+  try {
+    const { predictions } = req.body;
+
+    if (!Array.isArray(predictions) || predictions.length === 0) {
+      return res.status(400).json({ message: "Missing predictions" });
+    }
+
+    const docs = predictions
+      .filter((p) => p && p.userId && p.input && p.result !== undefined)
+      .map(({ userId, input, result, probability }) => ({
+        user: userId,
+        input,
+        result,
+        probability,
+      }));
+
+    // Une seule écriture pour tout le lot
+    const saved = await DiabetesPrediction.insertMany(docs, { ordered: false });
+    res.status(201).json({ inserted: saved.length, skipped: predictions.length - docs.length });
+  } catch (err) {
+    console.error("❌ Error saving diabetes predictions in bulk:", err);
+    res.status(500).json({ message: "Error saving diabetes predictions" });
+  }
+};
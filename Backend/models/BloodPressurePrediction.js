@@ -8,6 +8,7 @@ const BloodPressurePredictionSchema = new mongoose.Schema({
     diastolic_pressure: Number
   },
   result: String,
+  probability: Number,
   createdAt: { type: Date, default: Date.now }
 });
 
@@ -13,6 +13,7 @@ const DiabetesPredictionSchema = new mongoose.Schema({
     age: Number
   },
   result: String,
+  probability: Number,
   createdAt: { type: Date, default: Date.now }
 });
 
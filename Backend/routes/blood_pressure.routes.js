@@ -1,8 +1,12 @@
 const express = require("express");
 const router = express.Router();
-const { saveBloodPressurePrediction } = require("../controllers/blood_pressure.controller");
+const {
+  saveBloodPressurePrediction,
+  saveBloodPressurePredictionsBulk,
+} = require("../controllers/blood_pressure.controller");
 
 // Route POST
 router.post("/save1", saveBloodPressurePrediction);
+router.post("/save1/bulk", saveBloodPressurePredictionsBulk);
 
 module.exports = router;  // ✅ important
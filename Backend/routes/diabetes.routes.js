@@ -1,7 +1,11 @@
 const express = require("express");
 const router = express.Router();
-const { saveDiabetesPrediction } = require("../controllers/diabetes.controller");
+const {
+  saveDiabetesPrediction,
+  saveDiabetesPredictionsBulk,
+} = require("../controllers/diabetes.controller");
 
 router.post("/save", saveDiabetesPrediction);
+router.post("/save/bulk", saveDiabetesPredictionsBulk);
 
 module.exports = router;
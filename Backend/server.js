@@ -22,7 +22,7 @@ app.use(
     methods: ["GET", "POST", "PUT", "DELETE"],
   })
 );
-app.use(express.json());
+app.use(express.json({ limit: "25mb" })); // lots de prédictions en bulk
 
 // Routes
 app.use("/api", userRoutes, workoutPlanRoutes, statsRoutes, diabetesRoutes, bpRoutes, vitalsRoutes);